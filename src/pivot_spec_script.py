@@ -6,7 +6,7 @@ This script owns the Excel app and workbook lifecycle for demonstration purposes
 
 from __future__ import annotations
 
-import os
+from typing import Optional
 
 import xlwings as xw
 
@@ -17,14 +17,24 @@ from pivot_util import (
     RowField,
     SummaryFunction,
 )
+from pivot_util.app_pool import ExcelAppPool, excel_app
+from pivot_util.workbook_registry import WorkbookRegistry
 
 
-def _ensure_workbook_closed(workbook_path: str) -> None:
+# Shared across jobs in this process; open() and close() through it keep its map current.
+_REGISTRY = WorkbookRegistry()
+
+
+def _ensure_workbook_closed(workbook_path: str, registry: Optional[WorkbookRegistry] = None) -> None:
     """
     Fail fast if the workbook is already open in Excel.
 
+    The registry is rescanned first: a book opened by hand since the last scan
+    would otherwise pass the check until the map ages out.
+
     Args:
         workbook_path: Full path to the workbook on disk.
+        registry: Registry of open workbooks (default: the module's shared registry).
 
     Returns:
         None
@@ -33,27 +43,26 @@ def _ensure_workbook_closed(workbook_path: str) -> None:
         RuntimeError: If the workbook is already open.
     """
 
-    target = os.path.abspath(workbook_path).lower()
-    for app in xw.apps:
-        for book in app.books:
-            try:
-                fullname = os.path.abspath(book.fullname).lower()
-            except Exception:
-                continue
-            if fullname == target:
-                raise RuntimeError(
-                    f"Workbook is already open in Excel: {workbook_path}"
-                )
+    registry = registry or _REGISTRY
+    registry.rescan()
+    registry.ensure_closed(workbook_path)
 
 
-def main() -> None:
+def main(pool: Optional[ExcelAppPool] = None, registry: Optional[WorkbookRegistry] = None) -> None:
     workbook_path = r"C:\Users\nlicalsi\Documents\Code\xlwings_testing\Workbooks\pivot_table_example.xlsx"
+    registry = registry or _REGISTRY
+
+    _ensure_workbook_closed(workbook_path, registry)
+
+    # A pooled Excel skips start-up; without a pool a private instance is started and quit.
+    with excel_app(pool) as app:
+        _run(app, workbook_path, registry)
 
-    _ensure_workbook_closed(workbook_path)
 
-    app = xw.App(visible=False, add_book=False)
+def _run(app: xw.App, workbook_path: str, registry: WorkbookRegistry) -> None:
     try:
-        wb = app.books.open(workbook_path)
+        # Opening and closing through the registry keeps its map current for the next job.
+        wb = registry.open(app, workbook_path)
 
         # Build the pivot specification.
         spec = PivotBuilder(
@@ -97,11 +106,7 @@ def main() -> None:
 
         wb.save()
     finally:
-        try:
-            wb.close()
-        except Exception:
-            pass
-        app.quit()
+        registry.close(workbook_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,351 @@
+"""
+Pool of pre-started hidden Excel instances shared by repeated pivot jobs.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import xlwings as xw
+
+
+@dataclass
+class _PooledApp:
+    app: Any
+    jobs: int = 0
+
+
+class ExcelAppPool:
+    """
+    Keep hidden Excel instances running so jobs skip Excel's start-up cost.
+
+    Jobs check an App out, use it, and return it. Returned instances are
+    health-checked and retired (quit) after max_jobs_per_app jobs, when their
+    memory exceeds max_memory_mb, or when the health check fails; retired
+    instances are replaced lazily. The pool never runs more than size
+    instances at once; checkout blocks until one is free.
+
+    An App is a COM object tied to the thread that created it, so an instance
+    must only be used on the thread that started it (by start() or checkout()).
+    Use a pool from a single thread; to drive Excel from several threads, give
+    each its own pool or route the work through an ExcelActor.
+
+    Args:
+        size: Maximum number of Excel instances (default 2).
+        prestart: Instances started by start() (default: size).
+        max_jobs_per_app: Jobs served before an instance is recycled (default 50).
+        max_memory_mb: Working-set size above which an instance is recycled, or
+            None to disable memory recycling (default None). Needs psutil
+            unless memory_probe is given.
+        factory: Callable returning a new App (default: hidden xw.App with no book).
+        health_check: Callable returning True while an App is usable
+            (default: the App answers a books query).
+        memory_probe: Callable returning an App's memory in MB, or None when it
+            cannot be measured (default: psutil lookup by pid).
+        close_books_on_return: Close, without saving, books a job left open
+            (default True).
+
+    Attributes:
+        created: Instances started so far.
+        retired: Instances quit because they were recycled or unhealthy.
+        jobs: Checkouts served so far.
+
+    Raises:
+        ValueError: When size or max_jobs_per_app is below 1.
+        ImportError: When max_memory_mb is set without memory_probe and psutil
+            is not installed.
+
+    Example:
+        with ExcelAppPool(size=2) as pool:
+            for path in paths:
+                with pool.lease() as app:
+                    build_pivots(app, path)
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        prestart: Optional[int] = None,
+        max_jobs_per_app: int = 50,
+        max_memory_mb: Optional[float] = None,
+        factory: Optional[Callable[[], "xw.App"]] = None,
+        health_check: Optional[Callable[["xw.App"], bool]] = None,
+        memory_probe: Optional[Callable[["xw.App"], Optional[float]]] = None,
+        close_books_on_return: bool = True,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        if max_jobs_per_app < 1:
+            raise ValueError("max_jobs_per_app must be at least 1.")
+        if max_memory_mb is not None and memory_probe is None and importlib.util.find_spec("psutil") is None:
+            raise ImportError(
+                "max_memory_mb needs psutil to measure Excel's memory; install it or pass memory_probe."
+            )
+        self.size = size
+        self.prestart = size if prestart is None else min(prestart, size)
+        self.max_jobs_per_app = max_jobs_per_app
+        self.max_memory_mb = max_memory_mb
+        self.factory = factory or _hidden_app
+        self.health_check = health_check or _answers_books_query
+        self.memory_probe = memory_probe or _process_memory_mb
+        self.close_books_on_return = close_books_on_return
+        self.created = 0
+        self.retired = 0
+        self.jobs = 0
+        self._idle: List[_PooledApp] = []
+        self._busy: Dict[int, _PooledApp] = {}
+        self._starting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __enter__(self) -> "ExcelAppPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    @property
+    def idle_count(self) -> int:
+        with self._condition:
+            return len(self._idle)
+
+    @property
+    def busy_count(self) -> int:
+        with self._condition:
+            return len(self._busy)
+
+    def start(self) -> None:
+        """
+        Start instances until prestart of them are idle or the size cap is reached.
+
+        Returns:
+            None
+        """
+
+        while True:
+            with self._condition:
+                if len(self._idle) >= self.prestart or self._total() >= self.size:
+                    return
+                self._starting += 1
+            entry = self._start_app()
+            with self._condition:
+                self._idle.append(entry)
+                self._condition.notify()
+
+    def checkout(self, timeout: Optional[float] = None) -> "xw.App":
+        """
+        Take an App out of the pool, starting one if the pool has room.
+
+        Args:
+            timeout: Seconds to wait for a free instance, or None to wait forever.
+
+        Returns:
+            A healthy App reserved for the caller until checkin().
+
+        Raises:
+            TimeoutError: When no instance became free within timeout.
+            RuntimeError: When the pool is closed.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                entry = self._wait_for_entry(deadline)
+                if entry is None:
+                    self._starting += 1
+            if entry is None:
+                entry = self._start_app()
+            elif not self._is_healthy(entry):
+                self._retire(entry)
+                continue
+            with self._condition:
+                self._busy[id(entry.app)] = entry
+                self.jobs += 1
+            return entry.app
+
+    def checkin(self, app: "xw.App", discard: bool = False) -> None:
+        """
+        Return an App to the pool, recycling it if it is worn out or unhealthy.
+
+        Args:
+            app: App previously returned by checkout().
+            discard: Quit the instance instead of reusing it (e.g. after a COM failure).
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: When app was not checked out from this pool.
+        """
+
+        with self._condition:
+            entry = self._busy.pop(id(app), None)
+        if entry is None:
+            raise ValueError("App was not checked out from this pool.")
+        entry.jobs += 1
+        if not discard and self.close_books_on_return:
+            _close_open_books(app)
+        if discard or self._closed or self._worn_out(entry) or not self._is_healthy(entry):
+            self._retire(entry)
+        else:
+            with self._condition:
+                self._idle.append(entry)
+        with self._condition:
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator["xw.App"]:
+        """
+        Check an App out for the duration of a with block.
+
+        The instance is discarded instead of reused when the block raises, since
+        Excel may be left in an unknown state.
+
+        Args:
+            timeout: Seconds to wait for a free instance, or None to wait forever.
+
+        Returns:
+            Context manager yielding the App.
+        """
+
+        app = self.checkout(timeout=timeout)
+        try:
+            yield app
+        except BaseException:
+            self.checkin(app, discard=True)
+            raise
+        self.checkin(app)
+
+    def close(self) -> None:
+        """
+        Quit every idle instance; busy instances are quit when they are returned.
+
+        Returns:
+            None
+        """
+
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for entry in idle:
+            self._retire(entry)
+
+    def _total(self) -> int:
+        return len(self._idle) + len(self._busy) + self._starting
+
+    def _wait_for_entry(self, deadline: Optional[float]) -> Optional[_PooledApp]:
+        # Called with the condition held; None means the caller may start a new instance.
+        while True:
+            if self._closed:
+                raise RuntimeError("The Excel app pool is closed.")
+            if self._idle:
+                return self._idle.pop()
+            if self._total() < self.size:
+                return None
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"No Excel instance became free within the timeout ({self.size} busy).")
+            self._condition.wait(remaining)
+
+    def _start_app(self) -> _PooledApp:
+        try:
+            app = self.factory()
+        except BaseException:
+            with self._condition:
+                self._starting -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._starting -= 1
+            self.created += 1
+        return _PooledApp(app)
+
+    def _worn_out(self, entry: _PooledApp) -> bool:
+        if entry.jobs >= self.max_jobs_per_app:
+            return True
+        if self.max_memory_mb is None:
+            return False
+        memory_mb = self.memory_probe(entry.app)
+        return memory_mb is not None and memory_mb > self.max_memory_mb
+
+    def _is_healthy(self, entry: _PooledApp) -> bool:
+        try:
+            return bool(self.health_check(entry.app))
+        except Exception:
+            return False
+
+    def _retire(self, entry: _PooledApp) -> None:
+        try:
+            entry.app.quit()
+        except Exception:
+            # A dead instance cannot be quit; it is dropped either way.
+            pass
+        with self._condition:
+            self.retired += 1
+            self._condition.notify()
+
+
+@contextmanager
+def excel_app(pool: Optional[ExcelAppPool] = None) -> Iterator["xw.App"]:
+    """
+    Yield an App leased from a pool, or a dedicated hidden App quit afterwards.
+
+    Args:
+        pool: Pool to lease from, or None to start and quit a private instance.
+
+    Returns:
+        Context manager yielding the App.
+    """
+
+    if pool is not None:
+        with pool.lease() as app:
+            yield app
+        return
+    app = _hidden_app()
+    try:
+        yield app
+    finally:
+        app.quit()
+
+
+def _hidden_app() -> "xw.App":
+    # Shared by ExcelAppPool and ExcelActor.
+    import xlwings as xw
+
+    return xw.App(visible=False, add_book=False)
+
+
+def _answers_books_query(app: "xw.App") -> bool:
+    app.books.count
+    return True
+
+
+def _process_memory_mb(app: "xw.App") -> Optional[float]:
+    # ExcelAppPool checks that psutil is installed before memory recycling can be enabled.
+    import psutil
+
+    try:
+        return psutil.Process(app.pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _close_open_books(app: "xw.App") -> None:
+    try:
+        books = list(app.books)
+    except Exception:
+        return
+    for book in books:
+        try:
+            book.close()
+        except Exception:
+            continue
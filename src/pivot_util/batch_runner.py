@@ -0,0 +1,365 @@
+"""
+Run pivot jobs for many workbooks in parallel, one backend instance per worker process.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Deque, Iterable, List, Optional, Sequence
+
+from .pivot_util import PivotBatchReport, generate_pivots
+
+if TYPE_CHECKING:
+    from .pivot_builder import PivotBuilder
+
+
+JOB_OK = "ok"
+JOB_ERROR = "error"
+JOB_TIMEOUT = "timeout"
+
+
+@dataclass
+class PivotJob:
+    """
+    One manifest entry: the pivots to build in one workbook.
+
+    Args:
+        workbook_path: Path to the workbook.
+        specs: PivotBuilders for that workbook. Their workbook attribute is
+            replaced by the backend (an opened Book, or the path itself).
+    """
+
+    workbook_path: str
+    specs: Sequence["PivotBuilder"]
+
+
+@dataclass
+class JobResult:
+    """
+    Outcome of one PivotJob.
+
+    Args:
+        workbook_path: Path of the job's workbook.
+        status: "ok", "error" or "timeout".
+        seconds: Time spent on the job (for timeouts, time until it was abandoned).
+        pivot_table_names: Pivots built, in build order.
+        error: Error description for failed jobs.
+        worker_pid: Process id of the worker that ran the job, when known.
+    """
+
+    workbook_path: str
+    status: str
+    seconds: float
+    pivot_table_names: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    worker_pid: Optional[int] = None
+
+
+@dataclass
+class RunSummary:
+    """
+    Results and throughput of a run_manifest call.
+
+    Args:
+        results: One JobResult per job, in manifest order.
+        elapsed: Wall-clock seconds for the whole run.
+        workers: Number of worker processes used.
+    """
+
+    results: List[JobResult]
+    elapsed: float
+    workers: int
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def pivots(self) -> int:
+        return sum(len(result.pivot_table_names) for result in self.results)
+
+    @property
+    def jobs_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def pivots_per_second(self) -> float:
+        return self.pivots / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        """
+        Format a one-paragraph summary plus one line per unsuccessful job.
+
+        Returns:
+            Multi-line summary text.
+        """
+
+        lines = [
+            f"{len(self.results)} workbooks, {self.pivots} pivots in {self.elapsed:.2f}s"
+            f" on {self.workers} workers ({self.jobs_per_second:.2f} workbooks/s,"
+            f" {self.pivots_per_second:.2f} pivots/s)",
+            f"ok={self.count(JOB_OK)} error={self.count(JOB_ERROR)} timeout={self.count(JOB_TIMEOUT)}",
+        ]
+        for result in self.results:
+            if result.status != JOB_OK:
+                lines.append(f"  {result.status}: {result.workbook_path} {result.error or ''}".rstrip())
+        return "\n".join(lines)
+
+
+class ExcelBackend:
+    """
+    Backend that drives a private hidden Excel instance through COM (Windows).
+
+    open() runs once in each worker: it initialises COM for the process and
+    starts Excel, which then serves every job the worker runs. pid is that
+    Excel's process id, so the runner can end it along with a stuck worker.
+
+    Args:
+        save: Save each workbook after its pivots are built (default True).
+    """
+
+    def __init__(self, save: bool = True) -> None:
+        self.save = save
+        self.pid: Optional[int] = None
+        self._app = None
+
+    def open(self) -> None:
+        try:
+            import pythoncom
+        except ImportError:
+            pythoncom = None
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        import xlwings as xw
+
+        self._app = xw.App(visible=False, add_book=False)
+        self.pid = self._app.pid
+
+    def run(self, job: PivotJob) -> PivotBatchReport:
+        workbook = self._app.books.open(job.workbook_path)
+        try:
+            report = generate_pivots([replace(spec, workbook=workbook) for spec in job.specs])
+            if self.save:
+                workbook.save()
+            return report
+        finally:
+            workbook.close()
+
+    def close(self) -> None:
+        if self._app is not None:
+            try:
+                self._app.quit()
+            finally:
+                self._app = None
+                self.pid = None
+        try:
+            import pythoncom
+        except ImportError:
+            return
+        pythoncom.CoUninitialize()
+
+
+class XlsxBackend:
+    """
+    Backend that writes native pivot parts into the .xlsx files without Excel.
+    """
+
+    def open(self) -> None:
+        pass
+
+    def run(self, job: PivotJob) -> PivotBatchReport:
+        return generate_pivots([replace(spec, workbook=job.workbook_path) for spec in job.specs])
+
+    def close(self) -> None:
+        pass
+
+
+def run_manifest(
+    manifest: Iterable[PivotJob],
+    backend: Any = None,
+    max_workers: int = 2,
+    timeout: Optional[float] = None,
+    poll_interval: float = 0.05,
+) -> RunSummary:
+    """
+    Build the pivots of every manifest entry across a set of worker processes.
+
+    Each worker calls backend.open() once (for ExcelBackend: initialise COM and
+    start its own Excel) and backend.close() when the run finishes. At most
+    max_workers jobs run at a time. A job's timeout clock starts when a worker
+    picks it up, so worker start-up does not count against it. A job still
+    running after timeout seconds is recorded as timed out, and only its worker
+    is killed and replaced, together with the process named by the backend's
+    pid attribute (ExcelBackend: its Excel), if any. Other jobs keep running.
+
+    Args:
+        manifest: Jobs to run.
+        backend: Picklable object with open(), run(job) and close() methods and
+            an optional pid attribute (default ExcelBackend()).
+        max_workers: Number of worker processes (default 2).
+        timeout: Per-job limit in seconds, or None for no limit.
+        poll_interval: Seconds between completion checks (default 0.05).
+
+    Returns:
+        RunSummary with one result per job in manifest order.
+
+    Raises:
+        ValueError: When max_workers is less than 1.
+    """
+
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1.")
+    backend = backend if backend is not None else ExcelBackend()
+    jobs = list(manifest)
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    pending: Deque[int] = deque(range(len(jobs)))
+    started = time.perf_counter()
+
+    # Spawned workers start clean: no inherited COM state or threads from the parent.
+    context = multiprocessing.get_context("spawn")
+    workers = [_Worker.start(context, backend) for _ in range(min(max_workers, len(jobs)))]
+    try:
+        while pending or any(worker.index is not None for worker in workers):
+            for worker in workers:
+                if worker.index is None and pending:
+                    index = pending.popleft()
+                    try:
+                        worker.connection.send(jobs[index])
+                    except Exception as exc:
+                        # Raised when the job cannot be pickled for the worker.
+                        results[index] = JobResult(
+                            jobs[index].workbook_path, JOB_ERROR, 0.0, error=f"{type(exc).__name__}: {exc}"
+                        )
+                    else:
+                        worker.index = index
+
+            busy = [worker for worker in workers if worker.index is not None]
+            ready = multiprocessing.connection.wait([worker.connection for worker in busy], poll_interval)
+            for worker in busy:
+                if worker.connection not in ready:
+                    continue
+                try:
+                    message, value = worker.connection.recv()
+                except (EOFError, OSError):
+                    results[worker.index] = worker.result(jobs[worker.index], JOB_ERROR, "worker process exited")
+                    worker.kill()
+                    continue
+                if message == _STARTED:
+                    worker.picked_up = time.perf_counter()
+                    worker.child_pid = value
+                else:
+                    results[worker.index] = value
+                    worker.index = worker.picked_up = None
+
+            now = time.perf_counter()
+            for worker in workers:
+                if timeout is not None and worker.picked_up is not None and now - worker.picked_up > timeout:
+                    # A hung Excel cannot be interrupted; kill just this worker, the others keep running.
+                    error = f"exceeded {timeout:.1f}s"
+                    results[worker.index] = worker.result(jobs[worker.index], JOB_TIMEOUT, error)
+                    worker.kill()
+
+            # Replace killed workers while there are queued jobs no idle worker can take.
+            workers = [worker for worker in workers if not worker.connection.closed]
+            idle = sum(1 for worker in workers if worker.index is None)
+            for _ in range(min(max_workers - len(workers), len(pending) - idle)):
+                workers.append(_Worker.start(context, backend))
+
+        for worker in workers:
+            worker.connection.send(None)
+        for worker in workers:
+            worker.process.join()
+            worker.connection.close()
+    except BaseException:
+        for worker in workers:
+            worker.kill()
+        raise
+
+    return RunSummary(
+        results=[result for result in results if result is not None],
+        elapsed=time.perf_counter() - started,
+        workers=max_workers,
+    )
+
+
+# Messages a worker sends for each job: (_STARTED, backend pid) then (_DONE, JobResult).
+_STARTED = "started"
+_DONE = "done"
+
+
+@dataclass
+class _Worker:
+    process: Any
+    connection: Any
+    # Job being run, when the worker picked it up, and the backend's own process.
+    index: Optional[int] = None
+    picked_up: Optional[float] = None
+    child_pid: Optional[int] = None
+
+    @classmethod
+    def start(cls, context: Any, backend: Any) -> "_Worker":
+        connection, worker_connection = context.Pipe()
+        process = context.Process(target=_worker_main, args=(backend, worker_connection), daemon=True)
+        process.start()
+        # Drop the parent's copy of the worker end, so the worker exiting shows up as EOF.
+        worker_connection.close()
+        return cls(process, connection)
+
+    def result(self, job: PivotJob, status: str, error: str) -> JobResult:
+        seconds = time.perf_counter() - self.picked_up if self.picked_up is not None else 0.0
+        return JobResult(job.workbook_path, status, seconds, error=error, worker_pid=self.process.pid)
+
+    def kill(self) -> None:
+        # Terminated workers skip backend.close(), so also end the process the backend started.
+        self.process.kill()
+        if self.child_pid is not None:
+            try:
+                os.kill(self.child_pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.process.join()
+        self.connection.close()
+
+
+def _worker_main(backend: Any, connection: Any) -> None:
+    backend.open()
+    try:
+        while True:
+            job = connection.recv()
+            if job is None:
+                return
+            connection.send((_STARTED, getattr(backend, "pid", None)))
+            result = _run_job(backend, job)
+            try:
+                connection.send((_DONE, result))
+            except Exception as exc:
+                # Raised when the result cannot be pickled back to the runner.
+                connection.send((_DONE, replace(result, status=JOB_ERROR, error=f"{type(exc).__name__}: {exc}")))
+    finally:
+        backend.close()
+
+
+def _run_job(backend: Any, job: PivotJob) -> JobResult:
+    started = time.perf_counter()
+    try:
+        report = backend.run(job)
+    except Exception as exc:
+        return JobResult(
+            job.workbook_path,
+            JOB_ERROR,
+            time.perf_counter() - started,
+            error=f"{type(exc).__name__}: {exc}",
+            worker_pid=os.getpid(),
+        )
+    return JobResult(
+        job.workbook_path,
+        JOB_OK,
+        time.perf_counter() - started,
+        pivot_table_names=list(report.pivot_table_names),
+        worker_pid=os.getpid(),
+    )
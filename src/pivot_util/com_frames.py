@@ -0,0 +1,638 @@
+"""
+Bulk transfers between Excel Tables (ListObjects) or sheet ranges in a running Excel and polars DataFrames.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import polars as pl
+
+from .errors import ValidationError
+from .workbook_index import WorkbookIndex, _list_object_column_names
+
+if TYPE_CHECKING:
+    import xlwings as xw
+
+
+# Day 0 of Excel's date systems; 1900 serials count a nonexistent 1900-02-29 (serial 60).
+_EPOCH_1900 = dt.datetime(1899, 12, 30)
+_EPOCH_1904 = dt.datetime(1904, 1, 1)
+
+_MS_PER_DAY = 86_400_000
+
+# Cells per Value2 write. Larger blocks save round trips but marshal one big
+# SAFEARRAY at once; a few hundred thousand cells keeps each call well under a second.
+WRITE_BLOCK_CELLS = 250_000
+
+# Number formats applied to temporal columns, which Value2 writes as plain serials.
+_NUMBER_FORMATS = {
+    pl.Datetime: "yyyy-mm-dd hh:mm:ss",
+    pl.Date: "yyyy-mm-dd",
+    pl.Time: "hh:mm:ss",
+    pl.Duration: "[h]:mm:ss",
+}
+
+_ADDRESS = re.compile(r"^\$?([A-Z]+)\$?(\d+)(?::\$?([A-Z]+)\$?(\d+))?$")
+
+# Value2 returns error cells as the HRESULT 0x800A0000 + xlErr code (#NULL! 2000 ... #CALC! 2050).
+_ERROR_CODES = frozenset(
+    -2146826288 + code - 2000
+    for code in (2000, 2007, 2015, 2023, 2029, 2036, 2042, 2043, 2045, 2046, 2047, 2048, 2049, 2050)
+)
+
+
+@dataclass
+class WriteReport:
+    """
+    Size and throughput of one write_frame or write_list_object call.
+
+    Args:
+        rows: Data rows written.
+        columns: Columns written.
+        cells: Cells written, including the header row when one was written.
+        blocks: Value2 writes made.
+        seconds: Wall-clock seconds for conversion, writes and resizing.
+        address: Address of the written cells (the table body for write_list_object).
+    """
+
+    rows: int
+    columns: int
+    cells: int
+    blocks: int
+    seconds: float
+    address: str
+
+    @property
+    def cells_per_second(self) -> float:
+        return self.cells / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class TransferTiming:
+    """
+    One measurement from benchmark_read or benchmark_write.
+
+    Args:
+        method: Transfer path that was timed.
+        seconds: Best wall-clock time over the repeats, fetch and conversion included.
+        rows: Data rows transferred.
+        columns: Columns transferred.
+    """
+
+    method: str
+    seconds: float
+    rows: int
+    columns: int
+
+    @property
+    def cells_per_second(self) -> float:
+        return self.rows * self.columns / self.seconds if self.seconds > 0 else 0.0
+
+
+def read_list_object(
+    list_object: Any,
+    date_columns: Optional[Sequence[str]] = None,
+    date1904: bool = False,
+) -> pl.DataFrame:
+    """
+    Read an Excel Table into a DataFrame with one bulk Value2 transfer.
+
+    The header names and the whole data body are each fetched in one round
+    trip. Value2 returns raw numbers (no per-cell Date or Currency conversion),
+    the rows are transposed into columns once, and serial dates are converted
+    per column in a single vectorized polars pass. Error cells (#N/A, #DIV/0!
+    and so on) read as null. A column mixing numbers and text takes the type
+    of most of its non-empty cells: text in a numeric column (placeholders
+    such as "N/A") reads as null, numbers in a text column read as Excel
+    shows them ("1", not "1.0").
+
+    Args:
+        list_object: COM ListObject.
+        date_columns: Columns holding dates. None detects them from each
+            column's first numeric cell, reading the Value of the rows holding
+            those cells (usually one extra round trip); pass [] to keep every
+            column numeric.
+        date1904: Whether the workbook uses the 1904 date system.
+
+    Returns:
+        DataFrame with one column per table column, in table order.
+
+    Raises:
+        ValidationError: When a date column is not in the table.
+    """
+
+    names = _list_object_column_names(list_object)
+    body = list_object.DataBodyRange
+    if body is None:
+        return pl.DataFrame({name: [] for name in names})
+    values = body.Value2
+    if date_columns is None:
+        date_columns = _detect_date_columns(body, names, values)
+    return _frame_from_value2(values, names, date_columns, date1904)
+
+
+def read_table_frame(
+    workbook: "xw.Book",
+    table_name: str,
+    date_columns: Optional[Sequence[str]] = None,
+    index: Optional[WorkbookIndex] = None,
+) -> pl.DataFrame:
+    """
+    Read a named Excel Table from an open workbook into a DataFrame.
+
+    Args:
+        workbook: xlwings Book holding the table.
+        table_name: Table name, matched case-insensitively.
+        date_columns: As for read_list_object.
+        index: Optional WorkbookIndex of the workbook, reused across reads.
+
+    Returns:
+        DataFrame of the table body.
+
+    Raises:
+        ValidationError: When the table does not exist.
+    """
+
+    index = index or WorkbookIndex(workbook)
+    entry = index.table(table_name)
+    if entry is None:
+        raise ValidationError(f"Table '{table_name}' not found in workbook.")
+    date1904 = bool(getattr(workbook.api, "Date1904", False))
+    return read_list_object(entry.list_object, date_columns=date_columns, date1904=date1904)
+
+
+def write_frame(
+    frame: pl.DataFrame,
+    cell: "xw.Range",
+    include_header: bool = True,
+    block_cells: int = WRITE_BLOCK_CELLS,
+    number_formats: bool = True,
+    date1904: bool = False,
+) -> WriteReport:
+    """
+    Write a DataFrame to a sheet starting at a cell, in row blocks of Value2 writes.
+
+    The frame is converted to Value2 values column by column in polars first
+    (temporal columns become serial numbers, NaN becomes empty), so each block
+    is a plain tuple of row tuples that Excel stores without per-cell
+    conversion. Blocks hold about block_cells cells each; the header goes out
+    with the first block. Wrap the call in ExcelPerformanceSession to keep
+    Excel from recalculating and repainting between blocks.
+
+    Args:
+        frame: Data to write.
+        cell: xlwings Range whose top-left cell receives the first value.
+        include_header: Write the column names as the first row (default True).
+        block_cells: Target cells per Value2 write (default WRITE_BLOCK_CELLS).
+        number_formats: Give temporal columns a date or time number format,
+            one round trip per such column (default True).
+        date1904: Whether the workbook uses the 1904 date system.
+
+    Returns:
+        WriteReport of the write.
+
+    Raises:
+        ValidationError: When a column type has no Excel representation or
+            block_cells is not positive.
+    """
+
+    started = time.perf_counter()
+    sheet_api = cell.sheet.api
+    row, column = cell.row, cell.column
+    converted = _value2_frame(frame, date1904)
+    header = tuple(frame.columns) if include_header else None
+    blocks = _write_blocks(sheet_api, converted, row, column, header, block_cells)
+    first_data_row = row + (1 if include_header else 0)
+    if number_formats:
+        _apply_number_formats(sheet_api, frame, first_data_row, column)
+    last_row = max(first_data_row + frame.height - 1, row)
+    return _report(frame, header, blocks, started, (row, column, last_row, column + max(frame.width, 1) - 1))
+
+
+def write_list_object(
+    frame: pl.DataFrame,
+    list_object: Any,
+    resize: bool = True,
+    block_cells: int = WRITE_BLOCK_CELLS,
+    number_formats: bool = True,
+    date1904: bool = False,
+) -> WriteReport:
+    """
+    Replace the body of an Excel Table with a DataFrame, in row blocks of Value2 writes.
+
+    Frame columns are matched to table columns by name (case-insensitively)
+    and written in table order; the header row is left as it is. The rows
+    are written below the header as for write_frame, then the table is
+    resized once to fit them, which is far cheaper than letting it grow
+    block by block. Rows of a longer previous body are cleared. A shown
+    totals row is hidden while the body is replaced and then shown again,
+    so Excel rebuilds it below the new rows.
+
+    Args:
+        frame: Data to write; must have exactly the table's columns.
+        list_object: COM ListObject.
+        resize: Resize the table to the new rows (default True). When False
+            the table keeps its extent and surplus old rows are left as they are.
+        block_cells: Target cells per Value2 write (default WRITE_BLOCK_CELLS).
+        number_formats: As for write_frame.
+        date1904: Whether the workbook uses the 1904 date system.
+
+    Returns:
+        WriteReport of the write.
+
+    Raises:
+        ValidationError: When the frame's columns differ from the table's, a
+            column type has no Excel representation, or block_cells is not positive.
+    """
+
+    started = time.perf_counter()
+    names = _list_object_column_names(list_object)
+    frame = _table_ordered(frame, names)
+    converted = _value2_frame(frame, date1904)
+    sheet_api = list_object.Parent
+    # Range also covers a shown totals row, so take the bounds from the header and body.
+    top, left, _, right = _address_bounds(list_object.HeaderRowRange.Address)
+    body = list_object.DataBodyRange
+    old_bottom = _address_bounds(body.Address)[2] if body is not None else top
+    show_totals = list_object.ShowTotals
+    if show_totals:
+        # The new rows would otherwise overwrite the totals row.
+        list_object.ShowTotals = False
+    try:
+        blocks = _write_blocks(sheet_api, converted, top + 1, left, None, block_cells)
+        if number_formats:
+            _apply_number_formats(sheet_api, frame, top + 1, left)
+        # A table keeps at least one (possibly empty) body row.
+        bottom = top + max(frame.height, 1)
+        if resize:
+            first_surplus = top + frame.height + 1
+            if old_bottom >= first_surplus:
+                sheet_api.Range(_range_address(first_surplus, left, old_bottom, right)).ClearContents()
+            if old_bottom != bottom:
+                list_object.Resize(sheet_api.Range(_range_address(top, left, bottom, right)))
+    finally:
+        if show_totals:
+            list_object.ShowTotals = True
+    return _report(frame, None, blocks, started, (top + 1, left, bottom, right))
+
+
+def serial_to_datetime(serial: pl.Expr, date1904: bool = False) -> pl.Expr:
+    """
+    Convert Excel serial day numbers to datetimes, rounded to the millisecond.
+
+    Non-numeric values (text, error codes as text) become null.
+
+    Args:
+        serial: Expression of serial numbers.
+        date1904: Whether the serials use the 1904 date system.
+
+    Returns:
+        Datetime expression (alias it to name the result).
+    """
+
+    days = serial.cast(pl.Float64, strict=False)
+    if date1904:
+        epoch = _EPOCH_1904
+    else:
+        epoch = _EPOCH_1900
+        # Serials before the phantom 1900-02-29 are one day early against the real calendar.
+        days = pl.when(days < 60).then(days + 1).otherwise(days)
+    milliseconds = (days * _MS_PER_DAY).round(0).cast(pl.Int64)
+    return pl.lit(epoch, dtype=pl.Datetime("ms")) + pl.duration(milliseconds=milliseconds)
+
+
+def benchmark_read(workbook: "xw.Book", table_name: str, repeat: int = 3) -> List[TransferTiming]:
+    """
+    Time read_list_object against xlwings' range.options().value on one table.
+
+    Both paths are timed end to end: the COM fetch and the conversion to a
+    DataFrame. The xlwings path reads the body's Value (Excel converts the
+    dates) and builds the frame from row lists, as a caller without
+    read_list_object would.
+
+    Args:
+        workbook: xlwings Book holding the table.
+        table_name: Table name, matched case-insensitively.
+        repeat: Reads per path; the best time is kept (default 3).
+
+    Returns:
+        One TransferTiming per path, read_list_object first.
+
+    Raises:
+        ValidationError: When the table does not exist.
+    """
+
+    entry = WorkbookIndex(workbook).table(table_name)
+    if entry is None:
+        raise ValidationError(f"Table '{table_name}' not found in workbook.")
+    list_object = entry.list_object
+    sheet = workbook.sheets[entry.sheet_name]
+    date1904 = bool(getattr(workbook.api, "Date1904", False))
+    names = _list_object_column_names(list_object)
+
+    def range_value() -> pl.DataFrame:
+        values = sheet.range(list_object.DataBodyRange.Address).options(ndim=2).value
+        return pl.DataFrame(values, schema=names, orient="row", infer_schema_length=None, strict=False)
+
+    return [
+        _time_transfer("read_list_object", lambda: read_list_object(list_object, date1904=date1904), repeat),
+        _time_transfer("range.options().value", range_value, repeat),
+    ]
+
+
+def benchmark_write(frame: pl.DataFrame, cell: "xw.Range", repeat: int = 1) -> List[TransferTiming]:
+    """
+    Time write_frame against writing the frame row by row through xlwings.
+
+    Both paths write the same cells (without a header), so the second
+    overwrites the first. The row-by-row path makes one round trip per row;
+    keep the frame small enough for that to finish.
+
+    Args:
+        frame: Data to write.
+        cell: xlwings Range whose top-left cell receives the first value.
+        repeat: Writes per path; the best time is kept (default 1).
+
+    Returns:
+        One TransferTiming per path, write_frame first.
+
+    Raises:
+        ValidationError: As for write_frame.
+    """
+
+    sheet = cell.sheet
+    row, column = cell.row, cell.column
+
+    def blocked() -> pl.DataFrame:
+        write_frame(frame, cell, include_header=False, number_formats=False)
+        return frame
+
+    def row_by_row() -> pl.DataFrame:
+        for offset, values in enumerate(frame.rows()):
+            sheet.range((row + offset, column)).value = list(values)
+        return frame
+
+    return [_time_transfer("write_frame", blocked, repeat), _time_transfer("row by row", row_by_row, repeat)]
+
+
+def format_transfer_timings(timings: Sequence[TransferTiming]) -> str:
+    """
+    Format benchmark results as a fixed-width table.
+
+    Args:
+        timings: Results from benchmark_read or benchmark_write.
+
+    Returns:
+        Multi-line table text.
+    """
+
+    lines = [f"{'method':<24} {'ms':>9} {'rows':>8} {'cols':>5} {'cells/s':>12}"]
+    for timing in timings:
+        lines.append(
+            f"{timing.method:<24} {timing.seconds * 1000:>9.2f} {timing.rows:>8} {timing.columns:>5} "
+            f"{timing.cells_per_second:>12,.0f}"
+        )
+    return "\n".join(lines)
+
+
+def _frame_from_value2(
+    values: Any, names: List[str], date_columns: Sequence[str], date1904: bool
+) -> pl.DataFrame:
+    missing = [name for name in date_columns if name not in names]
+    if missing:
+        raise ValidationError(f"Date columns not found in table: {', '.join(missing)}")
+    rows = _value2_rows(values)
+    # One transpose in C, then one Series per column; no per-cell Python conversion.
+    columns = list(zip(*rows)) if rows else [() for _ in names]
+    frame = pl.DataFrame([_value2_series(name, column) for name, column in zip(names, columns)])
+    if not date_columns:
+        return frame
+    return frame.with_columns([serial_to_datetime(pl.col(name), date1904).alias(name) for name in date_columns])
+
+
+def _value2_rows(values: Any) -> Tuple[Tuple[Any, ...], ...]:
+    # COM returns a scalar for a one-cell range, else a tuple of row tuples.
+    return values if isinstance(values, tuple) else ((values,),)
+
+
+def _value2_series(name: str, column: Tuple[Any, ...]) -> pl.Series:
+    try:
+        series = pl.Series(name, column)
+    except TypeError:
+        return _mixed_series(name, column)
+    if series.dtype.is_numeric():
+        series = series.to_frame().select(
+            pl.when(pl.col(name).is_in(list(_ERROR_CODES))).then(None).otherwise(pl.col(name)).alias(name)
+        ).to_series()
+    return series
+
+
+def _mixed_series(name: str, column: Tuple[Any, ...]) -> pl.Series:
+    # Only columns mixing types get here, so the per-cell pass stays off the common path.
+    cells = [None if _is_error(value) else value for value in column]
+    texts = sum(isinstance(value, str) for value in cells)
+    numbers = sum(value is not None for value in cells) - texts
+    if numbers > texts:
+        return pl.Series(name, [None if isinstance(value, str) else value for value in cells], strict=False)
+    return pl.Series(name, [_display_text(value) for value in cells], dtype=pl.String)
+
+
+def _display_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _is_error(value: Any) -> bool:
+    return type(value) is int and value in _ERROR_CODES
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not _is_error(value)
+
+
+def _detect_date_columns(body: Any, names: List[str], values: Any) -> List[str]:
+    # Value2 shows where each column's first non-empty cell is; only numbers can be dates,
+    # and Value (not Value2) of the rows holding them shows which are date-formatted.
+    first_rows: Dict[int, List[int]] = {}
+    pending = set(range(len(names)))
+    for row_index, row in enumerate(_value2_rows(values)):
+        for column_index in list(pending):
+            value = row[column_index]
+            if value is None or _is_error(value):
+                continue
+            pending.discard(column_index)
+            if _is_number(value):
+                first_rows.setdefault(row_index, []).append(column_index)
+        if not pending:
+            break
+    found = []
+    for row_index, column_indexes in first_rows.items():
+        try:
+            row_values = _value2_rows(body.Rows(row_index + 1).Value)[0]
+        except Exception:
+            continue
+        found.extend(index for index in column_indexes if isinstance(row_values[index], (dt.datetime, dt.date)))
+    return [names[index] for index in sorted(found)]
+
+
+def _time_transfer(method: str, transfer: Callable[[], pl.DataFrame], repeat: int) -> TransferTiming:
+    best = None
+    frame = pl.DataFrame()
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        frame = transfer()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return TransferTiming(method=method, seconds=best or 0.0, rows=frame.height, columns=frame.width)
+
+
+def _value2_frame(frame: pl.DataFrame, date1904: bool) -> pl.DataFrame:
+    epoch = _EPOCH_1904 if date1904 else _EPOCH_1900
+    expressions = []
+    for name, dtype in frame.schema.items():
+        column = pl.col(name)
+        if dtype.is_temporal():
+            expressions.append(_temporal_serial(column, dtype, epoch, date1904).alias(name))
+        elif dtype.is_float():
+            expressions.append(column.fill_nan(None))
+        elif dtype.is_decimal():
+            expressions.append(column.cast(pl.Float64))
+        elif dtype in (pl.Categorical, pl.Enum):
+            expressions.append(column.cast(pl.String))
+        elif dtype.is_nested() or dtype in (pl.Object, pl.Binary):
+            raise ValidationError(f"Column '{name}' of type {dtype} cannot be written to Excel.")
+        else:
+            expressions.append(column)
+    return frame.select(expressions)
+
+
+def _temporal_serial(column: pl.Expr, dtype: Any, epoch: dt.datetime, date1904: bool) -> pl.Expr:
+    if dtype == pl.Time:
+        return column.cast(pl.Int64) / (_MS_PER_DAY * 1_000_000)
+    if dtype == pl.Duration:
+        return column.dt.total_milliseconds() / _MS_PER_DAY
+    if dtype == pl.Datetime and getattr(dtype, "time_zone", None):
+        # Excel has no time zones; write the wall-clock time.
+        column = column.dt.replace_time_zone(None)
+    milliseconds = column.cast(pl.Datetime("ms")) - pl.lit(epoch, dtype=pl.Datetime("ms"))
+    days = milliseconds.dt.total_milliseconds() / _MS_PER_DAY
+    if date1904:
+        return days
+    # Inverse of serial_to_datetime: serials before the phantom 1900-02-29 are one lower.
+    return pl.when(days < 61).then(days - 1).otherwise(days)
+
+
+def _write_blocks(
+    sheet_api: Any,
+    converted: pl.DataFrame,
+    row: int,
+    column: int,
+    header: Optional[Tuple[str, ...]],
+    block_cells: int,
+) -> int:
+    if block_cells < 1:
+        raise ValidationError("block_cells must be positive.")
+    width = converted.width
+    if width == 0:
+        return 0
+    block_rows = max(block_cells // width, 1)
+    blocks = 0
+    offset = 0
+    pending = [header] if header is not None else []
+    while offset < converted.height or pending:
+        # Rows are materialized one block at a time, so Python-side memory stays bounded.
+        count = max(min(block_rows - len(pending), converted.height - offset), 0)
+        values = pending + converted.slice(offset, count).rows()
+        target = sheet_api.Range(_range_address(row, column, row + len(values) - 1, column + width - 1))
+        target.Value2 = values
+        row += len(values)
+        offset += count
+        blocks += 1
+        pending = []
+    return blocks
+
+
+def _apply_number_formats(sheet_api: Any, frame: pl.DataFrame, first_row: int, column: int) -> None:
+    if frame.height == 0:
+        return
+    last_row = first_row + frame.height - 1
+    for index, dtype in enumerate(frame.dtypes):
+        number_format = _NUMBER_FORMATS.get(dtype.base_type())
+        if number_format is not None:
+            target = column + index
+            sheet_api.Range(_range_address(first_row, target, last_row, target)).NumberFormat = number_format
+
+
+def _table_ordered(frame: pl.DataFrame, names: List[str]) -> pl.DataFrame:
+    by_key: Dict[str, str] = {name.lower(): name for name in frame.columns}
+    missing = [name for name in names if name.lower() not in by_key]
+    extra = sorted(set(by_key) - {name.lower() for name in names})
+    if missing or extra:
+        details = []
+        if missing:
+            details.append(f"missing {', '.join(missing)}")
+        if extra:
+            details.append(f"not in table {', '.join(by_key[key] for key in extra)}")
+        raise ValidationError(f"Frame columns do not match the table: {'; '.join(details)}.")
+    return frame.select([pl.col(by_key[name.lower()]) for name in names])
+
+
+def _report(
+    frame: pl.DataFrame,
+    header: Optional[Tuple[str, ...]],
+    blocks: int,
+    started: float,
+    bounds: Tuple[int, int, int, int],
+) -> WriteReport:
+    header_rows = 1 if header is not None else 0
+    return WriteReport(
+        rows=frame.height,
+        columns=frame.width,
+        cells=(frame.height + header_rows) * frame.width,
+        blocks=blocks,
+        seconds=time.perf_counter() - started,
+        address=_range_address(*bounds),
+    )
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index
+
+
+def _range_address(first_row: int, first_column: int, last_row: int, last_column: int) -> str:
+    first = f"{_column_letter(first_column)}{first_row}"
+    if (first_row, first_column) == (last_row, last_column):
+        return first
+    return f"{first}:{_column_letter(last_column)}{last_row}"
+
+
+def _address_bounds(address: str) -> Tuple[int, int, int, int]:
+    match = _ADDRESS.match(address.split("!")[-1].upper())
+    if match is None:
+        raise ValidationError(f"Unsupported range address '{address}'.")
+    first_column, first_row, last_column, last_row = match.groups()
+    top, left = int(first_row), _column_index(first_column)
+    if last_column is None:
+        return (top, left, top, left)
+    return (top, left, int(last_row), _column_index(last_column))
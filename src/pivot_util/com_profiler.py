@@ -0,0 +1,314 @@
+"""
+Opt-in instrumentation proxy that counts and times calls into xlwings and COM objects.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Values returned as-is instead of being wrapped in a proxy.
+PLAIN_VALUE_TYPES = (str, bytes, int, float, bool, type(None), tuple, list, dict, dt.date, dt.time, Enum)
+
+# Upper bounds (seconds) and labels of the timing histogram buckets.
+HISTOGRAM_BUCKETS: Tuple[Tuple[float, str], ...] = (
+    (1e-5, "<10us"),
+    (1e-4, "<100us"),
+    (1e-3, "<1ms"),
+    (1e-2, "<10ms"),
+    (1e-1, "<100ms"),
+    (float("inf"), ">=100ms"),
+)
+
+UNSCOPED_PHASE = "unscoped"
+
+
+class ComProxy:
+    """
+    Transparent proxy that reports every attribute get, set and call to an observer.
+
+    Results that are objects (xlwings wrappers or COM dispatch objects) are wrapped
+    in turn, so a proxied workbook instruments everything reached from it, including
+    workbook.api, sheet.api, ListObjects and PivotTables. Proxy arguments are
+    unwrapped before they are passed on, so COM never sees a proxy.
+
+    Args:
+        target: Object to wrap.
+        observer: Object with an invoke(kind, label, thunk, proxy=None, name=None,
+            args=(), kwargs=None) method that runs thunk() and returns its result.
+            kind is "get", "set", "call", "iter", "item" or "len".
+        label: Dotted access path shown in reports (e.g. "Book.sheets[].api").
+    """
+
+    __slots__ = ("_proxy_target", "_proxy_observer", "_proxy_label")
+
+    def __init__(self, target: Any, observer: Any, label: str) -> None:
+        object.__setattr__(self, "_proxy_target", target)
+        object.__setattr__(self, "_proxy_observer", observer)
+        object.__setattr__(self, "_proxy_label", label)
+
+    def __getattr__(self, name: str) -> Any:
+        label = f"{self._proxy_label}.{name}"
+        value = self._proxy_observer.invoke(
+            "get", label, lambda: getattr(self._proxy_target, name), proxy=self, name=name
+        )
+        return _wrap(value, self._proxy_observer, label)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        label = f"{self._proxy_label}.{name}"
+        plain_value = unwrap(value)
+        self._proxy_observer.invoke(
+            "set",
+            label,
+            lambda: setattr(self._proxy_target, name, plain_value),
+            proxy=self,
+            name=name,
+            args=(plain_value,),
+        )
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        label = f"{self._proxy_label}()"
+        plain_args = tuple(unwrap(arg) for arg in args)
+        plain_kwargs = {key: unwrap(value) for key, value in kwargs.items()}
+        value = self._proxy_observer.invoke(
+            "call",
+            label,
+            lambda: self._proxy_target(*plain_args, **plain_kwargs),
+            proxy=self,
+            args=plain_args,
+            kwargs=plain_kwargs,
+        )
+        return _wrap(value, self._proxy_observer, label)
+
+    def __iter__(self) -> Iterator[Any]:
+        label = f"{self._proxy_label}[]"
+        items = self._proxy_observer.invoke(
+            "iter", label, lambda: list(iter(self._proxy_target)), proxy=self
+        )
+        return iter([_wrap(item, self._proxy_observer, label) for item in items])
+
+    def __getitem__(self, key: Any) -> Any:
+        label = f"{self._proxy_label}[]"
+        plain_key = unwrap(key)
+        value = self._proxy_observer.invoke(
+            "item", label, lambda: self._proxy_target[plain_key], proxy=self, args=(plain_key,)
+        )
+        return _wrap(value, self._proxy_observer, label)
+
+    def __len__(self) -> int:
+        label = f"{self._proxy_label}.__len__"
+        return self._proxy_observer.invoke("len", label, lambda: len(self._proxy_target), proxy=self)
+
+    def __bool__(self) -> bool:
+        return bool(self._proxy_target)
+
+    def __eq__(self, other: Any) -> bool:
+        return self._proxy_target == unwrap(other)
+
+    def __hash__(self) -> int:
+        return hash(self._proxy_target)
+
+    def __repr__(self) -> str:
+        return f"ComProxy({self._proxy_label}: {self._proxy_target!r})"
+
+
+def unwrap(value: Any) -> Any:
+    """
+    Return the object behind a ComProxy, or the value itself.
+
+    Args:
+        value: Possibly proxied value.
+
+    Returns:
+        The unwrapped value.
+    """
+
+    while isinstance(value, ComProxy):
+        value = object.__getattribute__(value, "_proxy_target")
+    return value
+
+
+def _wrap(value: Any, observer: Any, label: str) -> Any:
+    if isinstance(value, PLAIN_VALUE_TYPES) or isinstance(value, ComProxy):
+        return value
+    return ComProxy(value, observer, label)
+
+
+@dataclass
+class ComCallStats:
+    """
+    Timing statistics for one call label within one phase.
+
+    Args:
+        count: Number of calls.
+        durations: Duration of each call in seconds, in call order.
+    """
+
+    count: int = 0
+    durations: List[float] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations)
+
+    def histogram(self) -> Dict[str, int]:
+        """
+        Bucket the call durations into log-spaced latency bins.
+
+        Returns:
+            Mapping of bucket label (e.g. "<1ms") to call count, in bucket order.
+        """
+
+        buckets = {label: 0 for _, label in HISTOGRAM_BUCKETS}
+        for duration in self.durations:
+            for upper, label in HISTOGRAM_BUCKETS:
+                if duration < upper:
+                    buckets[label] += 1
+                    break
+        return buckets
+
+
+class ComProfiler:
+    """
+    Collect per-phase call counts and timing histograms for a proxied workbook.
+
+    Set PivotBuilder.profiler to a ComProfiler to instrument generate_pivot, which
+    records its work under the "validation", "destination", "cache" and "fields"
+    phases. The profiler can also wrap any xlwings object directly.
+
+    Args:
+        clock: Monotonic clock returning seconds (default time.perf_counter).
+
+    Example:
+        profiler = ComProfiler()
+        spec.profiler = profiler
+        spec.generate_pivot()
+        print(profiler.report())
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self.stats: Dict[str, Dict[str, ComCallStats]] = {}
+        self.phase_seconds: Dict[str, float] = {}
+        self._phases: List[str] = []
+        self._wrapped: Dict[int, ComProxy] = {}
+
+    @property
+    def current_phase(self) -> str:
+        return self._phases[-1] if self._phases else UNSCOPED_PHASE
+
+    def wrap(self, target: Any, label: Optional[str] = None) -> Any:
+        """
+        Wrap an object so calls reached through it are recorded.
+
+        Wrapping the same object twice returns the same proxy.
+
+        Args:
+            target: xlwings object (Book, Sheet, App) or COM object to instrument.
+            label: Optional root label for reports (default: the target's type name).
+
+        Returns:
+            A ComProxy around target (or target itself if it is already a proxy).
+        """
+
+        if isinstance(target, ComProxy):
+            return target
+        key = id(target)
+        if key not in self._wrapped:
+            self._wrapped[key] = ComProxy(target, self, label or type(target).__name__)
+        return self._wrapped[key]
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Attribute calls made inside the block to the named phase.
+
+        Args:
+            name: Phase name (phases may be nested; the innermost wins).
+
+        Returns:
+            Context manager.
+        """
+
+        self._phases.append(name)
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self._phases.pop()
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + self.clock() - started
+
+    def invoke(self, kind: str, label: str, thunk: Callable[[], Any], **details: Any) -> Any:
+        started = self.clock()
+        try:
+            return thunk()
+        finally:
+            self.record(label, self.clock() - started)
+
+    def record(self, label: str, seconds: float) -> None:
+        """
+        Record one call duration under the current phase.
+
+        Args:
+            label: Call label.
+            seconds: Call duration.
+
+        Returns:
+            None
+        """
+
+        phase_stats = self.stats.setdefault(self.current_phase, {})
+        stats = phase_stats.setdefault(label, ComCallStats())
+        stats.count += 1
+        stats.durations.append(seconds)
+
+    def call_count(self, phase: Optional[str] = None) -> int:
+        """
+        Return the number of recorded calls, optionally for a single phase.
+
+        Args:
+            phase: Phase name, or None for all phases.
+
+        Returns:
+            Call count.
+        """
+
+        phases = [phase] if phase is not None else list(self.stats)
+        return sum(stats.count for name in phases for stats in self.stats.get(name, {}).values())
+
+    def report(self, top: int = 10) -> str:
+        """
+        Format a per-phase report of the slowest call labels with their histograms.
+
+        Args:
+            top: Maximum number of call labels listed per phase (by total time).
+
+        Returns:
+            Multi-line report text.
+        """
+
+        bucket_labels = [label for _, label in HISTOGRAM_BUCKETS]
+        lines = []
+        for phase, phase_stats in self.stats.items():
+            total = sum(stats.total for stats in phase_stats.values())
+            lines.append(
+                f"[{phase}] calls={self.call_count(phase)} com_time={total * 1000:.3f}ms"
+                f" wall_time={self.phase_seconds.get(phase, total) * 1000:.3f}ms"
+            )
+            lines.append(f"  {'count':>7} {'total_ms':>10} {'mean_us':>10}  " + " ".join(
+                f"{label:>7}" for label in bucket_labels
+            ) + "  call")
+            ranked = sorted(phase_stats.items(), key=lambda item: item[1].total, reverse=True)
+            for label, stats in ranked[:top]:
+                histogram = stats.histogram()
+                lines.append(
+                    f"  {stats.count:>7} {stats.total * 1000:>10.3f} {stats.total / stats.count * 1e6:>10.1f}  "
+                    + " ".join(f"{histogram[name]:>7}" for name in bucket_labels)
+                    + f"  {label}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,368 @@
+"""
+Record the COM traffic of a pivot build and replay it later without Excel.
+"""
+
+from __future__ import annotations
+
+import base64
+import builtins
+import datetime as dt
+import json
+import os
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from .com_profiler import ComProfiler, unwrap
+
+# Version written to (and required from) recording files.
+RECORDING_FORMAT_VERSION = 1
+
+ROOT_HANDLE = 0
+
+LatencyModel = Union[None, float, Callable[[Dict[str, Any]], float]]
+
+
+class RecordedComError(Exception):
+    """
+    Raised during replay when the recorded call raised a non-builtin error.
+
+    Attributes:
+        error_type: Type name of the original exception (e.g. "com_error").
+    """
+
+    def __init__(self, error_type: str, message: str) -> None:
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class ReplayMismatchError(LookupError):
+    """
+    Raised during replay when a call has no matching recorded event.
+    """
+
+
+class ComRecorder(ComProfiler):
+    """
+    Profiler that also records every call, its arguments and its result.
+
+    Set PivotBuilder.profiler to a ComRecorder (or wrap a workbook with it
+    directly) while running against a real Excel instance, then save() the
+    recording. ComReplay can play it back on a machine without Excel.
+
+    Objects returned by Excel are identified by handles, so the recording
+    captures which object each call was made on. Handle 0 is the first object
+    wrapped (normally the workbook).
+
+    Args:
+        clock: Monotonic clock returning seconds (default time.perf_counter).
+
+    Example:
+        recorder = ComRecorder()
+        spec.profiler = recorder
+        spec.generate_pivot()
+        recorder.save("pivot_session.json")
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        super().__init__(clock=clock)
+        self.events: List[Dict[str, Any]] = []
+        # id(object) -> (handle, object); holding the object keeps its id from being reused.
+        self._handles: Dict[int, Tuple[int, Any]] = {}
+
+    def wrap(self, target: Any, label: Optional[str] = None) -> Any:
+        self._handle(unwrap(target))
+        return super().wrap(target, label)
+
+    def invoke(self, kind: str, label: str, thunk: Callable[[], Any], **details: Any) -> Any:
+        event: Dict[str, Any] = {
+            "phase": self.current_phase,
+            "op": kind,
+            "target": self._handle(unwrap(details.get("proxy"))),
+            "name": details.get("name"),
+            "args": [self._encode(arg) for arg in details.get("args", ())],
+            "kwargs": {key: self._encode(value) for key, value in (details.get("kwargs") or {}).items()},
+        }
+        started = self.clock()
+        try:
+            result = thunk()
+        except Exception as exc:
+            event["error"] = {"type": type(exc).__name__, "message": str(exc)}
+            raise
+        else:
+            event["result"] = self._encode(result)
+            return result
+        finally:
+            seconds = self.clock() - started
+            event["seconds"] = seconds
+            self.events.append(event)
+            self.record(label, seconds)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Write the recording to a JSON file.
+
+        Args:
+            path: Output file path.
+
+        Returns:
+            None
+        """
+
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"version": RECORDING_FORMAT_VERSION, "events": self.events}, handle)
+
+    def _handle(self, obj: Any) -> int:
+        key = id(obj)
+        if key not in self._handles:
+            self._handles[key] = (len(self._handles), obj)
+        return self._handles[key][0]
+
+    def _encode(self, value: Any) -> Any:
+        return _encode_value(value, self._handle)
+
+
+class ComReplay:
+    """
+    Play back a ComRecorder recording through stand-ins for the recorded objects.
+
+    book() returns an object that can be used in place of the recorded xw.Book:
+    each attribute get, set, call, iteration and index consumes the next matching
+    recorded event and returns the recorded result, or raises the recorded error.
+    Matching is per object, operation, name and arguments, in recorded order, so
+    the same pivot code path replays deterministically.
+
+    Args:
+        events: Recorded events (ComRecorder.events).
+        latency: Delay injected before each replayed call: None for none, a fixed
+            number of seconds, or a callable taking the event and returning seconds
+            (see recorded_latency).
+        sleep: Function used to wait (default time.sleep).
+
+    Attributes:
+        calls: Number of replayed calls.
+        mismatches: Descriptions of calls that had no matching recorded event.
+
+    Example:
+        replay = ComReplay.load("pivot_session.json", latency=0.0005)
+        spec.workbook = replay.book()
+        spec.generate_pivot()
+        assert not replay.mismatches
+    """
+
+    def __init__(
+        self,
+        events: List[Dict[str, Any]],
+        latency: LatencyModel = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.latency = latency
+        self.sleep = sleep
+        self.calls = 0
+        self.mismatches: List[str] = []
+        self._queues: Dict[Tuple[Any, ...], Deque[Dict[str, Any]]] = {}
+        self._objects: Dict[int, ReplayObject] = {}
+        for event in events:
+            self._queues.setdefault(_event_key(event), deque()).append(event)
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, os.PathLike],
+        latency: LatencyModel = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> "ComReplay":
+        """
+        Load a recording written by ComRecorder.save.
+
+        Args:
+            path: Recording file path.
+            latency: Delay injected before each replayed call (see ComReplay).
+            sleep: Function used to wait (default time.sleep).
+
+        Returns:
+            A ComReplay over the recorded events.
+
+        Raises:
+            ValueError: When the file has an unsupported format version.
+        """
+
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+        if payload.get("version") != RECORDING_FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording format version: {payload.get('version')!r}")
+        return cls(payload["events"], latency=latency, sleep=sleep)
+
+    def book(self) -> "ReplayObject":
+        """
+        Return the stand-in for the first recorded object (normally the workbook).
+
+        Returns:
+            ReplayObject for handle 0.
+        """
+
+        return self._object(ROOT_HANDLE)
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _play(
+        self,
+        handle: int,
+        kind: str,
+        name: Optional[str] = None,
+        args: Tuple[Any, ...] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        event = {
+            "target": handle,
+            "op": kind,
+            "name": name,
+            "args": [_encode_value(arg, _replay_handle) for arg in args],
+            "kwargs": {key: _encode_value(value, _replay_handle) for key, value in (kwargs or {}).items()},
+        }
+        queue = self._queues.get(_event_key(event))
+        if not queue:
+            description = f"{kind} {name or ''} on handle {handle} with args {event['args']}"
+            self.mismatches.append(description)
+            raise ReplayMismatchError(f"No recorded event for {description}")
+        recorded = queue.popleft()
+        self.calls += 1
+        delay = self.latency(recorded) if callable(self.latency) else self.latency
+        if delay:
+            self.sleep(delay)
+        if "error" in recorded:
+            raise _recorded_error(recorded["error"])
+        return self._decode(recorded.get("result"))
+
+    def _object(self, handle: int) -> "ReplayObject":
+        if handle not in self._objects:
+            self._objects[handle] = ReplayObject(self, handle)
+        return self._objects[handle]
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "$ref" in value:
+            return self._object(value["$ref"])
+        if "$tuple" in value:
+            return tuple(self._decode(item) for item in value["$tuple"])
+        if "$dict" in value:
+            return {self._decode(k): self._decode(v) for k, v in value["$dict"]}
+        if "$datetime" in value:
+            return dt.datetime.fromisoformat(value["$datetime"])
+        if "$date" in value:
+            return dt.date.fromisoformat(value["$date"])
+        if "$time" in value:
+            return dt.time.fromisoformat(value["$time"])
+        if "$bytes" in value:
+            return base64.b64decode(value["$bytes"])
+        return value
+
+
+class ReplayObject:
+    """
+    Stand-in for one recorded Excel object; every access is served from the recording.
+
+    Args:
+        replay: Owning ComReplay.
+        handle: Recorded object handle.
+    """
+
+    __slots__ = ("_replay", "_handle")
+
+    def __init__(self, replay: ComReplay, handle: int) -> None:
+        object.__setattr__(self, "_replay", replay)
+        object.__setattr__(self, "_handle", handle)
+
+    def __getattr__(self, name: str) -> Any:
+        return self._replay._play(self._handle, "get", name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._replay._play(self._handle, "set", name, (value,))
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._replay._play(self._handle, "call", None, args, kwargs)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._replay._play(self._handle, "iter"))
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._replay._play(self._handle, "item", None, (key,))
+
+    def __len__(self) -> int:
+        return self._replay._play(self._handle, "len")
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f"ReplayObject(handle={self._handle})"
+
+
+def recorded_latency(scale: float = 1.0) -> Callable[[Dict[str, Any]], float]:
+    """
+    Return a latency model that replays each call's recorded duration.
+
+    Args:
+        scale: Multiplier applied to recorded durations (e.g. 0.5 for half speed-up).
+
+    Returns:
+        Callable usable as ComReplay latency.
+    """
+
+    def latency(event: Dict[str, Any]) -> float:
+        return event.get("seconds", 0.0) * scale
+
+    return latency
+
+
+def _event_key(event: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        event["target"],
+        event["op"],
+        event.get("name"),
+        json.dumps(event.get("args", []), sort_keys=True),
+        json.dumps(event.get("kwargs", {}), sort_keys=True),
+    )
+
+
+def _encode_value(value: Any, object_handle: Callable[[Any], int]) -> Any:
+    value = unwrap(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return _encode_value(value.value, object_handle)
+    if isinstance(value, list):
+        return [_encode_value(item, object_handle) for item in value]
+    if isinstance(value, tuple):
+        return {"$tuple": [_encode_value(item, object_handle) for item in value]}
+    if isinstance(value, dict):
+        return {"$dict": [[_encode_value(k, object_handle), _encode_value(v, object_handle)] for k, v in value.items()]}
+    if isinstance(value, dt.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, dt.date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, dt.time):
+        return {"$time": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"$bytes": base64.b64encode(value).decode("ascii")}
+    return {"$ref": object_handle(value)}
+
+
+def _replay_handle(value: Any) -> int:
+    if isinstance(value, ReplayObject):
+        return object.__getattribute__(value, "_handle")
+    raise ReplayMismatchError(f"Object {value!r} was not produced by the replay.")
+
+
+def _recorded_error(error: Dict[str, str]) -> Exception:
+    # Builtin exception types are re-raised as themselves so except clauses still match.
+    error_type = getattr(builtins, error["type"], None)
+    if isinstance(error_type, type) and issubclass(error_type, Exception):
+        return error_type(error["message"])
+    return RecordedComError(error["type"], error["message"])
@@ -0,0 +1,344 @@
+"""
+Actor that owns Excel on one dedicated thread, with a queue-based and asyncio API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, TypeVar
+
+from .app_pool import _hidden_app
+from .pivot_util import PivotBatchReport, generate_pivot, generate_pivots
+
+if TYPE_CHECKING:
+    import xlwings as xw
+
+    from .pivot_builder import PivotBuilder
+
+T = TypeVar("T")
+
+# Queue item that tells the actor thread to shut down.
+_STOP = object()
+
+
+class ExcelActor:
+    """
+    Run every Excel call on a single thread that owns the App and its workbooks.
+
+    COM objects are apartment-threaded, so the App, workbooks and everything
+    reached from them stay on the actor thread; callers refer to open
+    workbooks by handle (the workbook's absolute path). Commands are queued and
+    run one at a time in submission order. Each command returns a
+    concurrent.futures.Future from submit(), or can be awaited through the
+    async methods, so an asyncio service keeps doing file I/O and data
+    preparation while Excel works.
+
+    Args:
+        app_factory: Callable returning the App, run on the actor thread
+            (default: hidden xw.App with no book).
+
+    Example:
+        async with ExcelActor() as excel:
+            handle = await excel.open_workbook(path)
+            await excel.generate_pivot(handle, spec)
+            await excel.save(handle)
+    """
+
+    def __init__(self, app_factory: Optional[Callable[[], "xw.App"]] = None) -> None:
+        self.app_factory = app_factory or _hidden_app
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._started: Future = Future()
+        # Guards _stopped so no command is queued after the pending ones are rejected.
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._app: Any = None
+        self._books: Dict[str, Any] = {}
+
+    @property
+    def thread(self) -> Optional[threading.Thread]:
+        return self._thread
+
+    def start(self) -> None:
+        """
+        Start the actor thread and wait until its App is running.
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError: When the actor was already started.
+            Exception: Whatever the App factory raised.
+        """
+
+        if self._thread is not None:
+            raise RuntimeError("ExcelActor was already started.")
+        self._thread = threading.Thread(target=self._run, name="ExcelActor", daemon=True)
+        self._thread.start()
+        self._started.result()
+
+    def stop(self) -> None:
+        """
+        Finish queued commands, close open workbooks without saving, quit the App.
+
+        Returns:
+            None
+        """
+
+        if self._thread is None or not self._thread.is_alive():
+            return
+        with self._lock:
+            if not self._stopped:
+                self._stopped = True
+                self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self) -> "ExcelActor":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.stop()
+        return False
+
+    async def __aenter__(self) -> "ExcelActor":
+        await asyncio.to_thread(self.start)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        await asyncio.to_thread(self.stop)
+        return False
+
+    def submit(self, command: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """
+        Queue a callable to run on the actor thread.
+
+        Args:
+            command: Callable to run; it may use COM objects freely.
+            *args: Positional arguments for command.
+            **kwargs: Keyword arguments for command.
+
+        Returns:
+            Future resolving to the callable's result or exception.
+
+        Raises:
+            RuntimeError: When the actor is not running or is stopping.
+        """
+
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None or self._stopped:
+                raise RuntimeError("ExcelActor is not running.")
+            self._queue.put((future, command, args, kwargs))
+        return future
+
+    async def call(self, command: Callable[..., T], *args: Any) -> T:
+        """
+        Run command(app, *args) on the actor thread and await its result.
+
+        Args:
+            command: Callable taking the App followed by args.
+            *args: Extra arguments.
+
+        Returns:
+            The command's result.
+        """
+
+        return await asyncio.wrap_future(self.submit(lambda: command(self._app, *args)))
+
+    async def open_workbook(self, path: str) -> str:
+        """
+        Open a workbook (or reuse it if this actor already opened it).
+
+        Args:
+            path: Workbook path.
+
+        Returns:
+            Handle used by the other commands.
+        """
+
+        return await asyncio.wrap_future(self.submit(self._open_workbook, path))
+
+    async def generate_pivot(self, handle: str, spec: "PivotBuilder") -> None:
+        """
+        Generate a pivot in an open workbook.
+
+        Args:
+            handle: Handle from open_workbook.
+            spec: PivotBuilder; its workbook attribute is ignored.
+
+        Returns:
+            None
+        """
+
+        return await asyncio.wrap_future(
+            self.submit(lambda: generate_pivot(replace(spec, workbook=self._book(handle))))
+        )
+
+    async def generate_pivots(self, handle: str, specs: Sequence["PivotBuilder"]) -> PivotBatchReport:
+        """
+        Generate several pivots in an open workbook, sharing caches per table.
+
+        Args:
+            handle: Handle from open_workbook.
+            specs: PivotBuilders; their workbook attributes are ignored.
+
+        Returns:
+            PivotBatchReport from generate_pivots.
+        """
+
+        return await asyncio.wrap_future(
+            self.submit(lambda: generate_pivots([replace(spec, workbook=self._book(handle)) for spec in specs]))
+        )
+
+    async def write_range(self, handle: str, sheet_name: str, address: str, values: Any) -> None:
+        """
+        Write values to a range in one call.
+
+        Args:
+            handle: Handle from open_workbook.
+            sheet_name: Sheet name.
+            address: Top-left cell or range address (e.g. "A1").
+            values: Scalar, row list or list of rows.
+
+        Returns:
+            None
+        """
+
+        def write() -> None:
+            self._book(handle).sheets[sheet_name].range(address).value = values
+
+        return await asyncio.wrap_future(self.submit(write))
+
+    async def read_range(self, handle: str, sheet_name: str, address: str) -> Any:
+        """
+        Read the values of a range.
+
+        Args:
+            handle: Handle from open_workbook.
+            sheet_name: Sheet name.
+            address: Range address.
+
+        Returns:
+            The range value as xlwings returns it.
+        """
+
+        return await asyncio.wrap_future(
+            self.submit(lambda: self._book(handle).sheets[sheet_name].range(address).value)
+        )
+
+    async def save(self, handle: str, path: Optional[str] = None) -> None:
+        """
+        Save an open workbook.
+
+        Args:
+            handle: Handle from open_workbook.
+            path: Optional path to save as.
+
+        Returns:
+            None
+        """
+
+        return await asyncio.wrap_future(self.submit(lambda: self._book(handle).save(path)))
+
+    async def close_workbook(self, handle: str) -> None:
+        """
+        Close an open workbook without saving.
+
+        Args:
+            handle: Handle from open_workbook.
+
+        Returns:
+            None
+        """
+
+        return await asyncio.wrap_future(self.submit(self._close_workbook, handle))
+
+    def _run(self) -> None:
+        com = _initialize_com()
+        try:
+            self._app = self.app_factory()
+        except BaseException as exc:
+            with self._lock:
+                self._stopped = True
+            self._started.set_exception(exc)
+            _uninitialize_com(com)
+            return
+        self._started.set_result(None)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                future, command, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(command(*args, **kwargs))
+                except BaseException as exc:
+                    future.set_exception(exc)
+        finally:
+            # Refuse new commands before draining, so none is left unresolved.
+            with self._lock:
+                self._stopped = True
+            self._shutdown()
+            _uninitialize_com(com)
+            self._reject_pending()
+
+    def _reject_pending(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(RuntimeError("ExcelActor stopped before the command ran."))
+
+    def _shutdown(self) -> None:
+        for book in self._books.values():
+            try:
+                book.close()
+            except Exception:
+                continue
+        self._books.clear()
+        try:
+            self._app.quit()
+        except Exception:
+            pass
+
+    def _open_workbook(self, path: str) -> str:
+        handle = os.path.abspath(path)
+        if handle not in self._books:
+            self._books[handle] = self._app.books.open(handle)
+        return handle
+
+    def _close_workbook(self, handle: str) -> None:
+        book = self._book(handle)
+        del self._books[handle]
+        book.close()
+
+    def _book(self, handle: str) -> Any:
+        try:
+            return self._books[handle]
+        except KeyError:
+            raise KeyError(f"No open workbook for handle '{handle}'.") from None
+
+
+def _initialize_com() -> Any:
+    # COM must be initialised on the thread that uses it; pywin32 is Windows-only.
+    try:
+        import pythoncom
+    except ImportError:
+        return None
+    pythoncom.CoInitialize()
+    return pythoncom
+
+
+def _uninitialize_com(com: Any) -> None:
+    if com is not None:
+        com.CoUninitialize()
@@ -0,0 +1,108 @@
+"""
+Context manager that suspends Excel screen updating, calculation, events and alerts.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import xlwings as xw
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ExcelPerformanceSession:
+    """
+    Suspend Excel UI work while a block writes to a workbook, then restore it.
+
+    On entry the current ScreenUpdating, Calculation, EnableEvents and
+    DisplayAlerts values are saved and replaced; on exit they are restored
+    exactly, in reverse order, even when the block raises. Sessions can be
+    nested (including re-entering the same instance): each level restores the
+    state it found. A setting that cannot be restored raises after the
+    others are restored, unless the block itself raised; that error is kept
+    and the restore failure is logged.
+
+    Args:
+        app: xlwings App whose settings are suspended.
+        screen_updating: ScreenUpdating value inside the session (default False).
+        calculation: Calculation mode inside the session (default "manual").
+        enable_events: EnableEvents value inside the session (default False).
+        display_alerts: DisplayAlerts value inside the session (default False).
+
+    Attributes:
+        elapsed: Duration in seconds of the most recently exited session, or None.
+        durations: Durations in seconds of every exited session, in exit order.
+
+    Example:
+        with ExcelPerformanceSession(wb.app) as session:
+            wb.sheets[0].range("A1").value = rows
+        print(session.elapsed)
+    """
+
+    # xlwings App attribute names, in the order they are applied.
+    _SETTINGS = ("screen_updating", "calculation", "enable_events", "display_alerts")
+
+    def __init__(
+        self,
+        app: "xw.App",
+        screen_updating: bool = False,
+        calculation: str = "manual",
+        enable_events: bool = False,
+        display_alerts: bool = False,
+    ) -> None:
+        self.app = app
+        self.settings: Dict[str, Any] = {
+            "screen_updating": screen_updating,
+            "calculation": calculation,
+            "enable_events": enable_events,
+            "display_alerts": display_alerts,
+        }
+        self.elapsed: Optional[float] = None
+        self.durations: List[float] = []
+        self._saved: List[Dict[str, Any]] = []
+        self._started: List[float] = []
+
+    def __enter__(self) -> "ExcelPerformanceSession":
+        saved = {name: getattr(self.app, name) for name in self._SETTINGS}
+        self._saved.append(saved)
+        self._started.append(time.perf_counter())
+        try:
+            for name in self._SETTINGS:
+                if saved[name] != self.settings[name]:
+                    setattr(self.app, name, self.settings[name])
+        except BaseException as exc:
+            self._restore(exc)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._restore(exc)
+        return False
+
+    def _restore(self, in_flight: Optional[BaseException] = None) -> None:
+        saved = self._saved.pop()
+        started = self._started.pop()
+        first_error: Optional[BaseException] = None
+        try:
+            for name in reversed(self._SETTINGS):
+                try:
+                    if getattr(self.app, name) != saved[name]:
+                        setattr(self.app, name, saved[name])
+                except Exception as exc:
+                    # Keep restoring the remaining settings before surfacing the failure.
+                    if first_error is None:
+                        first_error = exc
+        finally:
+            self.elapsed = time.perf_counter() - started
+            self.durations.append(self.elapsed)
+        if first_error is None:
+            return
+        if in_flight is None:
+            raise first_error
+        # Never replace the block's own error with a restore failure.
+        _LOGGER.warning("Could not restore Excel settings: %s", first_error, exc_info=first_error)
@@ -0,0 +1,122 @@
+"""
+Content fingerprints of xlsx files from the zip central directory, without decompressing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import posixpath
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+from .errors import ValidationError
+from .xlsx_reader import (
+    _SHARED_STRINGS_REL_TYPE,
+    _STYLES_REL_TYPE,
+    _TABLE_REL_TYPE,
+    _find_sheet_part,
+    _find_table,
+    _related_parts,
+)
+
+
+# Workbook parts that affect every sheet's values: sheet names and the date system.
+_WORKBOOK_PARTS = ("xl/workbook.xml", "xl/_rels/workbook.xml.rels")
+
+
+def xlsx_fingerprint(
+    path: Union[str, os.PathLike],
+    sheet_name: Optional[str] = None,
+    table_name: Optional[str] = None,
+) -> str:
+    """
+    Fingerprint an xlsx file from the name, size and CRC-32 of its zip members.
+
+    Opening the zip reads only its central directory at the end of the file,
+    which already records each member's CRC-32, so nothing is decompressed and
+    the cost is a few kilobytes of I/O whatever the workbook size.
+
+    With sheet_name or table_name, only the parts that determine that sheet's
+    (or table's) values are included: the sheet, its relationships and table
+    parts, shared strings, styles and the workbook part. Edits elsewhere, and
+    the document properties Excel rewrites on every save, then leave the
+    fingerprint unchanged. Locating the sheet inflates the small workbook and
+    relationship parts.
+
+    Args:
+        path: Workbook path (.xlsx or .xlsm).
+        sheet_name: Limit the fingerprint to this sheet.
+        table_name: Limit the fingerprint to the sheet holding this Excel Table.
+
+    Returns:
+        Hex digest.
+
+    Raises:
+        zipfile.BadZipFile: When the file is not a zip package.
+        ValidationError: When the sheet or table does not exist.
+    """
+
+    with zipfile.ZipFile(os.fspath(path)) as package:
+        members = {info.filename: info for info in package.infolist()}
+        if sheet_name is None and table_name is None:
+            names: Iterable[str] = members
+        else:
+            names = _scoped_parts(package, sheet_name, table_name)
+        digest = hashlib.blake2b(digest_size=16)
+        for name in sorted(set(names)):
+            info = members.get(name)
+            if info is not None:
+                digest.update(f"{name}\0{info.file_size}\0{info.CRC:08x}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fingerprint_many(
+    paths: Iterable[Union[str, os.PathLike]],
+    sheet_name: Optional[str] = None,
+    table_name: Optional[str] = None,
+    max_workers: int = 8,
+) -> Dict[str, Optional[str]]:
+    """
+    Fingerprint many workbooks concurrently (the work is small, latency-bound reads).
+
+    Args:
+        paths: Workbook paths.
+        sheet_name: Limit each fingerprint to this sheet.
+        table_name: Limit each fingerprint to this Excel Table's sheet.
+        max_workers: Threads used for the reads (default 8).
+
+    Returns:
+        Absolute path to fingerprint, or None for files that are missing, not
+        zip packages, or lack the sheet or table.
+    """
+
+    resolved = [os.path.abspath(os.fspath(path)) for path in paths]
+
+    def one(path: str) -> Optional[str]:
+        try:
+            return xlsx_fingerprint(path, sheet_name=sheet_name, table_name=table_name)
+        except (OSError, zipfile.BadZipFile, ValidationError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        return dict(zip(resolved, executor.map(one, resolved)))
+
+
+def _scoped_parts(package: zipfile.ZipFile, sheet_name: Optional[str], table_name: Optional[str]) -> List[str]:
+    if table_name is not None:
+        sheet_part = _find_table(package, table_name).sheet_part
+    else:
+        sheet_part = _find_sheet_part(package, sheet_name)
+    folder, name = posixpath.split(sheet_part)
+    sheet_rels = posixpath.join(folder, "_rels", name + ".rels")
+    return [
+        *_WORKBOOK_PARTS,
+        # Shared strings and number formats decide how the sheet's cells decode.
+        *_related_parts(package, "xl/workbook.xml", _SHARED_STRINGS_REL_TYPE),
+        *_related_parts(package, "xl/workbook.xml", _STYLES_REL_TYPE),
+        sheet_part,
+        sheet_rels,
+        *_related_parts(package, sheet_part, _TABLE_REL_TYPE),
+    ]
@@ -4,15 +4,18 @@ PivotBuilder dataclass that validates and generates pivot tables from Excel tabl
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass, field
-from typing import List, Optional
-
-import xlwings as xw
+from typing import TYPE_CHECKING, List, Optional, Union
 
+from .com_profiler import ComProfiler
 from .constants import DestinationHandling
 from .fields import ColumnField, DataField, RowField
 from .pivot_util import generate_pivot
 
+if TYPE_CHECKING:
+    import xlwings as xw
+
 
 @dataclass
 class PivotBuilder:
@@ -20,7 +23,8 @@ class PivotBuilder:
     Builder for creating a pivot table from an Excel Table (ListObject).
 
     Args:
-        workbook: Existing xlwings workbook object. Caller owns open/save/close.
+        workbook: Existing xlwings workbook object (caller owns open/save/close), or a
+            path to an .xlsx file to write the pivot into without Excel.
         table_name: Excel table (ListObject) name.
         pivot_sheet_name: Destination worksheet name.
         pivot_table_name: Pivot table name (must be unique in workbook).
@@ -34,6 +38,12 @@ class PivotBuilder:
         max_data_fields: Maximum allowed data fields (default 20).
         table_style: Optional PivotTable style name (e.g., "PivotStyleMedium9").
         show_row_stripes: Whether to enable row stripes on the PivotTable.
+        defer_layout: Whether to hold PivotTable layout updates (ManualUpdate) while
+            fields are configured and refresh once at the end (default False).
+        suspend_excel_updates: Whether to run generation inside an ExcelPerformanceSession
+            (screen updating, calculation, events and alerts suspended) (default False).
+        profiler: Optional ComProfiler that counts and times every workbook and COM call
+            made while generating, grouped by phase.
 
     Raises:
         ValidationError: When the builder fails validation checks.
@@ -45,9 +55,10 @@ class PivotBuilder:
         - Data field count is capped by max_data_fields.
         - Summary functions are limited to SUM, COUNT, and AVG.
         - DestinationHandling.FIND_OR_CREATE uses an empty sheet if present, otherwise creates one.
+        - When workbook is a path, the file is saved in place and Excel renders the pivot on open.
     """
 
-    workbook: xw.Book
+    workbook: Union[xw.Book, str, os.PathLike]
     table_name: str
     destination_handling: DestinationHandling
     pivot_sheet_name: str = "Pivot"
@@ -61,6 +72,9 @@ class PivotBuilder:
     max_data_fields: int = 20
     table_style: Optional[str] = None
     show_row_stripes: bool = True
+    defer_layout: bool = False
+    suspend_excel_updates: bool = False
+    profiler: Optional[ComProfiler] = None
 
     def generate_pivot(self) -> None:
         """
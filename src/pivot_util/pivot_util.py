@@ -4,9 +4,10 @@ Core pivot creation logic that reads a PivotBuilder and builds the pivot table.
 
 from __future__ import annotations
 
-from typing import Iterable, Optional, TYPE_CHECKING
-
-import xlwings as xw
+import os
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
 
 from .constants import (
     DestinationHandling,
@@ -20,11 +21,52 @@ from .constants import (
     XL_AVG,
 )
 from .errors import DestinationError, ValidationError
+from .excel_session import ExcelPerformanceSession
 from .fields import ColumnField, DataField, RowField
+from .workbook_index import WorkbookIndex, _list_object_column_names
 if TYPE_CHECKING:
+    # Annotations only: COM work goes through the Book passed in, so importing
+    # pivot_util never loads xlwings.
+    import xlwings as xw
+
     from .pivot_builder import PivotBuilder
 
 
+# Cells fetched per COM round trip when scanning a used range for content.
+EMPTY_SCAN_CHUNK_CELLS = 65_536
+
+
+@dataclass
+class PivotBatchReport:
+    """
+    Summary of a generate_pivots run.
+
+    Args:
+        caches_created: Number of pivot caches created.
+        caches_reused: Number of pivots built from an already created cache.
+        pivot_table_names: Names of the generated pivot tables, in build order.
+    """
+
+    caches_created: int = 0
+    caches_reused: int = 0
+    pivot_table_names: List[str] = field(default_factory=list)
+
+    def merge(self, other: "PivotBatchReport") -> None:
+        """
+        Add the counts and pivot names from another report to this one.
+
+        Args:
+            other: Report to merge in.
+
+        Returns:
+            None
+        """
+
+        self.caches_created += other.caches_created
+        self.caches_reused += other.caches_reused
+        self.pivot_table_names.extend(other.pivot_table_names)
+
+
 def generate_pivot(spec: "PivotBuilder") -> None:
     """
     Validate and generate a pivot table based on the provided builder.
@@ -40,21 +82,165 @@ def generate_pivot(spec: "PivotBuilder") -> None:
         DestinationError: When destination handling fails.
     """
 
-    list_object = _validate_and_get_table(spec)
-    pivot_sheet = _resolve_destination_sheet(spec)
+    if isinstance(spec.workbook, (str, os.PathLike)):
+        # File-level backend: write the pivot parts into the .xlsx package directly.
+        from .xlsx_backend import generate_pivot_xlsx
+
+        generate_pivot_xlsx(spec)
+        return
+
+    spec = _instrumented(spec)
+    with _excel_sessions([spec]):
+        index = WorkbookIndex(spec.workbook)
+        with _profile_phase(spec, "validation"):
+            list_object = _validate_and_get_table(spec, index)
+        with _profile_phase(spec, "destination"):
+            pivot_sheet = _prepare_destination_sheet(spec, index)
+        with _profile_phase(spec, "cache"):
+            pivot_cache = _create_pivot_cache(spec.workbook, list_object)
+        with _profile_phase(spec, "fields"):
+            _create_and_configure_pivot_table(spec, pivot_cache, pivot_sheet)
+
+
+def generate_pivots(specs: Sequence["PivotBuilder"]) -> PivotBatchReport:
+    """
+    Validate and generate several pivot tables, sharing one pivot cache per source table.
+
+    Builders over the same workbook and table_name are built from a single
+    PivotCache instead of one cache per pivot, which keeps workbook size, save
+    time and Excel memory flat as pivots are added.
+
+    Args:
+        specs: PivotBuilders to generate, in order.
+
+    Returns:
+        PivotBatchReport with the number of caches created and reused.
+
+    Raises:
+        ValidationError: When any builder fails validation checks. Nothing is
+            generated in that case.
+        DestinationError: When destination handling fails. Pivots created in
+            Excel before the failing builder are kept; .xlsx workbooks are only
+            saved once every Excel builder has succeeded, so none is written.
+    """
+
+    report = PivotBatchReport()
+    file_specs = [spec for spec in specs if isinstance(spec.workbook, (str, os.PathLike))]
+    com_specs = [spec for spec in specs if not isinstance(spec.workbook, (str, os.PathLike))]
+
+    com_specs = [_instrumented(spec) for spec in com_specs]
+    _validate_batch_pivot_table_names_unique(com_specs)
+    if file_specs:
+        # Imported only when needed, so Excel-only batches never load openpyxl.
+        from . import xlsx_backend
+    file_workbooks: Dict[str, object] = {}
+    try:
+        with _excel_sessions(com_specs):
+            # One metadata snapshot per workbook serves every builder that targets it.
+            indexes: Dict[int, WorkbookIndex] = {}
+            list_objects = []
+            for spec in com_specs:
+                index = indexes.setdefault(id(spec.workbook), WorkbookIndex(spec.workbook))
+                with _profile_phase(spec, "validation"):
+                    list_objects.append(_validate_and_get_table(spec, index))
+
+            # File builders are built in memory once every Excel builder has passed
+            # validation, and saved only after every Excel pivot has been created.
+            if file_specs:
+                report.merge(xlsx_backend._build_pivots_xlsx(file_specs, file_workbooks))
+
+            caches: Dict[Tuple[int, str], object] = {}
+            for spec, list_object in zip(com_specs, list_objects):
+                index = indexes[id(spec.workbook)]
+                with _profile_phase(spec, "destination"):
+                    pivot_sheet = _prepare_destination_sheet(spec, index)
+                key = (id(spec.workbook), spec.table_name.strip().lower())
+                if key in caches:
+                    report.caches_reused += 1
+                else:
+                    with _profile_phase(spec, "cache"):
+                        caches[key] = _create_pivot_cache(spec.workbook, list_object)
+                    report.caches_created += 1
+                with _profile_phase(spec, "fields"):
+                    _create_and_configure_pivot_table(spec, caches[key], pivot_sheet)
+                index.add_pivot_table(pivot_sheet.name, spec.pivot_table_name)
+                report.pivot_table_names.append(spec.pivot_table_name)
+
+        if file_specs:
+            xlsx_backend._save_workbooks(file_workbooks)
+    finally:
+        if file_specs:
+            xlsx_backend._close_workbooks(file_workbooks)
+
+    return report
+
+
+def _instrumented(spec: "PivotBuilder") -> "PivotBuilder":
+    # Route every workbook access through the profiler's proxy when one is attached.
+    if spec.profiler is None:
+        return spec
+    return replace(spec, workbook=spec.profiler.wrap(spec.workbook))
+
+
+def _profile_phase(spec: "PivotBuilder", name: str):
+    if spec.profiler is None:
+        return nullcontext()
+    return spec.profiler.phase(name)
+
+
+def _excel_sessions(specs: Iterable["PivotBuilder"]) -> ExitStack:
+    # One performance session per Excel instance used by a builder that asks for it.
+    stack = ExitStack()
+    apps = {}
+    for spec in specs:
+        if spec.suspend_excel_updates:
+            app = spec.workbook.app
+            apps.setdefault(id(app), app)
+    try:
+        for app in apps.values():
+            stack.enter_context(ExcelPerformanceSession(app))
+    except BaseException:
+        stack.close()
+        raise
+    return stack
+
+
+def _prepare_destination_sheet(spec: "PivotBuilder", index: Optional[WorkbookIndex] = None) -> xw.Sheet:
+    index = index or WorkbookIndex(spec.workbook)
+    pivot_sheet = _resolve_destination_sheet(spec, index)
 
     # Optional clearing behavior based on destination handling.
     if spec.destination_handling == DestinationHandling.EXISTING_FORCE_CLEAR:
         pivot_sheet.clear()
+        index.clear_sheet(spec.pivot_sheet_name)
+    return pivot_sheet
+
 
+def _create_pivot_cache(workbook: xw.Book, list_object):
     # The pivot cache source range should be the Table's range (includes headers).
     source_range = list_object.Range  # COM Range
+    return workbook.api.PivotCaches().Create(XL_DATABASE, source_range)  # type: ignore[attr-defined]
 
-    # Build the pivot cache and pivot table at the requested top-left cell.
-    pivot_cache = spec.workbook.api.PivotCaches().Create(XL_DATABASE, source_range)  # type: ignore[attr-defined]
+
+def _create_and_configure_pivot_table(spec: "PivotBuilder", pivot_cache, pivot_sheet: xw.Sheet):
+    # Build the pivot table at the requested top-left cell.
     dest = pivot_sheet.range(spec.pivot_top_left_cell).api  # COM Range
     pivot_table = pivot_cache.CreatePivotTable(dest, spec.pivot_table_name)
 
+    if spec.defer_layout:
+        # Hold layout recalculation until every field is configured, then refresh once.
+        pivot_table.ManualUpdate = True
+        try:
+            _configure_pivot_table(spec, pivot_table)
+        finally:
+            pivot_table.ManualUpdate = False
+        pivot_table.RefreshTable()
+    else:
+        _configure_pivot_table(spec, pivot_table)
+    return pivot_table
+
+
+def _configure_pivot_table(spec: "PivotBuilder", pivot_table) -> None:
     # Configure row fields (outer to inner).
     for idx, row_field in enumerate(spec.row_fields, start=1):
         pf = pivot_table.PivotFields(row_field.name)
@@ -86,18 +272,30 @@ def generate_pivot(spec: "PivotBuilder") -> None:
     pivot_table.ShowTableStyleRowStripes = bool(spec.show_row_stripes)
 
 
-def _validate_and_get_table(spec: "PivotBuilder"):
+def _validate_and_get_table(spec: "PivotBuilder", index: Optional[WorkbookIndex] = None):
     _validate_spec_inputs(spec)
-    list_object = _find_list_object(spec.workbook, spec.table_name)
-    if list_object is None:
+    index = index or WorkbookIndex(spec.workbook)
+    entry = index.table(spec.table_name)
+    if entry is None:
         raise ValidationError(f"Table '{spec.table_name}' not found in workbook.")
 
-    column_names = _list_object_column_names(list_object)
+    column_names = index.column_names(entry)
     _validate_unique_column_names(column_names)
     _validate_field_names_exist(spec.row_fields, spec.column_fields, spec.data_fields, column_names)
-    _validate_pivot_table_name_unique(spec.workbook, spec.pivot_table_name)
+    _validate_pivot_table_name_unique(spec.workbook, spec.pivot_table_name, index)
+
+    return entry.list_object
 
-    return list_object
+
+def _validate_batch_pivot_table_names_unique(specs: Iterable["PivotBuilder"]) -> None:
+    seen = set()
+    for spec in specs:
+        key = (id(spec.workbook), spec.pivot_table_name)
+        if key in seen:
+            raise ValidationError(
+                f"Pivot table name '{spec.pivot_table_name}' is used more than once in the batch."
+            )
+        seen.add(key)
 
 
 def _validate_spec_inputs(spec: "PivotBuilder") -> None:
@@ -126,13 +324,10 @@ def _validate_spec_inputs(spec: "PivotBuilder") -> None:
             )
 
 
-def _resolve_destination_sheet(spec: "PivotBuilder") -> xw.Sheet:
+def _resolve_destination_sheet(spec: "PivotBuilder", index: Optional[WorkbookIndex] = None) -> xw.Sheet:
     handling = spec.destination_handling
-
-    try:
-        existing_sheet = spec.workbook.sheets[spec.pivot_sheet_name]
-    except Exception:
-        existing_sheet = None
+    index = index or WorkbookIndex(spec.workbook)
+    existing_sheet = index.sheet(spec.pivot_sheet_name)
 
     if existing_sheet is not None:
         if handling == DestinationHandling.NEW:
@@ -156,24 +351,14 @@ def _resolve_destination_sheet(spec: "PivotBuilder") -> xw.Sheet:
             raise DestinationError(f"Sheet '{spec.pivot_sheet_name}' was not found.")
 
     # FIND_OR_CREATE or NEW and the sheet does not exist.
-    return spec.workbook.sheets.add(spec.pivot_sheet_name, after=spec.workbook.sheets[-1])
-
-
-def _find_list_object(workbook: xw.Book, table_name: str):
-    for sheet in workbook.sheets:
-        try:
-            return sheet.api.ListObjects(table_name)  # type: ignore[attr-defined]
-        except Exception:
-            continue
-    return None
+    new_sheet = spec.workbook.sheets.add(spec.pivot_sheet_name, after=index.last_sheet)
+    index.add_sheet(new_sheet)
+    return new_sheet
 
 
-def _list_object_column_names(list_object) -> list[str]:
-    try:
-        columns = list_object.ListColumns
-        return [columns.Item(i).Name for i in range(1, columns.Count + 1)]
-    except Exception:
-        return []
+def _find_list_object(workbook: xw.Book, table_name: str, index: Optional[WorkbookIndex] = None):
+    entry = (index or WorkbookIndex(workbook)).table(table_name)
+    return entry.list_object if entry is not None else None
 
 
 def _validate_unique_column_names(column_names: Iterable[str]) -> None:
@@ -198,18 +383,13 @@ def _validate_field_names_exist(
         raise ValidationError(f"Fields not found in table: {', '.join(missing)}")
 
 
-def _validate_pivot_table_name_unique(workbook: xw.Book, pivot_table_name: str) -> None:
-    for sheet in workbook.sheets:
-        try:
-            pivot_tables = sheet.api.PivotTables()
-            count = pivot_tables.Count
-        except Exception:
-            continue
-        for i in range(1, count + 1):
-            if pivot_tables.Item(i).Name == pivot_table_name:
-                raise ValidationError(
-                    f"Pivot table name '{pivot_table_name}' already exists."
-                )
+def _validate_pivot_table_name_unique(
+    workbook: xw.Book, pivot_table_name: str, index: Optional[WorkbookIndex] = None
+) -> None:
+    if (index or WorkbookIndex(workbook)).pivot_table_sheet(pivot_table_name) is not None:
+        raise ValidationError(
+            f"Pivot table name '{pivot_table_name}' already exists."
+        )
 
 
 def _summary_function_to_excel(function: SummaryFunction) -> int:
@@ -223,8 +403,38 @@ def _summary_function_to_excel(function: SummaryFunction) -> int:
 
 
 def _is_sheet_empty(sheet: xw.Sheet) -> bool:
-    values = sheet.used_range.value
-    return _is_empty_value(values)
+    used_range = sheet.used_range
+    # Let Excel count the non-blank cells so the grid never crosses COM.
+    if _count_non_blank(sheet, used_range) == 0:
+        return True
+    # CountA also counts whitespace-only text, which is empty here; confirm by scanning.
+    scanned = _scan_is_empty(sheet, used_range)
+    if scanned is not None:
+        return scanned
+    return _is_empty_value(used_range.value)
+
+
+def _count_non_blank(sheet: xw.Sheet, used_range: xw.Range) -> Optional[int]:
+    try:
+        return int(sheet.api.Application.WorksheetFunction.CountA(used_range.api))
+    except Exception:
+        return None
+
+
+def _scan_is_empty(sheet: xw.Sheet, used_range: xw.Range) -> Optional[bool]:
+    try:
+        first_row, first_column = used_range.row, used_range.column
+        row_count, column_count = used_range.shape
+    except Exception:
+        return None
+    last_row = first_row + row_count - 1
+    last_column = first_column + column_count - 1
+    rows_per_chunk = max(1, EMPTY_SCAN_CHUNK_CELLS // column_count)
+    for start in range(first_row, last_row + 1, rows_per_chunk):
+        end = min(start + rows_per_chunk - 1, last_row)
+        if not _is_empty_value(sheet.range((start, first_column), (end, last_column)).value):
+            return False
+    return True
 
 
 def _is_empty_value(value: Optional[object]) -> bool:
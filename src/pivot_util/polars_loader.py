@@ -0,0 +1,383 @@
+"""
+Load Excel sheets into polars DataFrames straight from the file, without Excel.
+"""
+
+from __future__ import annotations
+
+import glob
+import importlib.util
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+import polars as pl
+
+from .errors import ValidationError
+from .xlsx_reader import iter_sheet_batches, read_table
+
+if TYPE_CHECKING:
+    from .pivot_builder import PivotBuilder
+    from .sheet_cache import SheetCache
+
+
+# Engines in fallback order, fastest first.
+ENGINES = ("calamine", "openpyxl", "xlsx2csv")
+
+# Rows parsed before a block is converted to columns and filtered.
+PROJECTED_CHUNK_ROWS = 50_000
+
+# Column read_many adds to tag each row with its workbook.
+SOURCE_FILE_COLUMN = "source_file"
+
+# Python module each engine needs.
+_ENGINE_MODULES = {
+    "calamine": "fastexcel",
+    "openpyxl": "openpyxl",
+    "xlsx2csv": "xlsx2csv",
+}
+
+
+@dataclass
+class EngineTiming:
+    """
+    One measurement from benchmark_engines.
+
+    Args:
+        path: Workbook that was read.
+        engine: Engine name.
+        seconds: Best read time over the repeats, or None when the read failed.
+        rows: Rows read.
+        columns: Columns read.
+        error: Why the engine could not read the workbook.
+    """
+
+    path: str
+    engine: str
+    seconds: Optional[float]
+    rows: int = 0
+    columns: int = 0
+    error: Optional[str] = None
+
+
+def resolve_workbook_path(path: Union[str, os.PathLike], base_dir: Optional[str] = None) -> str:
+    """
+    Resolve a workbook path on disk without opening it.
+
+    Args:
+        path: Absolute path, or a path relative to base_dir.
+        base_dir: Directory for relative paths (default: the working directory).
+
+    Returns:
+        Absolute, normalized path.
+
+    Raises:
+        FileNotFoundError: When no file exists at the path.
+    """
+
+    path = os.path.expanduser(os.fspath(path))
+    if base_dir is not None and not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    resolved = os.path.abspath(path)
+    if not os.path.isfile(resolved):
+        raise FileNotFoundError(f"Workbook not found: {resolved}")
+    return resolved
+
+
+def available_engines() -> List[str]:
+    """
+    Return the engines whose parser is installed, in fallback order.
+
+    Returns:
+        Engine names.
+    """
+
+    return [engine for engine in ENGINES if importlib.util.find_spec(_ENGINE_MODULES[engine]) is not None]
+
+
+def read_sheet(
+    path: Union[str, os.PathLike],
+    sheet_name: Optional[str] = None,
+    engine: Union[str, Sequence[str], None] = None,
+    cache: Optional["SheetCache"] = None,
+    **read_options: Any,
+) -> pl.DataFrame:
+    """
+    Read one sheet into a DataFrame with the first usable engine.
+
+    Engines whose parser is not installed are skipped. An engine that fails
+    to read the file is also skipped, since the engines accept different
+    files; when every installed engine fails, the first engine's error is
+    raised, with the others' errors attached as notes.
+
+    Args:
+        path: Workbook path.
+        sheet_name: Sheet to read (default: the first sheet).
+        engine: Engine name or names to try in order (default: ENGINES).
+        cache: Optional SheetCache; an unchanged workbook is then parsed only once.
+        **read_options: Passed to pl.read_excel (e.g. read_options, schema_overrides).
+
+    Returns:
+        The sheet as a DataFrame.
+
+    Raises:
+        FileNotFoundError: When the workbook does not exist.
+        ValueError: When an engine name is unknown.
+        ImportError: When none of the engines is installed.
+        Exception: The first engine's error, when every installed engine fails.
+    """
+
+    resolved = resolve_workbook_path(path)
+    engines = _engine_order(engine)
+    if cache is not None:
+        what = ("sheet", sheet_name, tuple(engines), sorted(read_options.items()))
+        return cache.get_or_load(
+            resolved, what, lambda: read_sheet(resolved, sheet_name=sheet_name, engine=engines, **read_options)
+        )
+    missing: List[str] = []
+    failures: List[Tuple[str, Exception]] = []
+    for name in engines:
+        if importlib.util.find_spec(_ENGINE_MODULES[name]) is None:
+            missing.append(name)
+            continue
+        try:
+            return pl.read_excel(resolved, sheet_name=sheet_name, engine=name, **read_options)
+        except ImportError:
+            missing.append(name)
+        except Exception as exc:
+            # Engines accept different files; try the next one before giving up.
+            failures.append((name, exc))
+    if failures:
+        first_engine, error = failures[0]
+        error.add_note(f"Raised by the {first_engine} engine.")
+        for name, other in failures[1:]:
+            error.add_note(f"The {name} engine also failed: {_error_summary(other)}")
+        raise error
+    raise ImportError(
+        f"No Excel engine available (tried {', '.join(missing)}); "
+        f"install one of: {', '.join(_ENGINE_MODULES[name] for name in engines)}."
+    )
+
+
+def spec_columns(spec: "PivotBuilder") -> List[str]:
+    """
+    Return the source columns a pivot specification uses.
+
+    Args:
+        spec: PivotBuilder whose row, column and data fields name the columns.
+
+    Returns:
+        Column names in field order, without case-insensitive duplicates.
+    """
+
+    names: List[str] = []
+    seen = set()
+    for field in [*spec.row_fields, *spec.column_fields, *spec.data_fields]:
+        if field.name.lower() not in seen:
+            seen.add(field.name.lower())
+            names.append(field.name)
+    return names
+
+
+def read_projected(
+    path: Union[str, os.PathLike, None] = None,
+    columns: Optional[Sequence[str]] = None,
+    filters: Sequence[pl.Expr] = (),
+    spec: Optional["PivotBuilder"] = None,
+    sheet_name: Optional[str] = None,
+    header_row: int = 1,
+    chunk_rows: int = PROJECTED_CHUNK_ROWS,
+) -> pl.DataFrame:
+    """
+    Read only the named columns, and only the rows matching filters, from a sheet.
+
+    The sheet is streamed with the package-XML reader (iter_sheet_batches):
+    cells outside the requested columns are skipped without being decoded,
+    and rows are filtered one block of chunk_rows at a time, so peak memory
+    follows the result rather than the sheet. Rows keep their positions: a
+    row empty in the requested columns is read as nulls, and only the empty
+    rows after the last row holding data are dropped. Column names are
+    matched case-insensitively, as Excel does, and the result uses the
+    header spelling.
+
+    Args:
+        path: Workbook path (default: spec.workbook when it is a path).
+        columns: Columns to read (default: the columns spec uses).
+        filters: polars expressions over the result's columns; rows must match all.
+        spec: PivotBuilder supplying the default path and columns.
+        sheet_name: Sheet to read (default: the first sheet).
+        header_row: 1-based row holding the column names (default 1).
+        chunk_rows: Rows converted and filtered per block (default PROJECTED_CHUNK_ROWS).
+
+    Returns:
+        DataFrame with the requested columns, in request order.
+
+    Raises:
+        ValueError: When neither columns nor spec is given, or no path is known.
+        ValidationError: When the sheet or a requested column does not exist.
+    """
+
+    if columns is None:
+        if spec is None:
+            raise ValueError("Pass columns or a PivotBuilder spec.")
+        columns = spec_columns(spec)
+    if path is None:
+        if spec is None or not isinstance(spec.workbook, (str, os.PathLike)):
+            raise ValueError("Pass a workbook path, or a spec whose workbook is a path.")
+        path = spec.workbook
+    resolved = resolve_workbook_path(path)
+    batches = iter_sheet_batches(
+        resolved, sheet_name, batch_rows=chunk_rows, columns=columns, header_row=header_row, drop_empty_rows=False
+    )
+    blocks = [batch.filter(*filters) if filters else batch for batch in batches]
+    # Blocks infer their own dtypes; relaxed concat widens them (e.g. Int64 with Float64).
+    return pl.concat(blocks, how="vertical_relaxed")
+
+
+def read_many(
+    paths: Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]],
+    sheet_name: Optional[str] = None,
+    table_name: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    source_column: str = SOURCE_FILE_COLUMN,
+) -> pl.LazyFrame:
+    """
+    Read the same sheet or table from many workbooks in parallel into one LazyFrame.
+
+    Workbooks are parsed by a pool of worker processes (one parse per
+    workbook, so throughput grows with cores) with the package-XML reader, and
+    each row is tagged with the absolute path of its workbook. Workbooks must
+    share a layout; column dtypes are widened across files where they differ.
+
+    Args:
+        paths: Glob pattern (e.g. "Regions/*.xlsx") or an iterable of paths.
+        sheet_name: Sheet to read from each workbook (default: the first sheet).
+        table_name: Excel Table to read instead of a sheet.
+        columns: Columns to keep, in order (default: all).
+        max_workers: Worker processes (default: CPU count, at most one per workbook).
+        source_column: Name of the column holding the source path (default "source_file").
+
+    Returns:
+        LazyFrame of all rows, in path order.
+
+    Raises:
+        FileNotFoundError: When the pattern matches nothing or a path does not exist.
+        ValidationError: When a workbook lacks the sheet, table or columns.
+    """
+
+    if isinstance(paths, (str, os.PathLike)):
+        pattern = os.fspath(paths)
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise FileNotFoundError(f"No workbooks match: {pattern}")
+    else:
+        matches = list(paths)
+    jobs = [(resolve_workbook_path(path), sheet_name, table_name, columns, source_column) for path in matches]
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+    if workers <= 1:
+        frames = [_read_source(*job) for job in jobs]
+    else:
+        # Spawned workers start clean, as in batch_runner; results come back as Arrow IPC.
+        with multiprocessing.get_context("spawn").Pool(processes=workers) as pool:
+            frames = pool.starmap(_read_source, jobs, chunksize=1)
+    return pl.concat(frames, how="vertical_relaxed").lazy()
+
+
+def benchmark_engines(
+    paths: Iterable[Union[str, os.PathLike]],
+    sheet_name: Optional[str] = None,
+    engines: Sequence[str] = ENGINES,
+    repeat: int = 3,
+) -> List[EngineTiming]:
+    """
+    Time each engine on each workbook.
+
+    Engines that are not installed or cannot read a workbook are reported with
+    an error instead of a time.
+
+    Args:
+        paths: Workbooks to read.
+        sheet_name: Sheet to read (default: the first sheet).
+        engines: Engines to compare (default: ENGINES).
+        repeat: Reads per engine and workbook; the best time is kept (default 3).
+
+    Returns:
+        One EngineTiming per workbook and engine.
+    """
+
+    timings: List[EngineTiming] = []
+    for path in paths:
+        resolved = resolve_workbook_path(path)
+        for name in engines:
+            timings.append(_time_engine(resolved, sheet_name, name, max(repeat, 1)))
+    return timings
+
+
+def format_timings(timings: Sequence[EngineTiming]) -> str:
+    """
+    Format benchmark results as a fixed-width table.
+
+    Args:
+        timings: Results from benchmark_engines.
+
+    Returns:
+        Multi-line table text.
+    """
+
+    lines = [f"{'workbook':<32} {'engine':<10} {'ms':>9} {'rows':>8} {'cols':>5}"]
+    for timing in timings:
+        name = os.path.basename(timing.path)
+        if timing.seconds is None:
+            lines.append(f"{name:<32} {timing.engine:<10} {'-':>9}  {timing.error}")
+        else:
+            lines.append(
+                f"{name:<32} {timing.engine:<10} {timing.seconds * 1000:>9.2f} {timing.rows:>8} {timing.columns:>5}"
+            )
+    return "\n".join(lines)
+
+
+def _engine_order(engine: Union[str, Sequence[str], None]) -> List[str]:
+    names = list(ENGINES) if engine is None else [engine] if isinstance(engine, str) else list(engine)
+    unknown = [name for name in names if name not in _ENGINE_MODULES]
+    if unknown:
+        raise ValueError(f"Unknown Excel engine(s): {', '.join(unknown)}. Expected one of {', '.join(ENGINES)}.")
+    return names
+
+
+def _read_source(
+    path: str,
+    sheet_name: Optional[str],
+    table_name: Optional[str],
+    columns: Optional[Sequence[str]],
+    source_column: str,
+) -> pl.DataFrame:
+    if table_name is not None:
+        frame = read_table(path, table_name, columns=columns)
+    else:
+        frame = next(iter_sheet_batches(path, sheet_name, batch_rows=None, columns=columns))
+    return frame.with_columns(pl.lit(path).alias(source_column))
+
+
+def _error_summary(exc: Exception) -> str:
+    # polars messages add hint paragraphs; the first line is enough for a summary.
+    message = str(exc).splitlines()[0] if str(exc) else ""
+    return f"{type(exc).__name__}: {message}"
+
+
+def _time_engine(path: str, sheet_name: Optional[str], engine: str, repeat: int) -> EngineTiming:
+    if importlib.util.find_spec(_ENGINE_MODULES[engine]) is None:
+        return EngineTiming(path, engine, None, error=f"{_ENGINE_MODULES[engine]} is not installed")
+    best: Optional[float] = None
+    frame: Optional[pl.DataFrame] = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            frame = pl.read_excel(path, sheet_name=sheet_name, engine=engine)
+        except Exception as exc:
+            return EngineTiming(path, engine, None, error=_error_summary(exc))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return EngineTiming(path, engine, best, rows=frame.height, columns=frame.width)
@@ -0,0 +1,303 @@
+"""
+On-disk Arrow IPC cache of parsed sheets and tables, keyed by the workbook's content.
+"""
+
+from __future__ import annotations
+
+import enum
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+import polars as pl
+
+from .fingerprint import xlsx_fingerprint
+
+
+# Bytes hashed from each end of a non-zip file for its content fingerprint.
+_SAMPLE_BYTES = 64 * 1024
+
+_SUFFIX = ".arrow"
+
+
+class SheetCache:
+    """
+    Cache parsed sheets and tables as uncompressed Arrow IPC files.
+
+    Entries are keyed by the workbook's absolute path, size, modification time
+    and a content fingerprint (see workbook_fingerprint), plus what was read
+    (sheet or table, and the read options), so a changed workbook is parsed
+    again while an unchanged one is served from disk. Hits are memory-mapped,
+    so they cost milliseconds and share pages between processes. Files are
+    written atomically, so several pipeline steps can share one directory.
+
+    The cache is bounded by max_bytes and max_entries; the least recently used
+    entries are evicted first. Storing a new version of a sheet removes the
+    previous one.
+
+    Args:
+        directory: Cache directory (created if missing).
+        max_bytes: Total size of cached files before eviction (default 1 GiB).
+        max_entries: Maximum number of cached files, or None for no limit.
+        memory_map: Memory-map cached files on read (default True).
+
+    Attributes:
+        hits: Reads served from the cache.
+        misses: Reads that parsed the workbook.
+        evictions: Files removed to respect the limits.
+
+    Example:
+        cache = SheetCache(".sheet_cache")
+        frame = read_sheet("Workbooks/pivot_table_example.xlsx", "Sheet2", cache=cache)
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        max_bytes: int = 1024**3,
+        max_entries: Optional[int] = None,
+        memory_map: bool = True,
+    ) -> None:
+        self.directory = os.path.abspath(os.fspath(directory))
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.memory_map = memory_map
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_or_load(
+        self,
+        path: Union[str, os.PathLike],
+        what: Sequence[Any],
+        load: Callable[[], pl.DataFrame],
+    ) -> pl.DataFrame:
+        """
+        Return the cached frame for path and what, or load, store and return it.
+
+        Args:
+            path: Workbook path.
+            what: Values identifying what is read (e.g. ("sheet", name, options)).
+                They are normalized to JSON for the key, so objects without a
+                stable repr (default reprs carry memory addresses) still hit.
+            load: Callable parsing the workbook when the cache misses.
+
+        Returns:
+            The DataFrame.
+        """
+
+        slot, version = self._key(os.path.abspath(os.fspath(path)), what)
+        cached = os.path.join(self.directory, f"{slot}-{version}{_SUFFIX}")
+        frame = self._read(cached)
+        if frame is not None:
+            with self._lock:
+                self.hits += 1
+            return frame
+        with self._lock:
+            self.misses += 1
+        frame = load()
+        self._store(slot, cached, frame)
+        return frame
+
+    def read_sheet(
+        self,
+        path: Union[str, os.PathLike],
+        sheet_name: Optional[str] = None,
+        engine: Union[str, Sequence[str], None] = None,
+        **read_options: Any,
+    ) -> pl.DataFrame:
+        """
+        Read a sheet through the cache with polars_loader.read_sheet.
+
+        Args:
+            path: Workbook path.
+            sheet_name: Sheet to read (default: the first sheet).
+            engine: Engine name or names, as for read_sheet.
+            **read_options: Passed to read_sheet.
+
+        Returns:
+            The sheet as a DataFrame.
+        """
+
+        from .polars_loader import read_sheet
+
+        return read_sheet(path, sheet_name=sheet_name, engine=engine, cache=self, **read_options)
+
+    def read_table(
+        self,
+        path: Union[str, os.PathLike],
+        table_name: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pl.DataFrame:
+        """
+        Read a named Excel Table through the cache with xlsx_reader.read_table.
+
+        Args:
+            path: Workbook path.
+            table_name: Table name.
+            columns: Table columns to keep (default: all).
+
+        Returns:
+            The table as a DataFrame.
+        """
+
+        from .xlsx_reader import read_table
+
+        what = ("table", table_name.lower(), tuple(name.lower() for name in columns or ()))
+        return self.get_or_load(path, what, lambda: read_table(path, table_name, columns=columns))
+
+    def clear(self) -> None:
+        """
+        Remove every cached file.
+
+        Returns:
+            None
+        """
+
+        for entry, _, _ in self._entries():
+            _remove(entry)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _key(self, path: str, what: Sequence[Any]) -> Tuple[str, str]:
+        # The slot names what is read; the version names the workbook content it was read from.
+        stat = os.stat(path)
+        slot = _digest(json.dumps([os.path.normcase(path), _json_value(what)], sort_keys=True))
+        version = _digest(repr((stat.st_size, stat.st_mtime_ns, workbook_fingerprint(path))))
+        return slot, version
+
+    def _read(self, cached: str) -> Optional[pl.DataFrame]:
+        try:
+            frame = pl.read_ipc(cached, memory_map=self.memory_map)
+        except (FileNotFoundError, OSError):
+            return None
+        except Exception:
+            # A truncated or foreign file is treated as a miss and replaced.
+            _remove(cached)
+            return None
+        _touch(cached)
+        return frame
+
+    def _store(self, slot: str, cached: str, frame: pl.DataFrame) -> None:
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            frame.write_ipc(temporary, compression="uncompressed")
+            os.replace(temporary, cached)
+        except OSError:
+            _remove(temporary)
+            return
+        for entry, _, _ in self._entries():
+            name = os.path.basename(entry)
+            if name.startswith(slot + "-") and entry != cached:
+                _remove(entry)
+        self._evict(keep=cached)
+
+    def _evict(self, keep: str) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for entry, size, _ in entries:
+            over_size = total > self.max_bytes
+            over_count = self.max_entries is not None and count > self.max_entries
+            if not (over_size or over_count):
+                return
+            if entry == keep:
+                continue
+            if _remove(entry):
+                total -= size
+                count -= 1
+                with self._lock:
+                    self.evictions += 1
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            entry = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(entry)
+            except OSError:
+                continue
+            entries.append((entry, stat.st_size, stat.st_mtime))
+        return entries
+
+
+def workbook_fingerprint(path: Union[str, os.PathLike]) -> str:
+    """
+    Return a fast fingerprint of a workbook's content.
+
+    xlsx packages are fingerprinted from their zip central directory (member
+    CRCs, nothing decompressed); other files hash their first and last 64 KiB.
+
+    Args:
+        path: Workbook path.
+
+    Returns:
+        Hex digest.
+    """
+
+    try:
+        return xlsx_fingerprint(path)
+    except zipfile.BadZipFile:
+        pass
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        digest.update(handle.read(_SAMPLE_BYTES))
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        handle.seek(max(size - _SAMPLE_BYTES, 0))
+        digest.update(handle.read(_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def _json_value(value: Any) -> Any:
+    # Reduce a key part to JSON values that are the same in every run.
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, enum.Enum):
+        return _json_value(value.value)
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_json_value(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, type) or (callable(value) and hasattr(value, "__qualname__")):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, (pl.DataType, pl.Expr)):
+        return str(value)
+    kind = f"{type(value).__module__}.{type(value).__qualname__}"
+    if hasattr(value, "__dict__"):
+        return [kind, _json_value(vars(value))]
+    return [kind, str(value)]
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=10).hexdigest()
+
+
+def _touch(entry: str) -> None:
+    # The modification time records the last use, which drives LRU eviction.
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+
+
+def _remove(entry: str) -> bool:
+    # Memory-mapped files cannot be removed on Windows while mapped; they go on a later pass.
+    try:
+        os.remove(entry)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,244 @@
+"""
+One-pass snapshot of the sheets, tables and pivot tables of an xlwings workbook.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import xlwings as xw
+
+
+@dataclass
+class TableEntry:
+    """
+    Snapshot of one Excel Table (ListObject).
+
+    Args:
+        name: Table name as Excel reports it.
+        sheet_name: Name of the sheet holding the table.
+        list_object: COM ListObject.
+        column_names: Header names, read on first use (None until then).
+    """
+
+    name: str
+    sheet_name: str
+    list_object: Any
+    column_names: Optional[List[str]] = None
+
+    @property
+    def source_range(self) -> Any:
+        return self.list_object.Range
+
+
+class WorkbookIndex:
+    """
+    Snapshot of a workbook's sheets, ListObjects and PivotTables taken in one traversal.
+
+    Validation and destination handling read from the snapshot instead of
+    probing Excel sheet by sheet. Header names are read once per table, the
+    first time they are needed. Sheet and table lookups are case-insensitive,
+    as in Excel; pivot table names match exactly, as the per-sheet check did.
+
+    The snapshot does not observe the workbook. Code that changes it must either
+    record the change (add_sheet, add_pivot_table, clear_sheet) or call
+    invalidate(), after which the next lookup rebuilds the snapshot.
+
+    Args:
+        workbook: xlwings Book (or an object with the same surface) to index.
+
+    Attributes:
+        builds: Number of traversals taken so far.
+    """
+
+    def __init__(self, workbook: "xw.Book") -> None:
+        self.workbook = workbook
+        self.builds = 0
+        self._stale = True
+        self._sheets: Dict[str, Any] = {}
+        self._sheet_order: List[Any] = []
+        self._tables: Dict[str, TableEntry] = {}
+        self._pivot_tables: Dict[str, str] = {}
+
+    def invalidate(self) -> None:
+        """
+        Discard the snapshot; the next lookup traverses the workbook again.
+
+        Returns:
+            None
+        """
+
+        self._stale = True
+
+    def sheet(self, name: str) -> Optional["xw.Sheet"]:
+        """
+        Return the sheet with the given name, or None.
+
+        Args:
+            name: Sheet name.
+
+        Returns:
+            The sheet, or None when it does not exist.
+        """
+
+        self._ensure_built()
+        return self._sheets.get(name.lower())
+
+    @property
+    def last_sheet(self) -> Optional["xw.Sheet"]:
+        self._ensure_built()
+        return self._sheet_order[-1] if self._sheet_order else None
+
+    def table(self, name: str) -> Optional[TableEntry]:
+        """
+        Return the snapshot of the named Excel Table, or None.
+
+        Args:
+            name: Table name.
+
+        Returns:
+            TableEntry, or None when no sheet holds a table with that name.
+        """
+
+        self._ensure_built()
+        return self._tables.get(name.lower())
+
+    def column_names(self, entry: TableEntry) -> List[str]:
+        """
+        Return a table's header names, reading them from Excel only once.
+
+        Args:
+            entry: Table snapshot from table().
+
+        Returns:
+            Header names in table order (empty when they cannot be read).
+        """
+
+        if entry.column_names is None:
+            entry.column_names = _list_object_column_names(entry.list_object)
+        return entry.column_names
+
+    def pivot_table_sheet(self, name: str) -> Optional[str]:
+        """
+        Return the name of the sheet holding the named pivot table, or None.
+
+        Args:
+            name: Pivot table name.
+
+        Returns:
+            Sheet name, or None when no pivot table has that name.
+        """
+
+        self._ensure_built()
+        return self._pivot_tables.get(name)
+
+    def add_sheet(self, sheet: "xw.Sheet") -> None:
+        """
+        Record a sheet added to the end of the workbook.
+
+        Args:
+            sheet: The new sheet.
+
+        Returns:
+            None
+        """
+
+        self._ensure_built()
+        self._sheets[sheet.name.lower()] = sheet
+        self._sheet_order.append(sheet)
+
+    def add_pivot_table(self, sheet_name: str, pivot_table_name: str) -> None:
+        """
+        Record a pivot table created on a sheet.
+
+        Args:
+            sheet_name: Sheet holding the pivot table.
+            pivot_table_name: Pivot table name.
+
+        Returns:
+            None
+        """
+
+        self._ensure_built()
+        self._pivot_tables[pivot_table_name] = sheet_name
+
+    def clear_sheet(self, sheet_name: str) -> None:
+        """
+        Record that a sheet was cleared, dropping its tables and pivot tables.
+
+        Args:
+            sheet_name: Name of the cleared sheet.
+
+        Returns:
+            None
+        """
+
+        self._ensure_built()
+        key = sheet_name.lower()
+        self._tables = {
+            name: entry for name, entry in self._tables.items() if entry.sheet_name.lower() != key
+        }
+        self._pivot_tables = {
+            name: owner for name, owner in self._pivot_tables.items() if owner.lower() != key
+        }
+
+    def _ensure_built(self) -> None:
+        if not self._stale:
+            return
+        self._sheets.clear()
+        self._sheet_order.clear()
+        self._tables.clear()
+        self._pivot_tables.clear()
+        for sheet in self.workbook.sheets:
+            sheet_name = sheet.name
+            self._sheets[sheet_name.lower()] = sheet
+            self._sheet_order.append(sheet)
+            sheet_api = sheet.api
+            for list_object in _collection_items(lambda: sheet_api.ListObjects):
+                table_name = list_object.Name
+                self._tables.setdefault(table_name.lower(), TableEntry(table_name, sheet_name, list_object))
+            for pivot_table in _collection_items(sheet_api.PivotTables):
+                self._pivot_tables.setdefault(pivot_table.Name, sheet_name)
+        self._stale = False
+        self.builds += 1
+
+
+def _collection_items(get_collection) -> List[Any]:
+    # Sheets without the collection (chart sheets, protected sheets) contribute nothing.
+    try:
+        collection = get_collection()
+        count = collection.Count
+        return [collection.Item(i) for i in range(1, count + 1)]
+    except Exception:
+        return []
+
+
+def _list_object_column_names(list_object) -> list[str]:
+    # One round trip for the whole header row; ListColumns costs one per column.
+    try:
+        names = _header_row_names(list_object.HeaderRowRange.Value)
+    except Exception:
+        names = None
+    if names is not None:
+        return names
+    try:
+        columns = list_object.ListColumns
+        return [columns.Item(i).Name for i in range(1, columns.Count + 1)]
+    except Exception:
+        return []
+
+
+def _header_row_names(value: Any) -> Optional[List[str]]:
+    # COM returns a scalar for a one-column header and ((a, b, ...),) otherwise.
+    if isinstance(value, tuple):
+        if len(value) != 1 or not isinstance(value[0], tuple):
+            return None
+        value = value[0]
+    else:
+        value = (value,)
+    # Non-text headers (e.g. 2024.0) are formatted differently by ListColumns; defer to it.
+    if not all(isinstance(name, str) for name in value):
+        return None
+    return list(value)
@@ -0,0 +1,228 @@
+"""
+Registry of workbooks open in Excel, keyed by normalized path.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import xlwings as xw
+
+
+@dataclass
+class RegisteredWorkbook:
+    """
+    One open workbook known to the registry.
+
+    Args:
+        app: App the workbook is open in.
+        book: The open workbook.
+        path: Normalized full path of the workbook.
+    """
+
+    app: Any
+    book: Any
+    path: str
+
+
+class WorkbookRegistry:
+    """
+    Map of normalized workbook path to (app, book) for every open workbook.
+
+    The map is built by one scan of every Excel instance and then kept current
+    by open(), register() and close(), so asking whether a workbook is open
+    costs no COM calls on a miss and one (confirming the book's path) on a hit.
+    The map is rebuilt only when it is stale: before the first lookup, after
+    invalidate(), when a registered book no longer answers, or once it is older
+    than max_age (books opened by other tools are only seen by a rescan).
+
+    Args:
+        apps: Callable returning the running Apps (default: xw.apps).
+        max_age: Seconds after which the next lookup rescans, or None to rescan
+            only when invalidated (default 60.0).
+        clock: Monotonic clock used for max_age (default time.monotonic).
+
+    Attributes:
+        rescans: Full scans taken so far.
+    """
+
+    def __init__(
+        self,
+        apps: Optional[Callable[[], Iterable["xw.App"]]] = None,
+        max_age: Optional[float] = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.apps = apps or _running_apps
+        self.max_age = max_age
+        self.clock = clock
+        self.rescans = 0
+        self._entries: Dict[str, RegisteredWorkbook] = {}
+        self._scanned_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def invalidate(self) -> None:
+        """
+        Mark the map stale; the next lookup rescans every Excel instance.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            self._scanned_at = None
+
+    def rescan(self) -> None:
+        """
+        Rebuild the map from every book of every running App.
+
+        Returns:
+            None
+        """
+
+        entries: Dict[str, RegisteredWorkbook] = {}
+        for app in self.apps():
+            for book in app.books:
+                try:
+                    path = normalize_workbook_path(book.fullname)
+                except Exception:
+                    continue
+                entries.setdefault(path, RegisteredWorkbook(app, book, path))
+        with self._lock:
+            self._entries = entries
+            self._scanned_at = self.clock()
+            self.rescans += 1
+
+    def find(self, path: str) -> Optional[RegisteredWorkbook]:
+        """
+        Return the open workbook at path, or None when it is not open.
+
+        Args:
+            path: Workbook path.
+
+        Returns:
+            RegisteredWorkbook, or None.
+        """
+
+        key = normalize_workbook_path(path)
+        if self._is_stale():
+            self.rescan()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or _still_open_at(entry):
+            return entry
+        # The book was closed or renamed behind our back; the map cannot be trusted.
+        self.rescan()
+        with self._lock:
+            return self._entries.get(key)
+
+    def ensure_closed(self, path: str) -> None:
+        """
+        Fail fast if the workbook is already open in Excel.
+
+        Args:
+            path: Workbook path.
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError: If the workbook is already open.
+        """
+
+        if self.find(path) is not None:
+            raise RuntimeError(f"Workbook is already open in Excel: {path}")
+
+    def register(self, app: "xw.App", book: "xw.Book", path: Optional[str] = None) -> RegisteredWorkbook:
+        """
+        Record a workbook opened outside open().
+
+        Args:
+            app: App the workbook is open in.
+            book: The open workbook.
+            path: Workbook path (default: read from book.fullname).
+
+        Returns:
+            The new entry.
+        """
+
+        key = normalize_workbook_path(path if path is not None else book.fullname)
+        entry = RegisteredWorkbook(app, book, key)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def open(self, app: "xw.App", path: str) -> "xw.Book":
+        """
+        Open a workbook in app and record it.
+
+        Args:
+            app: App to open the workbook in.
+            path: Workbook path.
+
+        Returns:
+            The open workbook.
+        """
+
+        book = app.books.open(path)
+        self.register(app, book, path)
+        return book
+
+    def close(self, path: str) -> None:
+        """
+        Close a registered workbook without saving and forget it.
+
+        Unknown paths are ignored, as are books Excel already closed.
+
+        Args:
+            path: Workbook path.
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            entry = self._entries.pop(normalize_workbook_path(path), None)
+        if entry is None:
+            return
+        try:
+            entry.book.close()
+        except Exception:
+            pass
+
+    def _is_stale(self) -> bool:
+        with self._lock:
+            if self._scanned_at is None:
+                return True
+            return self.max_age is not None and self.clock() - self._scanned_at > self.max_age
+
+
+def normalize_workbook_path(path: str) -> str:
+    """
+    Normalize a workbook path the way Excel compares them (absolute, case-insensitive).
+
+    Args:
+        path: Workbook path.
+
+    Returns:
+        Normalized path.
+    """
+
+    return os.path.normcase(os.path.abspath(path)).lower()
+
+
+def _running_apps() -> Iterable["xw.App"]:
+    import xlwings as xw
+
+    return list(xw.apps)
+
+
+def _still_open_at(entry: RegisteredWorkbook) -> bool:
+    try:
+        return normalize_workbook_path(entry.book.fullname) == entry.path
+    except Exception:
+        return False
@@ -0,0 +1,587 @@
+"""
+File-level pivot backend that writes native PivotTable parts into an .xlsx package.
+
+The pivot cache definition, cache records and pivot table definition are built
+with openpyxl and saved with the workbook, so no Excel process is needed. The
+cache is flagged refreshOnLoad so Excel recomputes the rendered layout when the
+workbook is first opened.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import openpyxl
+import polars as pl
+from openpyxl import load_workbook
+from openpyxl.formatting.formatting import ConditionalFormattingList
+from openpyxl.pivot.cache import (
+    CacheDefinition,
+    CacheField,
+    CacheSource,
+    SharedItems,
+    WorksheetSource,
+)
+from openpyxl.pivot.fields import Boolean, DateTimeField, Index, Missing, Number, Text
+from openpyxl.pivot.record import Record, RecordList
+from openpyxl.pivot.table import (
+    DataField as PivotDataField,
+    FieldItem,
+    Location,
+    PivotField,
+    PivotTableStyle,
+    RowColField,
+    RowColItem,
+    TableDefinition,
+)
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
+from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+
+from .constants import DestinationHandling, SummaryFunction
+from .errors import DestinationError, ValidationError
+from .offline import _column_resolver, _read_table_frame, data_field_caption
+from .pivot_util import (
+    PivotBatchReport,
+    _is_empty_value,
+    _validate_field_names_exist,
+    _validate_spec_inputs,
+    _validate_unique_column_names,
+)
+
+if TYPE_CHECKING:
+    from .pivot_builder import PivotBuilder
+
+
+# Style Excel applies to new PivotTables when none is requested.
+DEFAULT_PIVOT_STYLE = "PivotStyleLight16"
+
+# Special field index Excel uses for the "Values" pseudo-field.
+DATA_FIELD_INDEX = -2
+
+# Workbook formats openpyxl can round-trip; .xlsm is opened with keep_vba so macros survive.
+_WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm")
+
+_SUBTOTAL_NAMES = {
+    SummaryFunction.SUM: "sum",
+    SummaryFunction.COUNT: "count",
+    SummaryFunction.AVG: "average",
+}
+
+
+def generate_pivot_xlsx(spec: "PivotBuilder", output_path: Optional[str] = None) -> None:
+    """
+    Validate and write a pivot table into an .xlsx file without Excel.
+
+    Args:
+        spec: PivotBuilder whose workbook is a path to an .xlsx file.
+        output_path: Optional path to save to. Defaults to overwriting spec.workbook.
+
+    Returns:
+        None
+
+    Raises:
+        ValidationError: When the builder fails validation checks or the
+            workbook is not an .xlsx or .xlsm file.
+        DestinationError: When destination handling fails.
+
+    Limitations:
+        - The workbook is round-tripped through openpyxl, so features openpyxl does
+          not preserve (for example images and cached formula results) are dropped.
+        - Only the pivot definition is written; Excel renders the values on open.
+        - Macros in .xlsm workbooks are kept; other formats are rejected.
+    """
+
+    path = os.fspath(spec.workbook)
+    _validate_spec_inputs(spec)
+    _workbook_extension(path)
+    frame = _read_table_frame(path, spec.table_name)
+
+    workbook = _load_workbook(path)
+    try:
+        _add_pivot(workbook, spec, frame)
+        workbook.save(output_path or path)
+    finally:
+        workbook.close()
+
+
+def generate_pivots_xlsx(specs: Sequence["PivotBuilder"]) -> PivotBatchReport:
+    """
+    Write several pivot tables into .xlsx files, sharing one cache per source table.
+
+    Each workbook is loaded and saved once, and builders over the same table in
+    that workbook share a single pivotCacheDefinition/pivotCacheRecords pair.
+
+    Args:
+        specs: PivotBuilders whose workbooks are paths to .xlsx files.
+
+    Returns:
+        PivotBatchReport with the number of caches created and reused.
+
+    Raises:
+        ValidationError: When a builder fails validation checks. No workbook
+            is saved in that case.
+        DestinationError: When destination handling fails. No workbook is
+            saved in that case.
+    """
+
+    workbooks: Dict[str, Workbook] = {}
+    try:
+        report = _build_pivots_xlsx(specs, workbooks)
+        _save_workbooks(workbooks)
+    finally:
+        _close_workbooks(workbooks)
+    return report
+
+
+def _build_pivots_xlsx(specs: Sequence["PivotBuilder"], workbooks: Dict[str, Workbook]) -> PivotBatchReport:
+    # Builds every pivot in memory, into workbooks (path -> loaded workbook) owned by the
+    # caller, so that nothing is saved until the caller decides the whole batch succeeded.
+    report = PivotBatchReport()
+    specs_by_path: Dict[str, List["PivotBuilder"]] = {}
+    for spec in specs:
+        _validate_spec_inputs(spec)
+        path = os.path.abspath(os.fspath(spec.workbook))
+        _workbook_extension(path)
+        specs_by_path.setdefault(path, []).append(spec)
+
+    for path, path_specs in specs_by_path.items():
+        frames: Dict[str, pl.DataFrame] = {}
+        caches: Dict[str, CacheDefinition] = {}
+        workbook = workbooks[path] = _load_workbook(path)
+        for spec in path_specs:
+            key = spec.table_name.strip().lower()
+            if key not in frames:
+                frames[key] = _read_table_frame(path, spec.table_name)
+            pivot = _add_pivot(workbook, spec, frames[key], caches.get(key))
+            if key in caches:
+                report.caches_reused += 1
+            else:
+                caches[key] = pivot.cache
+                report.caches_created += 1
+            report.pivot_table_names.append(spec.pivot_table_name)
+    return report
+
+
+def _save_workbooks(workbooks: Dict[str, Workbook]) -> None:
+    for path, workbook in workbooks.items():
+        workbook.save(path)
+
+
+def _close_workbooks(workbooks: Dict[str, Workbook]) -> None:
+    for workbook in workbooks.values():
+        workbook.close()
+
+
+def _add_pivot(
+    workbook: Workbook,
+    spec: "PivotBuilder",
+    frame: pl.DataFrame,
+    cache: Optional[CacheDefinition] = None,
+) -> TableDefinition:
+    _validate_unique_column_names(frame.columns)
+    _validate_field_names_exist(spec.row_fields, spec.column_fields, spec.data_fields, frame.columns)
+    _validate_xlsx_pivot_table_name_unique(workbook, spec.pivot_table_name)
+
+    worksheet = _resolve_destination_worksheet(workbook, spec)
+    if spec.destination_handling == DestinationHandling.EXISTING_FORCE_CLEAR:
+        _clear_worksheet(worksheet)
+
+    resolve = _column_resolver(frame.columns)
+    column_index = {name: idx for idx, name in enumerate(frame.columns)}
+    row_indexes = [column_index[resolve(rf.name)] for rf in spec.row_fields]
+    col_indexes = [column_index[resolve(cf.name)] for cf in spec.column_fields]
+
+    if cache is None:
+        cache = _build_cache(frame, spec.table_name, _next_cache_id(workbook))
+    shared = [list(field.sharedItems._fields) for field in cache.cacheFields]
+    item_order = {idx: _sorted_item_positions(shared[idx]) for idx in row_indexes + col_indexes}
+
+    pivot_fields = [PivotField(showAll=False) for _ in frame.columns]
+    for fields, indexes, axis in (
+        (spec.row_fields, row_indexes, "axisRow"),
+        (spec.column_fields, col_indexes, "axisCol"),
+    ):
+        for field, idx in zip(fields, indexes):
+            pivot_fields[idx].axis = axis
+            pivot_fields[idx].name = field.caption
+            pivot_fields[idx].items = [FieldItem(x=x) for x in item_order[idx]] + [FieldItem(t="default")]
+
+    data_fields = []
+    for data_field in spec.data_fields:
+        idx = column_index[resolve(data_field.name)]
+        pivot_fields[idx].dataField = True
+        data_fields.append(
+            PivotDataField(
+                name=data_field_caption(data_field),
+                fld=idx,
+                subtotal=_SUBTOTAL_NAMES[data_field.function],
+                baseField=0,
+                baseItem=0,
+                numFmtId=_number_format_id(workbook, data_field.number_format),
+            )
+        )
+
+    records = cache.records.r
+    row_items = _row_items(records, row_indexes, item_order)
+    col_items = _col_items(records, col_indexes, item_order, len(data_fields))
+    col_fields = [RowColField(x=idx) for idx in col_indexes]
+    if len(data_fields) > 1:
+        col_fields.append(RowColField(x=DATA_FIELD_INDEX))
+
+    pivot = TableDefinition(
+        name=spec.pivot_table_name,
+        cacheId=cache._pivot_cache_id,
+        dataCaption="Values",
+        updatedVersion=8,
+        minRefreshableVersion=3,
+        createdVersion=8,
+        useAutoFormatting=True,
+        itemPrintTitles=True,
+        indent=0,
+        outline=True,
+        outlineData=True,
+        applyWidthHeightFormats=True,
+        location=_location(spec.pivot_top_left_cell, spec, row_items, col_items),
+        pivotFields=pivot_fields,
+        rowFields=[RowColField(x=idx) for idx in row_indexes],
+        rowItems=row_items,
+        colFields=col_fields,
+        colItems=col_items,
+        dataFields=data_fields,
+        pivotTableStyleInfo=PivotTableStyle(
+            name=spec.table_style or DEFAULT_PIVOT_STYLE,
+            showRowHeaders=True,
+            showColHeaders=True,
+            showRowStripes=bool(spec.show_row_stripes),
+            showColStripes=False,
+            showLastColumn=True,
+        ),
+    )
+    pivot.cache = cache
+    worksheet.add_pivot(pivot)
+    return pivot
+
+
+def _build_cache(frame: pl.DataFrame, table_name: str, cache_id: int) -> CacheDefinition:
+    cache_fields = []
+    columns = []
+    for name in frame.columns:
+        values = frame[name].to_list()
+        positions: Dict[Any, int] = {}
+        items = []
+        indexes = []
+        for value in values:
+            key = _item_key(value)
+            if key not in positions:
+                positions[key] = len(items)
+                items.append(_cache_value(value))
+            indexes.append(positions[key])
+        shared = SharedItems(_fields=items, **_shared_item_flags(values))
+        cache_fields.append(CacheField(name=name, numFmtId=0, sharedItems=shared))
+        columns.append(indexes)
+
+    records = [Record(_fields=[Index(v=column[row]) for column in columns]) for row in range(frame.height)]
+    cache = CacheDefinition(
+        refreshOnLoad=True,
+        createdVersion=8,
+        refreshedVersion=8,
+        minRefreshableVersion=3,
+        recordCount=frame.height,
+        cacheSource=CacheSource(type="worksheet", worksheetSource=WorksheetSource(name=table_name)),
+        cacheFields=cache_fields,
+    )
+    cache.records = RecordList(r=records)
+    cache._pivot_cache_id = cache_id
+    _pin_cache_identity(cache)
+    return cache
+
+
+def _item_key(value: Any) -> Tuple[str, Any]:
+    # Keep 1 and True (and 1 and "1") as distinct shared items.
+    return (type(value).__name__, value)
+
+
+def _cache_value(value: Any):
+    if value is None:
+        return Missing()
+    if isinstance(value, bool):
+        return Boolean(v=value)
+    if isinstance(value, (int, float)):
+        return Number(v=value)
+    if isinstance(value, dt.datetime):
+        return DateTimeField(v=value)
+    if isinstance(value, dt.date):
+        return DateTimeField(v=dt.datetime.combine(value, dt.time()))
+    return Text(v=str(value))
+
+
+def _shared_item_flags(values: Sequence[Any]) -> Dict[str, Any]:
+    present = [value for value in values if value is not None]
+    numbers = [v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    dates = [v for v in present if isinstance(v, dt.date)]
+    has_string = any(isinstance(v, str) for v in present)
+    has_blank = len(present) != len(values)
+    kinds = sum(bool(group) for group in (numbers, dates, has_string))
+
+    flags: Dict[str, Any] = {}
+    if has_blank:
+        flags["containsBlank"] = True
+    if kinds > 1:
+        flags["containsMixedTypes"] = True
+    if not has_string and not has_blank:
+        flags["containsSemiMixedTypes"] = False
+    if not has_string:
+        flags["containsString"] = False
+    if numbers:
+        flags["containsNumber"] = True
+        flags["containsInteger"] = all(float(v).is_integer() for v in numbers) or None
+        flags["minValue"] = min(numbers)
+        flags["maxValue"] = max(numbers)
+    if dates:
+        flags["containsDate"] = True
+        flags["containsNonDate"] = len(dates) != len(present) or None
+    return flags
+
+
+def _sorted_item_positions(items: List[Any]) -> List[int]:
+    # Excel orders numbers, then text, then booleans, with blanks last.
+    def sort_key(position: int):
+        item = items[position]
+        if isinstance(item, Number):
+            return (0, item.v, "")
+        if isinstance(item, DateTimeField):
+            return (1, item.v.timestamp(), "")
+        if isinstance(item, Text):
+            return (2, 0, item.v.lower())
+        if isinstance(item, Boolean):
+            return (3, int(item.v), "")
+        return (4, 0, "")
+
+    return sorted(range(len(items)), key=sort_key)
+
+
+def _item_paths(
+    records: List[Record],
+    field_indexes: List[int],
+    item_order: Dict[int, List[int]],
+) -> List[Tuple[int, ...]]:
+    rank = {idx: {x: pos for pos, x in enumerate(item_order[idx])} for idx in field_indexes}
+    paths = {
+        tuple(rank[idx][record._fields[idx].v] for idx in field_indexes) for record in records
+    }
+    return sorted(paths)
+
+
+def _row_items(
+    records: List[Record],
+    row_indexes: List[int],
+    item_order: Dict[int, List[int]],
+) -> List[RowColItem]:
+    if not row_indexes:
+        return [RowColItem()]
+    # Compact layout: one row per node of the item tree (depth-first), then the grand total.
+    items = []
+    previous: Tuple[int, ...] = ()
+    for path in _item_paths(records, row_indexes, item_order):
+        start = _common_prefix_length(previous, path)
+        for depth in range(start, len(path)):
+            items.append(RowColItem(r=depth, x=[Index(v=path[depth])]))
+        previous = path
+    items.append(RowColItem(t="grand", x=[Index(v=0)]))
+    return items
+
+
+def _col_items(
+    records: List[Record],
+    col_indexes: List[int],
+    item_order: Dict[int, List[int]],
+    data_count: int,
+) -> List[RowColItem]:
+    data_positions = list(range(data_count)) if data_count > 1 else [None]
+    if not col_indexes:
+        return [
+            RowColItem(i=pos or 0, x=[] if pos is None else [Index(v=pos)]) for pos in data_positions
+        ]
+
+    items = []
+    previous: Tuple[int, ...] = ()
+    for path in _item_paths(records, col_indexes, item_order):
+        for pos in data_positions:
+            full_path = path + (() if pos is None else (pos,))
+            start = _common_prefix_length(previous, full_path)
+            items.append(
+                RowColItem(r=start, i=pos or 0, x=[Index(v=v) for v in full_path[start:]])
+            )
+            previous = full_path
+    for pos in data_positions:
+        items.append(RowColItem(t="grand", i=pos or 0, x=[Index(v=0)]))
+    return items
+
+
+def _common_prefix_length(left: Tuple[int, ...], right: Tuple[int, ...]) -> int:
+    length = 0
+    for a, b in zip(left, right):
+        if a != b:
+            break
+        length += 1
+    return min(length, len(right) - 1)
+
+
+def _location(
+    top_left_cell: str,
+    spec: "PivotBuilder",
+    row_items: List[RowColItem],
+    col_items: List[RowColItem],
+) -> Location:
+    if spec.column_fields:
+        first_header_row, first_data_row = 1, 2
+    elif len(spec.data_fields) > 1:
+        first_header_row, first_data_row = 0, 1
+    else:
+        first_header_row, first_data_row = 1, 1
+    first_data_col = 1 if spec.row_fields else 0
+
+    try:
+        top, left = coordinate_to_tuple(top_left_cell.replace("$", ""))
+    except Exception as exc:
+        raise ValidationError(f"Invalid pivot_top_left_cell '{top_left_cell}'.") from exc
+    bottom = top + first_data_row + len(row_items) - 1
+    right = left + first_data_col + len(col_items) - 1
+    ref = f"{get_column_letter(left)}{top}:{get_column_letter(right)}{bottom}"
+    return Location(
+        ref=ref,
+        firstHeaderRow=first_header_row,
+        firstDataRow=first_data_row,
+        firstDataCol=first_data_col,
+    )
+
+
+def _number_format_id(workbook: Workbook, number_format: Optional[str]) -> Optional[int]:
+    if not number_format:
+        return None
+    if number_format in BUILTIN_FORMATS_REVERSE:
+        return BUILTIN_FORMATS_REVERSE[number_format]
+    return BUILTIN_FORMATS_MAX_SIZE + _add_number_format(workbook, number_format)
+
+
+def _next_cache_id(workbook: Workbook) -> int:
+    existing = [pivot.cacheId for ws in workbook.worksheets for pivot in _worksheet_pivots(ws)]
+    return max(existing, default=0) + 1
+
+
+def _validate_xlsx_pivot_table_name_unique(workbook: Workbook, pivot_table_name: str) -> None:
+    for worksheet in workbook.worksheets:
+        for pivot in _worksheet_pivots(worksheet):
+            if pivot.name == pivot_table_name:
+                raise ValidationError(f"Pivot table name '{pivot_table_name}' already exists.")
+
+
+def _resolve_destination_worksheet(workbook: Workbook, spec: "PivotBuilder") -> Worksheet:
+    handling = spec.destination_handling
+    name = spec.pivot_sheet_name
+    existing = workbook[name] if name in workbook.sheetnames else None
+
+    if existing is not None:
+        if handling == DestinationHandling.NEW:
+            raise DestinationError(f"Sheet '{name}' already exists.")
+        if handling in (DestinationHandling.EXISTING_NO_CLEAR, DestinationHandling.EXISTING_FORCE_CLEAR):
+            return existing
+        if _is_worksheet_empty(existing):
+            return existing
+        raise DestinationError(f"Sheet '{name}' is not empty under ExistingClear rules.")
+
+    if handling in (
+        DestinationHandling.EXISTING_CLEAR,
+        DestinationHandling.EXISTING_FORCE_CLEAR,
+        DestinationHandling.EXISTING_NO_CLEAR,
+    ):
+        raise DestinationError(f"Sheet '{name}' was not found.")
+    return workbook.create_sheet(name)
+
+
+def _is_worksheet_empty(worksheet: Worksheet) -> bool:
+    if _worksheet_pivots(worksheet):
+        return False
+    return all(_is_empty_value(cell.value) for row in worksheet.iter_rows() for cell in row)
+
+
+def _clear_worksheet(worksheet: Worksheet) -> None:
+    # Match Sheet.clear over COM: values, cell formats, merges and conditional formats all go.
+    for merged in list(worksheet.merged_cells.ranges):
+        worksheet.unmerge_cells(str(merged))
+    worksheet.delete_rows(1, worksheet.max_row)
+    worksheet.conditional_formatting = ConditionalFormattingList()
+    _worksheet_pivots(worksheet).clear()
+
+
+# openpyxl has no public API for the members below, so every private attribute the
+# writer touches is reached through these helpers; check_openpyxl_internals guards
+# them (and the tests call it) so an openpyxl release that moves them fails loudly.
+
+
+def check_openpyxl_internals() -> None:
+    """
+    Verify that the openpyxl internals the writer relies on are still present.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: When the installed openpyxl no longer exposes them.
+    """
+
+    workbook = Workbook()
+    try:
+        worksheet = workbook.active
+        missing = []
+        if not isinstance(getattr(worksheet, "_pivots", None), list):
+            missing.append("Worksheet._pivots")
+        if not callable(getattr(getattr(workbook, "_number_formats", None), "add", None)):
+            missing.append("Workbook._number_formats.add")
+        if "id" not in CacheDefinition.__attrs__:
+            missing.append("CacheDefinition.id")
+    finally:
+        workbook.close()
+    if missing:
+        raise RuntimeError(
+            f"Unsupported openpyxl {openpyxl.__version__}: missing {', '.join(missing)}."
+        )
+
+
+def _workbook_extension(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _WORKBOOK_EXTENSIONS:
+        raise ValidationError(f"Only .xlsx and .xlsm workbooks can be written without Excel: '{path}'.")
+    return extension
+
+
+def _load_workbook(path: str) -> Workbook:
+    extension = _workbook_extension(path)
+    _check_openpyxl_once()
+    # Without keep_vba, saving an .xlsm silently drops its macros.
+    return load_workbook(path, keep_vba=extension == ".xlsm")
+
+
+@functools.lru_cache(maxsize=None)
+def _check_openpyxl_once() -> None:
+    check_openpyxl_internals()
+
+
+def _worksheet_pivots(worksheet: Worksheet) -> List[TableDefinition]:
+    return worksheet._pivots
+
+
+def _add_number_format(workbook: Workbook, number_format: str) -> int:
+    return workbook._number_formats.add(number_format)
+
+
+def _pin_cache_identity(cache: CacheDefinition) -> None:
+    # openpyxl dedupes shared caches through a hash that includes the relationship id it
+    # assigns while writing; pre-setting that id keeps the hash stable so the cache is
+    # written once no matter how many pivots use it.
+    cache.id = "rId1"
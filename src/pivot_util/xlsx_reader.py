@@ -0,0 +1,629 @@
+"""
+Read Excel Tables and sheet rectangles straight from the xlsx package XML, without Excel.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+import posixpath
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from xml.etree.ElementTree import fromstring, iterparse
+
+import polars as pl
+
+from .errors import ValidationError
+
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_TABLE_REL_TYPE = _REL_NS + "/table"
+_SHARED_STRINGS_REL_TYPE = _REL_NS + "/sharedStrings"
+_STYLES_REL_TYPE = _REL_NS + "/styles"
+
+_SHEET_DATA = f"{{{_MAIN_NS}}}sheetData"
+_ROW = f"{{{_MAIN_NS}}}row"
+_CELL = f"{{{_MAIN_NS}}}c"
+_VALUE = f"{{{_MAIN_NS}}}v"
+_INLINE = f"{{{_MAIN_NS}}}is"
+_TEXT = f"{{{_MAIN_NS}}}t"
+_RUN = f"{{{_MAIN_NS}}}r"
+_SHARED_ITEM = f"{{{_MAIN_NS}}}si"
+
+# Rows per DataFrame produced by the streaming readers.
+STREAM_BATCH_ROWS = 65_536
+
+# Widest sheet Excel allows (column XFD).
+_MAX_COLUMNS = 16_384
+
+# Built-in number formats that display dates or times.
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+# Format text that is not a date code: quoted literals, [colour]/[$-locale] tags, escapes.
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+
+
+@dataclass
+class TableInfo:
+    """
+    Location and layout of one Excel Table (ListObject) in an xlsx file.
+
+    Args:
+        name: Table name (displayName) as Excel shows it.
+        sheet_name: Name of the sheet holding the table.
+        sheet_part: Zip member holding the sheet XML.
+        ref: Table range address, including header and totals rows.
+        column_names: Header names from the table definition.
+        header_row_count: Header rows at the top of ref (0 or 1).
+        totals_row_count: Totals rows at the bottom of ref (0 or 1).
+    """
+
+    name: str
+    sheet_name: str
+    sheet_part: str
+    ref: str
+    column_names: List[str] = field(default_factory=list)
+    header_row_count: int = 1
+    totals_row_count: int = 0
+
+    @property
+    def data_bounds(self) -> Tuple[int, int, int, int]:
+        # (min_col, min_row, max_col, max_row) of the data body, 1-based.
+        min_col, min_row, max_col, max_row = _bounds(self.ref)
+        return min_col, min_row + self.header_row_count, max_col, max_row - self.totals_row_count
+
+
+def list_tables(path: Union[str, os.PathLike]) -> List[TableInfo]:
+    """
+    List every Excel Table in an xlsx file, in sheet order.
+
+    Only the workbook, relationship and table parts are read; no sheet data is parsed.
+
+    Args:
+        path: Workbook path.
+
+    Returns:
+        TableInfo per table.
+    """
+
+    with zipfile.ZipFile(os.fspath(path)) as package:
+        return _list_tables(package)
+
+
+def find_table(path: Union[str, os.PathLike], table_name: str) -> TableInfo:
+    """
+    Locate a named Excel Table in an xlsx file.
+
+    Args:
+        path: Workbook path.
+        table_name: Table name, matched case-insensitively as Excel does.
+
+    Returns:
+        TableInfo of the table.
+
+    Raises:
+        ValidationError: When no sheet holds a table with that name.
+    """
+
+    with zipfile.ZipFile(os.fspath(path)) as package:
+        return _find_table(package, table_name)
+
+
+def read_table(
+    path: Union[str, os.PathLike],
+    table_name: str,
+    columns: Optional[Sequence[str]] = None,
+) -> pl.DataFrame:
+    """
+    Read a named Excel Table into a DataFrame, parsing only the table's rectangle.
+
+    The sheet XML is streamed and parsing stops after the table's last row, and
+    cells outside the table's columns are skipped without being converted.
+    Column names come from the table definition. Cells formatted as dates
+    become datetimes, as with openpyxl.
+
+    Args:
+        path: Workbook path.
+        table_name: Table name, matched case-insensitively.
+        columns: Table columns to keep, in order (default: all); matched
+            case-insensitively, named with the header spelling.
+
+    Returns:
+        DataFrame with one row per table data row.
+
+    Raises:
+        ValidationError: When the table or one of the columns does not exist.
+    """
+
+    frames = list(iter_table_batches(path, table_name, batch_rows=None, columns=columns))
+    return frames[0]
+
+
+def iter_table_batches(
+    path: Union[str, os.PathLike],
+    table_name: str,
+    batch_rows: Optional[int] = STREAM_BATCH_ROWS,
+    columns: Optional[Sequence[str]] = None,
+    schema: Optional[Dict[str, Any]] = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Stream a named Excel Table as DataFrames of at most batch_rows rows.
+
+    Args:
+        path: Workbook path.
+        table_name: Table name, matched case-insensitively.
+        batch_rows: Rows per batch, or None for a single batch (default STREAM_BATCH_ROWS).
+        columns: Table columns to keep, in order (default: all).
+        schema: Optional column name to polars dtype map applied to every batch;
+            otherwise each batch infers its own dtypes.
+
+    Returns:
+        Iterator of DataFrames; at least one (possibly empty) batch is produced.
+
+    Raises:
+        ValidationError: When the table or one of the columns does not exist.
+    """
+
+    with zipfile.ZipFile(os.fspath(path)) as package:
+        table = _find_table(package, table_name)
+        reader = _PackageReader(package)
+        min_col, min_row, max_col, max_row = table.data_bounds
+        positions = _column_positions(table.column_names, columns)
+        names = [table.column_names[position] for position in positions]
+        wanted = {min_col + position for position in positions}
+        rows = reader.iter_rows(table.sheet_part, min_row, max_row, min_col, max_col, wanted)
+        yield from _batches((values for _, values in rows), names, positions, batch_rows, schema)
+
+
+def iter_sheet_batches(
+    path: Union[str, os.PathLike],
+    sheet_name: Optional[str] = None,
+    batch_rows: Optional[int] = STREAM_BATCH_ROWS,
+    columns: Optional[Sequence[str]] = None,
+    header_row: int = 1,
+    schema: Optional[Dict[str, Any]] = None,
+    drop_empty_rows: bool = True,
+) -> Iterator[pl.DataFrame]:
+    """
+    Stream a sheet as DataFrames of at most batch_rows rows, with bounded memory.
+
+    The sheet XML is parsed incrementally and each finished row is released, so
+    memory holds one batch plus the workbook's shared strings (which cells
+    reference by index, so they are loaded once, also by streaming). Columns
+    run from A to the last non-empty header cell. Cells outside the requested
+    columns are not decoded, but they still count when deciding whether a row
+    is empty, so a projection never drops a row that holds data elsewhere.
+
+    Example:
+        totals = None
+        for batch in iter_sheet_batches(path, "Export"):
+            part = batch.group_by("Region").agg(pl.col("Qty").sum())
+            totals = part if totals is None else pl.concat([totals, part])
+        totals = totals.group_by("Region").agg(pl.col("Qty").sum())
+
+    Args:
+        path: Workbook path.
+        sheet_name: Sheet to read (default: the first sheet).
+        batch_rows: Rows per batch, or None for a single batch (default STREAM_BATCH_ROWS).
+        columns: Header names to keep, in order (default: all); matched case-insensitively.
+        header_row: 1-based row holding the column names (default 1).
+        schema: Optional column name to polars dtype map applied to every batch;
+            otherwise each batch infers its own dtypes.
+        drop_empty_rows: Skip rows without any value, as pl.read_excel does
+            (default True). When False they are kept as all-null rows, except
+            for the empty rows after the last row holding data.
+
+    Returns:
+        Iterator of DataFrames; at least one (possibly empty) batch is produced.
+
+    Raises:
+        ValidationError: When the sheet or one of the columns does not exist.
+    """
+
+    with zipfile.ZipFile(os.fspath(path)) as package:
+        sheet_part = _find_sheet_part(package, sheet_name)
+        reader = _PackageReader(package)
+        header: List[Any] = []
+        for _, values in reader.iter_rows(sheet_part, header_row, header_row, 1, _MAX_COLUMNS):
+            header = values
+        while header and header[-1] is None:
+            header.pop()
+        header_names = _header_names(header)
+        positions = _column_positions(header_names, columns, "header row")
+        names = [header_names[position] for position in positions]
+        wanted = {1 + position for position in positions}
+        rows = reader.iter_data_rows(sheet_part, header_row + 1, max(len(header), 1), wanted, drop_empty_rows)
+        yield from _batches(rows, names, positions, batch_rows, schema)
+
+
+def _batches(
+    rows: Iterable[List[Any]],
+    names: List[str],
+    positions: List[int],
+    batch_rows: Optional[int],
+    schema: Optional[Dict[str, Any]],
+) -> Iterator[pl.DataFrame]:
+    data: Dict[str, List[Any]] = {name: [] for name in names}
+    count = 0
+    produced = False
+    for values in rows:
+        for name, position in zip(names, positions):
+            data[name].append(values[position])
+        count += 1
+        if batch_rows is not None and count >= batch_rows:
+            yield _frame(data, schema)
+            data = {name: [] for name in names}
+            count = 0
+            produced = True
+    if count or not produced:
+        yield _frame(data, schema)
+
+
+def _frame(data: Dict[str, List[Any]], schema: Optional[Dict[str, Any]]) -> pl.DataFrame:
+    if not schema:
+        return pl.DataFrame(data, strict=False)
+    return pl.DataFrame(data, schema_overrides=schema, strict=False)
+
+
+def _find_sheet_part(package: zipfile.ZipFile, sheet_name: Optional[str]) -> str:
+    parts = _sheet_parts(package)
+    if sheet_name is None and parts:
+        return parts[0][1]
+    for name, part in parts:
+        if sheet_name is not None and name.lower() == sheet_name.lower():
+            return part
+    raise ValidationError(f"Sheet '{sheet_name}' not found in workbook.")
+
+
+def _header_names(header: List[Any]) -> List[str]:
+    # Blank headers and repeats get the names pl.read_excel gives them.
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for position, value in enumerate(header):
+        name = f"__UNNAMED__{position}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_duplicated_{seen[name] - 1}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _find_table(package: zipfile.ZipFile, table_name: str) -> TableInfo:
+    key = table_name.lower()
+    for table in _list_tables(package):
+        if table.name.lower() == key:
+            return table
+    raise ValidationError(f"Table '{table_name}' not found in workbook.")
+
+
+def _list_tables(package: zipfile.ZipFile) -> List[TableInfo]:
+    tables: List[TableInfo] = []
+    for sheet_name, sheet_part in _sheet_parts(package):
+        for table_part in _related_parts(package, sheet_part, _TABLE_REL_TYPE):
+            root = _parse_part(package, table_part)
+            tables.append(
+                TableInfo(
+                    name=root.get("displayName") or root.get("name", ""),
+                    sheet_name=sheet_name,
+                    sheet_part=sheet_part,
+                    ref=root.get("ref", ""),
+                    column_names=[
+                        column.get("name", "")
+                        for column in root.iter(f"{{{_MAIN_NS}}}tableColumn")
+                    ],
+                    header_row_count=int(root.get("headerRowCount", "1")),
+                    totals_row_count=int(root.get("totalsRowCount", "0")),
+                )
+            )
+    return tables
+
+
+def _sheet_parts(package: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    workbook = _parse_part(package, "xl/workbook.xml")
+    targets = _relationship_targets(package, "xl/workbook.xml")
+    parts = []
+    for sheet in workbook.iter(f"{{{_MAIN_NS}}}sheet"):
+        target = targets.get(sheet.get(f"{{{_REL_NS}}}id", ""))
+        if target is not None:
+            parts.append((sheet.get("name", ""), target[0]))
+    return parts
+
+
+def _related_parts(package: zipfile.ZipFile, part: str, rel_type: str) -> List[str]:
+    return [target for target, kind in _relationship_targets(package, part).values() if kind == rel_type]
+
+
+def _relationship_targets(package: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    # Relationships of a/b.xml live in a/_rels/b.xml.rels; targets are relative to a/.
+    folder, name = posixpath.split(part)
+    rels_part = posixpath.join(folder, "_rels", name + ".rels")
+    if rels_part not in package.NameToInfo:
+        return {}
+    targets = {}
+    for rel in _parse_part(package, rels_part).iter(f"{{{_PACKAGE_REL_NS}}}Relationship"):
+        target = rel.get("Target", "")
+        if rel.get("TargetMode") == "External":
+            continue
+        resolved = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        targets[rel.get("Id", "")] = (resolved, rel.get("Type", ""))
+    return targets
+
+
+def _parse_part(package: zipfile.ZipFile, part: str):
+    return fromstring(package.read(part))
+
+
+class _PackageReader:
+    # Shared strings and styles are loaded once per package, on first use.
+
+    def __init__(self, package: zipfile.ZipFile) -> None:
+        self.package = package
+        self._shared_strings: Optional[List[str]] = None
+        self._date_styles: Optional[Set[int]] = None
+        self._epoch: Optional[dt.datetime] = None
+
+    @property
+    def shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            self._shared_strings = _read_shared_strings(self.package)
+        return self._shared_strings
+
+    @property
+    def date_styles(self) -> Set[int]:
+        if self._date_styles is None:
+            self._date_styles = _read_date_styles(self.package)
+        return self._date_styles
+
+    @property
+    def epoch(self) -> dt.datetime:
+        if self._epoch is None:
+            workbook = _parse_part(self.package, "xl/workbook.xml")
+            properties = workbook.find(f"{{{_MAIN_NS}}}workbookPr")
+            date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+            self._epoch = dt.datetime(1904, 1, 1) if date1904 else dt.datetime(1899, 12, 30)
+        return self._epoch
+
+    def iter_rows(
+        self,
+        sheet_part: str,
+        min_row: int,
+        max_row: Optional[int],
+        min_col: int,
+        max_col: int,
+        wanted: Optional[Set[int]] = None,
+    ) -> Iterator[Tuple[int, List[Any]]]:
+        """
+        Stream (row number, values) for a rectangle of a sheet, gaps filled with None.
+
+        Rows missing from the XML inside the rectangle are yielded as all-None;
+        trailing missing rows are not, since max_row may be None (to the end).
+        """
+
+        width = max_col - min_col + 1
+        expected = min_row
+        with self.package.open(sheet_part) as stream:
+            for row_number, cells, _ in _iter_sheet_xml(stream, min_row, max_row, min_col, max_col, wanted):
+                while expected < row_number:
+                    yield expected, [None] * width
+                    expected += 1
+                values: List[Any] = [None] * width
+                for column, cell in cells:
+                    values[column - min_col] = self._cell_value(*cell)
+                yield row_number, values
+                expected = row_number + 1
+        while max_row is not None and expected <= max_row:
+            yield expected, [None] * width
+            expected += 1
+
+    def iter_data_rows(
+        self,
+        sheet_part: str,
+        min_row: int,
+        max_col: int,
+        wanted: Optional[Set[int]],
+        drop_empty_rows: bool,
+    ) -> Iterator[List[Any]]:
+        """
+        Stream the values of columns 1..max_col from min_row to the last row holding data.
+
+        A row is empty when none of its cells up to max_col has a value,
+        wanted or not. Empty rows are skipped, or with drop_empty_rows False
+        yielded as all-None once a later row with data shows they are not trailing.
+        """
+
+        expected = min_row
+        with self.package.open(sheet_part) as stream:
+            for row_number, cells, has_data in _iter_sheet_xml(stream, min_row, None, 1, max_col, wanted):
+                if not has_data:
+                    continue
+                if not drop_empty_rows:
+                    for _ in range(row_number - expected):
+                        yield [None] * max_col
+                values: List[Any] = [None] * max_col
+                for column, cell in cells:
+                    values[column - 1] = self._cell_value(*cell)
+                yield values
+                expected = row_number + 1
+
+    def _cell_value(self, kind: Optional[str], style: Optional[str], raw: Optional[str]) -> Any:
+        if raw is None:
+            return None
+        if not raw and kind not in ("str", "inlineStr"):
+            # An empty <v/> is a formula without a cached result (openpyxl writes these).
+            return None
+        if kind == "s":
+            return self.shared_strings[int(raw)]
+        if kind in ("str", "inlineStr"):
+            return raw
+        if kind == "b":
+            return raw == "1"
+        if kind == "e":
+            # Error cells (#N/A, #DIV/0!) carry no value, as openpyxl's data-only read shows.
+            return None
+        if kind == "d":
+            # ISO 8601 date cells (Strict OOXML, openpyxl with iso_dates).
+            return _iso_to_datetime(raw)
+        if style is not None and int(style) in self.date_styles:
+            return _serial_to_datetime(float(raw), self.epoch)
+        return float(raw) if any(mark in raw for mark in ".Ee") else int(raw)
+
+
+def _iter_sheet_xml(
+    stream: IO[bytes],
+    min_row: int,
+    max_row: Optional[int],
+    min_col: int,
+    max_col: int,
+    wanted: Optional[Set[int]],
+) -> Iterator[Tuple[int, List[Tuple[int, Tuple[Optional[str], Optional[str], Optional[str]]]], bool]]:
+    # Yields (row number, wanted cells, whether any cell in min_col..max_col has a value).
+    row_number = 0
+    sheet_data = None
+    for event, element in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if element.tag == _SHEET_DATA:
+                sheet_data = element
+            continue
+        if element.tag != _ROW:
+            continue
+        reference = element.get("r")
+        row_number = int(reference) if reference else row_number + 1
+        if max_row is not None and row_number > max_row:
+            return
+        if row_number >= min_row:
+            cells = []
+            has_data = False
+            column = min_col - 1
+            for cell in element.iter(_CELL):
+                column = _column_number(cell.get("r"), column)
+                if column < min_col or column > max_col:
+                    continue
+                if wanted is not None and column not in wanted:
+                    # Presence is enough; the value itself is never decoded.
+                    has_data = has_data or cell.find(_VALUE) is not None or cell.find(_INLINE) is not None
+                    continue
+                raw = _raw_text(cell)
+                has_data = has_data or raw is not None
+                cells.append((column, (cell.get("t"), cell.get("s"), raw)))
+            yield row_number, cells, has_data
+        # Finished rows are dropped so memory stays at one row.
+        element.clear()
+        if sheet_data is not None:
+            sheet_data.remove(element)
+
+
+def _raw_text(cell) -> Optional[str]:
+    if cell.get("t") == "inlineStr":
+        inline = cell.find(_INLINE)
+        return None if inline is None else _string_item_text(inline)
+    value = cell.find(_VALUE)
+    return None if value is None else (value.text or "")
+
+
+def _string_item_text(item) -> str:
+    # Plain <t>, or rich-text runs <r><t>; phonetic guides (<rPh>) are not part of the value.
+    text = item.find(_TEXT)
+    if text is not None:
+        return text.text or ""
+    return "".join((run.findtext(_TEXT) or "") for run in item.iter(_RUN))
+
+
+def _read_shared_strings(package: zipfile.ZipFile) -> List[str]:
+    parts = _related_parts(package, "xl/workbook.xml", _SHARED_STRINGS_REL_TYPE)
+    if not parts:
+        return []
+    strings = []
+    with package.open(parts[0]) as stream:
+        for _, element in iterparse(stream, events=("end",)):
+            if element.tag == _SHARED_ITEM:
+                strings.append(_string_item_text(element))
+                element.clear()
+    return strings
+
+
+def _read_date_styles(package: zipfile.ZipFile) -> Set[int]:
+    parts = _related_parts(package, "xl/workbook.xml", _STYLES_REL_TYPE)
+    if not parts:
+        return set()
+    styles = _parse_part(package, parts[0])
+    custom_dates = {
+        int(number_format.get("numFmtId", "0"))
+        for number_format in styles.iter(f"{{{_MAIN_NS}}}numFmt")
+        if _is_date_format(number_format.get("formatCode", ""))
+    }
+    cell_formats = styles.find(f"{{{_MAIN_NS}}}cellXfs")
+    if cell_formats is None:
+        return set()
+    return {
+        index
+        for index, cell_format in enumerate(cell_formats.iter(f"{{{_MAIN_NS}}}xf"))
+        if int(cell_format.get("numFmtId", "0")) in _BUILTIN_DATE_FORMATS | custom_dates
+    }
+
+
+def _is_date_format(code: str) -> bool:
+    # Only the first section decides; "General" and pure number codes have no date letters.
+    section = _FORMAT_LITERALS.sub("", code.split(";")[0]).lower()
+    return any(letter in section for letter in "dmyhs") and "general" not in section
+
+
+def _serial_to_datetime(serial: float, epoch: dt.datetime) -> dt.datetime:
+    # Excel counts a nonexistent 1900-02-29 (serial 60); earlier serials are one day off.
+    if epoch.year == 1899 and serial < 60:
+        serial += 1
+    # Serials are stored as binary fractions of a day; round to the millisecond as openpyxl does.
+    return epoch + dt.timedelta(milliseconds=round(serial * 86_400_000))
+
+
+def _iso_to_datetime(text: str) -> Any:
+    try:
+        value = dt.datetime.fromisoformat(text)
+    except ValueError:
+        # A time of day without a date, e.g. "T08:30:00".
+        return dt.time.fromisoformat(text.lstrip("T"))
+    # Excel has no time zones; keep the wall-clock time as serial dates do.
+    return value.replace(tzinfo=None)
+
+
+def _column_positions(column_names: List[str], columns: Optional[Sequence[str]], where: str = "table") -> List[int]:
+    if columns is None:
+        return list(range(len(column_names)))
+    positions = {name.lower(): position for position, name in reversed(list(enumerate(column_names)))}
+    missing = [name for name in columns if name.lower() not in positions]
+    if missing:
+        raise ValidationError(f"Columns not found in {where}: {', '.join(missing)}")
+    return [positions[name.lower()] for name in columns]
+
+
+def _column_number(reference: Optional[str], previous: int) -> int:
+    # Cells without an r attribute follow the previous cell.
+    if not reference:
+        return previous + 1
+    match = _CELL_REF.match(reference)
+    if match is None:
+        return previous + 1
+    number = 0
+    for letter in match.group(1):
+        number = number * 26 + ord(letter) - 64
+    return number
+
+
+def _bounds(ref: str) -> Tuple[int, int, int, int]:
+    first, _, last = ref.replace("$", "").partition(":")
+    last = last or first
+    first_match, last_match = _CELL_REF.match(first), _CELL_REF.match(last)
+    if first_match is None or last_match is None:
+        raise ValidationError(f"Unsupported table range: {ref}")
+    return (
+        _column_number(first, 0),
+        int(first_match.group(2)),
+        _column_number(last, 0),
+        int(last_match.group(2)),
+    )
@@ -3,6 +3,7 @@ import tkinter as tk
 import xlwings as xw
 from tkinter import filedialog
 from pathlib import Path
+from pivot_util.excel_session import ExcelPerformanceSession
 
 print(Path(__file__).parent.parent) 
 
@@ -23,8 +24,9 @@ def ManipulateBook(event=None):
         return
     my_book = xw.Book(my_book_location)
     my_worksheet = my_book.sheets[0]
-    my_worksheet.range('A1').value = 'Hello, World'
-    my_worksheet.range('A2:E20').value = 100
+    with ExcelPerformanceSession(my_book.app):
+        my_worksheet.range('A1').value = 'Hello, World'
+        my_worksheet.range('A2:E20').value = 100
     my_book.save(Path(__file__).parent.parent._str + "/Workbooks/Output_Workbooks/" + file_name + ".xlsx")
     my_book.close()
 
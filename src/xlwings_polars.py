@@ -1,18 +1,63 @@
-import xlwings as xw
+import argparse
+import datetime as dt
+import glob
+import os
+
 import polars as pl
+import xlwings as xw
+
+from pivot_util.com_frames import benchmark_read, benchmark_write, format_transfer_timings, write_frame
+from pivot_util.polars_loader import benchmark_engines, format_timings, read_sheet, resolve_workbook_path
+
+WORKBOOK_DIR = "Workbooks"
+
 
 def xlwings_polars():
-    wb = xw.Book("Workbooks/xlwings_polars.xlsx")
-    filename = wb.fullname
+    # The path is resolved on disk; Excel is never started just to read the file.
+    filename = resolve_workbook_path(os.path.join(WORKBOOK_DIR, "xlwings_polars.xlsx"))
     print(filename)
-    wb.close()
 
-    wb_df = pl.read_excel(
-        source=filename,
-        sheet_name="Sheet1",
-        engine='openpyxl'
-    )
+    # calamine when installed, otherwise openpyxl, otherwise xlsx2csv.
+    wb_df = read_sheet(filename, sheet_name="Sheet1")
     print(wb_df)
 
+
+def benchmark():
+    paths = sorted(glob.glob(os.path.join(WORKBOOK_DIR, "*.xlsx")))
+    print(format_timings(benchmark_engines(paths)))
+
+
+def benchmark_transfers(rows=100_000):
+    # Runs against a real, hidden Excel: a fresh workbook with one generated table.
+    frame = pl.DataFrame(
+        {
+            "Customer": [f"C{i % 97}" for i in range(rows)],
+            "Shipped": [dt.datetime(2024, 1, 1) + dt.timedelta(minutes=i) for i in range(rows)],
+            "Qty": list(range(rows)),
+            "Price": [i * 0.25 for i in range(rows)],
+        }
+    )
+    app = xw.App(visible=False)
+    try:
+        book = app.books.add()
+        sheet = book.sheets[0]
+        write_frame(frame, sheet.range("A1"))
+        sheet.tables.add(sheet.range("A1").expand(), name="Data")
+        print(format_transfer_timings(benchmark_read(book, "Data")))
+        # Row-by-row writes cost one round trip per row; a slice keeps the run short.
+        print(format_transfer_timings(benchmark_write(frame.head(5_000), book.sheets.add().range("A1"))))
+    finally:
+        app.quit()
+
+
 if __name__ == "__main__":
-    xlwings_polars()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Read the example workbook into polars and time the readers.")
+    parser.add_argument(
+        "--transfers", action="store_true", help="also time COM reads and writes (starts a hidden Excel)"
+    )
+    args = parser.parse_args()
+
+    xlwings_polars()
+    benchmark()
+    if args.transfers:
+        benchmark_transfers()
@@ -0,0 +1,1097 @@
+"""
+In-memory simulation of the Excel object model, for the pivot_util tests and benchmarks.
+
+The simulator mirrors the xlwings and COM surface that pivot_util touches
+(books, sheets, ranges, ListObjects, PivotCaches and PivotTables). Every
+member access or property write on a simulated object counts as one COM round
+trip and can be charged a configurable latency, so tests and benchmarks can
+measure how code scales with round trips without Excel.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from openpyxl.utils.cell import get_column_letter, range_boundaries
+
+from pivot_util.constants import XL_COLUMN_FIELD, XL_DATA_FIELD, XL_ROW_FIELD
+
+CellKey = Tuple[int, int]
+
+# Orientation value of a field that is not placed on the pivot.
+XL_HIDDEN = 0
+
+_EPOCH = dt.datetime(1899, 12, 30)
+
+
+class SimComError(Exception):
+    """
+    Raised by simulated COM calls that Excel would reject (stands in for com_error).
+    """
+
+
+class ExcelSimulator:
+    """
+    Shared state of one simulated Excel instance: round-trip counters and latency.
+
+    Args:
+        latency: Seconds charged per round trip (default 0).
+        sleep: Function used to wait out the latency, or None to only accumulate
+            simulated_seconds without sleeping (default time.sleep).
+
+    Attributes:
+        app: Simulated App owning the books.
+        calls: Round trips per "<Type>.<member>" label.
+        round_trips: Total round trips.
+        simulated_seconds: Total latency charged.
+        layout_updates: Pivot layout recomputations triggered by field changes.
+        cells_transferred: Cells read or written through range values.
+        files: Saved workbooks by normalised full path; SimBooks.open reads from here.
+        thread_ids: Identifiers of the threads that made round trips.
+
+    Example:
+        excel = ExcelSimulator(latency=0.0002, sleep=None)
+        book = build_workbook(excel, sheet_count=120)
+        spec = PivotBuilder(workbook=book, table_name="Table120", ...)
+        generate_pivot(spec)
+        print(excel.round_trips, excel.simulated_seconds)
+    """
+
+    def __init__(self, latency: float = 0.0, sleep: Optional[Callable[[float], None]] = time.sleep) -> None:
+        self.latency = latency
+        self.sleep = sleep
+        self.calls: Counter = Counter()
+        self.round_trips = 0
+        self.simulated_seconds = 0.0
+        self.layout_updates = 0
+        self.cells_transferred = 0
+        self.files: Dict[str, SimBook] = {}
+        self.thread_ids: set = set()
+        self._tracking = True
+        with self.untracked():
+            self.app = SimApp(self)
+
+    @contextmanager
+    def untracked(self) -> Iterator[None]:
+        """
+        Suspend round-trip counting and latency, e.g. while building fixtures.
+
+        Returns:
+            Context manager.
+        """
+
+        previous = self._tracking
+        self._tracking = False
+        try:
+            yield
+        finally:
+            self._tracking = previous
+
+    def reset_counters(self) -> None:
+        """
+        Zero the round-trip, latency, layout and cell counters.
+
+        Returns:
+            None
+        """
+
+        self.calls.clear()
+        self.round_trips = 0
+        self.simulated_seconds = 0.0
+        self.layout_updates = 0
+        self.cells_transferred = 0
+
+    def transfer(self, cells: int) -> None:
+        if self._tracking:
+            self.cells_transferred += cells
+
+    def round_trip(self, label: str) -> None:
+        if not self._tracking:
+            return
+        self.calls[label] += 1
+        self.round_trips += 1
+        self.thread_ids.add(threading.get_ident())
+        if self.latency:
+            self.simulated_seconds += self.latency
+            if self.sleep is not None:
+                self.sleep(self.latency)
+
+
+class _SimObject:
+    # Public member gets and sets are round trips once the object is live.
+
+    def __init__(self, excel: ExcelSimulator) -> None:
+        object.__setattr__(self, "_excel", excel)
+
+    def __getattribute__(self, name: str) -> Any:
+        if not name.startswith("_"):
+            object.__getattribute__(self, "_excel").round_trip(f"{type(self).__name__}.{name}")
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not name.startswith("_") and self.__dict__.get("_live"):
+            self._excel.round_trip(f"{type(self).__name__}.{name}")
+        object.__setattr__(self, name, value)
+
+
+class SimApp(_SimObject):
+    """
+    Simulated xlwings App with the settings ExcelPerformanceSession toggles.
+
+    Args:
+        excel: Owning simulator.
+    """
+
+    def __init__(self, excel: ExcelSimulator) -> None:
+        super().__init__(excel)
+        self._books = SimBooks(excel, self)
+        self._quit = False
+        self.screen_updating = True
+        self.calculation = "automatic"
+        self.enable_events = True
+        self.display_alerts = True
+        self._live = True
+
+    @property
+    def books(self) -> "SimBooks":
+        return self._books
+
+    @property
+    def pid(self) -> int:
+        return os.getpid()
+
+    def add_book(self, name: str = "Book1") -> "SimBook":
+        """
+        Create an empty workbook.
+
+        Args:
+            name: Workbook name.
+
+        Returns:
+            The new SimBook.
+        """
+
+        book = SimBook(self._excel, self, name)
+        self._books._items.append(book)
+        return book
+
+    def quit(self) -> None:
+        self._books._items.clear()
+        self._quit = True
+
+
+class SimBooks(_SimObject):
+    """
+    Simulated xlwings Books collection of an App.
+
+    Args:
+        excel: Owning simulator.
+        app: Owning SimApp.
+    """
+
+    def __init__(self, excel: ExcelSimulator, app: SimApp) -> None:
+        super().__init__(excel)
+        self._app = app
+        self._items: List[SimBook] = []
+        self._live = True
+
+    def __iter__(self) -> Iterator["SimBook"]:
+        self._excel.round_trip("SimBooks.__iter__")
+        return iter(list(self._items))
+
+    def __len__(self) -> int:
+        self._excel.round_trip("SimBooks.__len__")
+        return len(self._items)
+
+    @property
+    def count(self) -> int:
+        return len(self._items)
+
+    def open(self, fullname: str) -> "SimBook":
+        """
+        Open a workbook previously saved to the simulator's files.
+
+        Args:
+            fullname: Workbook path.
+
+        Returns:
+            The open SimBook.
+
+        Raises:
+            SimComError: When no workbook was saved under that path.
+        """
+
+        key = _file_key(fullname)
+        for book in self._items:
+            if book._fullname is not None and _file_key(book._fullname) == key:
+                return book
+        if key not in self._excel.files:
+            raise SimComError(f"Sorry, we couldn't find {fullname}.")
+        book = self._excel.files[key]
+        book._closed = False
+        self._items.append(book)
+        return book
+
+
+class SimBook(_SimObject):
+    """
+    Simulated xlwings Book.
+
+    Args:
+        excel: Owning simulator.
+        app: Owning SimApp.
+        name: Workbook name.
+    """
+
+    def __init__(self, excel: ExcelSimulator, app: SimApp, name: str) -> None:
+        super().__init__(excel)
+        self._app = app
+        self._name = name
+        self._fullname: Optional[str] = None
+        self._closed = False
+        self._saves = 0
+        self._sheets = SimSheets(excel, self)
+        self._api = SimBookApi(excel, self)
+        self._live = True
+
+    @property
+    def app(self) -> SimApp:
+        return self._app
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def fullname(self) -> str:
+        # A closed workbook's COM reference no longer answers.
+        if self._closed:
+            raise SimComError("The object invoked has disconnected from its clients.")
+        return self._fullname or self._name
+
+    def save(self, path: Optional[str] = None) -> None:
+        if path is not None:
+            self._fullname = os.path.abspath(path)
+            self._name = os.path.basename(path)
+        if self._fullname is None:
+            raise SimComError("The simulator needs a path to save a new workbook.")
+        self._saves += 1
+        self._excel.files[_file_key(self._fullname)] = self
+
+    def close(self) -> None:
+        self._closed = True
+        if self in self._app._books._items:
+            self._app._books._items.remove(self)
+
+    @property
+    def sheets(self) -> "SimSheets":
+        return self._sheets
+
+    @property
+    def api(self) -> "SimBookApi":
+        return self._api
+
+
+class SimSheets(_SimObject):
+    """
+    Simulated xlwings Sheets collection; iteration and indexing cost a round trip per sheet.
+
+    Args:
+        excel: Owning simulator.
+        book: Owning SimBook.
+    """
+
+    def __init__(self, excel: ExcelSimulator, book: SimBook) -> None:
+        super().__init__(excel)
+        self._book = book
+        self._items: List[SimSheet] = []
+        self._live = True
+
+    def __iter__(self) -> Iterator["SimSheet"]:
+        for sheet in list(self._items):
+            self._excel.round_trip("SimSheets.__iter__")
+            yield sheet
+
+    def __len__(self) -> int:
+        self._excel.round_trip("SimSheets.__len__")
+        return len(self._items)
+
+    def __getitem__(self, key: Union[int, str]) -> "SimSheet":
+        self._excel.round_trip("SimSheets.__getitem__")
+        if isinstance(key, int):
+            return self._items[key]
+        for sheet in self._items:
+            if sheet._name.lower() == key.lower():
+                return sheet
+        raise KeyError(key)
+
+    def add(self, name: Optional[str] = None, before: Optional["SimSheet"] = None, after: Optional["SimSheet"] = None) -> "SimSheet":
+        """
+        Add a sheet, mirroring xlwings Sheets.add.
+
+        Args:
+            name: Sheet name (default "SheetN").
+            before: Sheet to insert before.
+            after: Sheet to insert after (default: append).
+
+        Returns:
+            The new SimSheet.
+
+        Raises:
+            SimComError: When a sheet with the same name already exists.
+        """
+
+        name = name or f"Sheet{len(self._items) + 1}"
+        if any(sheet._name.lower() == name.lower() for sheet in self._items):
+            raise SimComError(f"That name is already taken: {name}")
+        sheet = SimSheet(self._excel, self._book, name)
+        if before is not None:
+            self._items.insert(self._items.index(before), sheet)
+        elif after is not None:
+            self._items.insert(self._items.index(after) + 1, sheet)
+        else:
+            self._items.append(sheet)
+        return sheet
+
+
+class SimBookApi(_SimObject):
+    """
+    Simulated COM Workbook behind SimBook.api.
+
+    Args:
+        excel: Owning simulator.
+        book: Owning SimBook.
+    """
+
+    def __init__(self, excel: ExcelSimulator, book: SimBook) -> None:
+        super().__init__(excel)
+        self._book = book
+        self._pivot_caches = SimPivotCaches(excel, book)
+        self._live = True
+
+    def PivotCaches(self) -> "SimPivotCaches":
+        return self._pivot_caches
+
+
+class SimSheet(_SimObject):
+    """
+    Simulated xlwings Sheet holding a sparse cell store, ListObjects and PivotTables.
+
+    Args:
+        excel: Owning simulator.
+        book: Owning SimBook.
+        name: Sheet name.
+    """
+
+    def __init__(self, excel: ExcelSimulator, book: SimBook, name: str) -> None:
+        super().__init__(excel)
+        self._book = book
+        self._name = name
+        self._cells: Dict[CellKey, Any] = {}
+        # Formatted but empty blocks still extend the used range, as in Excel.
+        self._formatted: List[Tuple[int, int, int, int]] = []
+        self._list_objects: List[SimListObject] = []
+        self._pivot_tables: List[SimPivotTable] = []
+        self._api = SimSheetApi(excel, self)
+        self._live = True
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def book(self) -> SimBook:
+        return self._book
+
+    @property
+    def api(self) -> "SimSheetApi":
+        return self._api
+
+    @property
+    def used_range(self) -> "SimRange":
+        return SimRange(self._excel, self, *self._used_bounds())
+
+    def range(self, first: Union[str, CellKey], last: Optional[CellKey] = None) -> "SimRange":
+        if isinstance(first, str):
+            return SimRange(self._excel, self, *_bounds(first))
+        last = last or first
+        return SimRange(self._excel, self, first[0], first[1], last[0], last[1])
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._formatted.clear()
+        self._list_objects.clear()
+        self._pivot_tables.clear()
+
+    def add_table(
+        self,
+        name: str,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]] = (),
+        top_left: str = "A1",
+    ) -> "SimListObject":
+        """
+        Write a header row and data rows and define a ListObject over them.
+
+        Args:
+            name: Table name.
+            columns: Header names.
+            rows: Data rows (each the same length as columns).
+            top_left: Address of the header's first cell.
+
+        Returns:
+            The new SimListObject.
+        """
+
+        min_col, min_row, _, _ = range_boundaries(top_left)
+        self._write(min_row, min_col, [list(columns)] + [list(row) for row in rows])
+        bounds = (min_row, min_col, min_row + max(len(rows), 1), min_col + len(columns) - 1)
+        list_object = SimListObject(self._excel, self, name, bounds)
+        self._list_objects.append(list_object)
+        return list_object
+
+    def _used_bounds(self) -> Tuple[int, int, int, int]:
+        blocks = [(row, col, row, col) for row, col in self._cells] + self._formatted
+        if not blocks:
+            return (1, 1, 1, 1)
+        return (
+            min(block[0] for block in blocks),
+            min(block[1] for block in blocks),
+            max(block[2] for block in blocks),
+            max(block[3] for block in blocks),
+        )
+
+    def _count(self, bounds: Tuple[int, int, int, int]) -> int:
+        min_row, min_col, max_row, max_col = bounds
+        return sum(
+            1 for row, col in self._cells if min_row <= row <= max_row and min_col <= col <= max_col
+        )
+
+    def _read(self, bounds: Tuple[int, int, int, int]) -> List[List[Any]]:
+        min_row, min_col, max_row, max_col = bounds
+        self._excel.transfer((max_row - min_row + 1) * (max_col - min_col + 1))
+        return [
+            [self._cells.get((row, col)) for col in range(min_col, max_col + 1)]
+            for row in range(min_row, max_row + 1)
+        ]
+
+    def _write(self, row: int, col: int, values: Sequence[Sequence[Any]]) -> None:
+        self._excel.transfer(sum(len(row_values) for row_values in values))
+        for row_offset, row_values in enumerate(values):
+            for col_offset, value in enumerate(row_values):
+                key = (row + row_offset, col + col_offset)
+                if value is None or value == "":
+                    self._cells.pop(key, None)
+                else:
+                    self._cells[key] = value
+
+
+class SimSheetApi(_SimObject):
+    """
+    Simulated COM Worksheet behind SimSheet.api.
+
+    Args:
+        excel: Owning simulator.
+        sheet: Owning SimSheet.
+    """
+
+    def __init__(self, excel: ExcelSimulator, sheet: SimSheet) -> None:
+        super().__init__(excel)
+        self._sheet = sheet
+        self._live = True
+
+    @property
+    def Name(self) -> str:
+        return self._sheet._name
+
+    @property
+    def Application(self) -> "SimApplicationApi":
+        return SimApplicationApi(self._excel)
+
+    @property
+    def UsedRange(self) -> "SimComRange":
+        return SimComRange(self._excel, self._sheet, self._sheet._used_bounds())
+
+    @property
+    def ListObjects(self) -> "SimCollection":
+        return SimCollection(self._excel, "ListObjects", self._sheet._list_objects)
+
+    def PivotTables(self, key: Union[int, str, None] = None) -> Any:
+        collection = SimCollection(self._excel, "PivotTables", self._sheet._pivot_tables)
+        return collection if key is None else collection.Item(key)
+
+    def Range(self, address: str) -> "SimComRange":
+        return SimComRange(self._excel, self._sheet, _bounds(address))
+
+
+class SimApplicationApi(_SimObject):
+    """
+    Simulated COM Application reached from a worksheet.
+
+    Args:
+        excel: Owning simulator.
+    """
+
+    def __init__(self, excel: ExcelSimulator) -> None:
+        super().__init__(excel)
+        self._live = True
+
+    @property
+    def WorksheetFunction(self) -> "SimWorksheetFunction":
+        return SimWorksheetFunction(self._excel)
+
+
+class SimWorksheetFunction(_SimObject):
+    """
+    Simulated COM WorksheetFunction; functions are evaluated inside "Excel".
+
+    Args:
+        excel: Owning simulator.
+    """
+
+    def __init__(self, excel: ExcelSimulator) -> None:
+        super().__init__(excel)
+        self._live = True
+
+    def CountA(self, *ranges: "SimComRange") -> int:
+        return sum(rng._sheet._count(rng._bounds) for rng in ranges)
+
+
+class SimCollection(_SimObject):
+    """
+    Simulated COM collection addressed by 1-based index or case-insensitive name.
+
+    Args:
+        excel: Owning simulator.
+        kind: Collection name used in error messages (e.g. "ListObjects").
+        items: Objects with a _name attribute.
+    """
+
+    def __init__(self, excel: ExcelSimulator, kind: str, items: List[Any]) -> None:
+        super().__init__(excel)
+        self._kind = kind
+        self._items = items
+        self._live = True
+
+    def __call__(self, key: Union[int, str]) -> Any:
+        return self._item(key)
+
+    @property
+    def Count(self) -> int:
+        return len(self._items)
+
+    def Item(self, key: Union[int, str]) -> Any:
+        return self._item(key)
+
+    def _item(self, key: Union[int, str]) -> Any:
+        if isinstance(key, int):
+            if 1 <= key <= len(self._items):
+                return self._items[key - 1]
+        else:
+            for item in self._items:
+                if item._name.lower() == str(key).lower():
+                    return item
+        raise SimComError(f"Unable to get the {self._kind} item {key!r}.")
+
+
+class SimRange(_SimObject):
+    """
+    Simulated xlwings Range.
+
+    Args:
+        excel: Owning simulator.
+        sheet: Owning SimSheet.
+        min_row, min_col, max_row, max_col: 1-based inclusive bounds.
+    """
+
+    def __init__(self, excel: ExcelSimulator, sheet: SimSheet, min_row: int, min_col: int, max_row: int, max_col: int) -> None:
+        super().__init__(excel)
+        self._sheet = sheet
+        self._bounds = (min_row, min_col, max_row, max_col)
+        self._live = True
+
+    @property
+    def api(self) -> "SimComRange":
+        return SimComRange(self._excel, self._sheet, self._bounds)
+
+    @property
+    def address(self) -> str:
+        return _address(self._bounds)
+
+    @property
+    def sheet(self) -> SimSheet:
+        return self._sheet
+
+    @property
+    def row(self) -> int:
+        return self._bounds[0]
+
+    @property
+    def column(self) -> int:
+        return self._bounds[1]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        min_row, min_col, max_row, max_col = self._bounds
+        return (max_row - min_row + 1, max_col - min_col + 1)
+
+    @property
+    def number_format(self) -> str:
+        return "General"
+
+    @number_format.setter
+    def number_format(self, value: str) -> None:
+        self._sheet._formatted.append(self._bounds)
+
+    def options(self, *args: Any, **kwargs: Any) -> "SimRange":
+        # Converter options are accepted and ignored; values are already Python objects.
+        return self
+
+    @property
+    def value(self) -> Any:
+        # xlwings returns a scalar for one cell, a list for one row or column, else rows.
+        rows = self._sheet._read(self._bounds)
+        if len(rows) == 1 and len(rows[0]) == 1:
+            return rows[0][0]
+        if len(rows) == 1:
+            return rows[0]
+        if all(len(row) == 1 for row in rows):
+            return [row[0] for row in rows]
+        return rows
+
+    @value.setter
+    def value(self, values: Any) -> None:
+        self._sheet._write(self._bounds[0], self._bounds[1], _as_rows(values))
+
+
+class SimComRange(_SimObject):
+    """
+    Simulated COM Range behind SimRange.api and ListObject ranges.
+
+    Args:
+        excel: Owning simulator.
+        sheet: Owning SimSheet.
+        bounds: (min_row, min_col, max_row, max_col), 1-based inclusive.
+    """
+
+    def __init__(self, excel: ExcelSimulator, sheet: SimSheet, bounds: Tuple[int, int, int, int]) -> None:
+        super().__init__(excel)
+        self._sheet = sheet
+        self._bounds = bounds
+        self._live = True
+
+    @property
+    def Address(self) -> str:
+        return _address(self._bounds, absolute=True)
+
+    @property
+    def Row(self) -> int:
+        return self._bounds[0]
+
+    @property
+    def Column(self) -> int:
+        return self._bounds[1]
+
+    @property
+    def Value(self) -> Any:
+        return self._get_value()
+
+    @Value.setter
+    def Value(self, values: Any) -> None:
+        self._sheet._write(self._bounds[0], self._bounds[1], _as_rows(values))
+
+    @property
+    def Value2(self) -> Any:
+        # Value2 skips the Date conversion: dates come back as serial numbers.
+        value = self._get_value()
+        if isinstance(value, tuple):
+            return tuple(tuple(_serial(cell) for cell in row) for row in value)
+        return _serial(value)
+
+    @Value2.setter
+    def Value2(self, values: Any) -> None:
+        self._sheet._write(self._bounds[0], self._bounds[1], _as_rows(values))
+
+    @property
+    def NumberFormat(self) -> str:
+        return "General"
+
+    @NumberFormat.setter
+    def NumberFormat(self, value: str) -> None:
+        self._sheet._formatted.append(self._bounds)
+
+    def ClearContents(self) -> None:
+        min_row, min_col, max_row, max_col = self._bounds
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                self._sheet._cells.pop((row, col), None)
+
+    def Rows(self, index: int) -> "SimComRange":
+        min_row, min_col, max_row, max_col = self._bounds
+        if not 1 <= index <= max_row - min_row + 1:
+            raise SimComError(f"Rows index {index} is out of range.")
+        row = min_row + index - 1
+        return SimComRange(self._excel, self._sheet, (row, min_col, row, max_col))
+
+    def _get_value(self) -> Any:
+        # COM returns a scalar for one cell, else a tuple of row tuples.
+        rows = self._sheet._read(self._bounds)
+        if len(rows) == 1 and len(rows[0]) == 1:
+            return rows[0][0]
+        return tuple(tuple(row) for row in rows)
+
+
+class SimListObject(_SimObject):
+    """
+    Simulated COM ListObject (Excel Table) over a block of sheet cells.
+
+    Args:
+        excel: Owning simulator.
+        sheet: Owning SimSheet.
+        name: Table name.
+        bounds: (min_row, min_col, max_row, max_col) including the header row.
+            A totals row, once ShowTotals is set, sits below max_row.
+    """
+
+    def __init__(self, excel: ExcelSimulator, sheet: SimSheet, name: str, bounds: Tuple[int, int, int, int]) -> None:
+        super().__init__(excel)
+        self._sheet = sheet
+        self._name = name
+        self._bounds = bounds
+        self._show_totals = False
+        self._live = True
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @property
+    def Parent(self) -> SimSheetApi:
+        return self._sheet._api
+
+    @property
+    def Range(self) -> SimComRange:
+        min_row, min_col, max_row, max_col = self._bounds
+        return SimComRange(self._excel, self._sheet, (min_row, min_col, max_row + self._show_totals, max_col))
+
+    @property
+    def ShowTotals(self) -> bool:
+        return self._show_totals
+
+    @ShowTotals.setter
+    def ShowTotals(self, value: bool) -> None:
+        # Like Excel, the totals row is rebuilt below the body: a label in the first column.
+        _, min_col, max_row, max_col = self._bounds
+        for col in range(min_col, max_col + 1):
+            self._sheet._cells.pop((max_row + 1, col), None)
+        if value:
+            self._sheet._cells[(max_row + 1, min_col)] = "Total"
+        self._show_totals = bool(value)
+
+    @property
+    def HeaderRowRange(self) -> SimComRange:
+        min_row, min_col, _, max_col = self._bounds
+        return SimComRange(self._excel, self._sheet, (min_row, min_col, min_row, max_col))
+
+    @property
+    def DataBodyRange(self) -> Optional[SimComRange]:
+        min_row, min_col, max_row, max_col = self._bounds
+        if max_row == min_row:
+            return None
+        return SimComRange(self._excel, self._sheet, (min_row + 1, min_col, max_row, max_col))
+
+    @property
+    def ListColumns(self) -> "SimListColumns":
+        return SimListColumns(self._excel, self._header_names())
+
+    def Resize(self, Range: SimComRange) -> None:
+        min_row, min_col, max_row, _ = Range._bounds
+        if (min_row, min_col) != self._bounds[:2] or max_row == min_row:
+            raise SimComError("Resize must keep the header row and leave at least one data row.")
+        if self._show_totals:
+            raise SimComError("The simulator only resizes tables without a totals row.")
+        self._bounds = Range._bounds
+
+    def _header_names(self) -> List[str]:
+        min_row, min_col, _, max_col = self._bounds
+        return [str(self._sheet._cells.get((min_row, col), "")) for col in range(min_col, max_col + 1)]
+
+
+class SimListColumns(_SimObject):
+    """
+    Simulated COM ListColumns collection.
+
+    Args:
+        excel: Owning simulator.
+        names: Column names in table order.
+    """
+
+    def __init__(self, excel: ExcelSimulator, names: List[str]) -> None:
+        super().__init__(excel)
+        self._names = names
+        self._live = True
+
+    @property
+    def Count(self) -> int:
+        return len(self._names)
+
+    def Item(self, index: int) -> "SimListColumn":
+        if not 1 <= index <= len(self._names):
+            raise SimComError(f"ListColumns index {index} is out of range.")
+        return SimListColumn(self._excel, self._names[index - 1])
+
+
+class SimListColumn(_SimObject):
+    """
+    Simulated COM ListColumn.
+
+    Args:
+        excel: Owning simulator.
+        name: Column name.
+    """
+
+    def __init__(self, excel: ExcelSimulator, name: str) -> None:
+        super().__init__(excel)
+        self._name = name
+        self._live = True
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+
+class SimPivotCaches(_SimObject):
+    """
+    Simulated COM PivotCaches collection of a workbook.
+
+    Args:
+        excel: Owning simulator.
+        book: Owning SimBook.
+    """
+
+    def __init__(self, excel: ExcelSimulator, book: SimBook) -> None:
+        super().__init__(excel)
+        self._book = book
+        self._caches: List[SimPivotCache] = []
+        self._live = True
+
+    @property
+    def Count(self) -> int:
+        return len(self._caches)
+
+    def Create(self, SourceType: int, SourceData: Any, Version: Optional[int] = None) -> "SimPivotCache":
+        if not isinstance(SourceData, SimComRange):
+            raise SimComError("PivotCaches.Create needs a Range source in the simulator.")
+        cache = SimPivotCache(self._excel, SourceData)
+        self._caches.append(cache)
+        return cache
+
+
+class SimPivotCache(_SimObject):
+    """
+    Simulated COM PivotCache over a source range.
+
+    Args:
+        excel: Owning simulator.
+        source: Source range (header row first).
+    """
+
+    def __init__(self, excel: ExcelSimulator, source: SimComRange) -> None:
+        super().__init__(excel)
+        self._source = source
+        self._live = True
+
+    def CreatePivotTable(self, TableDestination: Any, TableName: str = "") -> "SimPivotTable":
+        if not isinstance(TableDestination, SimComRange):
+            raise SimComError("CreatePivotTable needs a Range destination in the simulator.")
+        sheet = TableDestination._sheet
+        book_sheets = sheet._book._sheets._items
+        if any(table._name.lower() == TableName.lower() for other in book_sheets for table in other._pivot_tables):
+            raise SimComError(f"A PivotTable named {TableName!r} already exists.")
+        min_row, min_col, max_row, max_col = self._source._bounds
+        columns = [str(value) for value in self._source._sheet._read((min_row, min_col, min_row, max_col))[0]]
+        table = SimPivotTable(self._excel, self, TableName, columns)
+        sheet._pivot_tables.append(table)
+        return table
+
+
+class SimPivotTable(_SimObject):
+    """
+    Simulated COM PivotTable that counts layout recomputations.
+
+    Each field property write recomputes the layout unless ManualUpdate is True,
+    in which case the layout stays stale until RefreshTable recomputes it once.
+
+    Args:
+        excel: Owning simulator.
+        cache: Source SimPivotCache.
+        name: Pivot table name.
+        columns: Source column names.
+    """
+
+    def __init__(self, excel: ExcelSimulator, cache: SimPivotCache, name: str, columns: List[str]) -> None:
+        super().__init__(excel)
+        self._cache = cache
+        self._name = name
+        self._fields = {column.lower(): SimPivotField(excel, self, column) for column in columns}
+        self._manual_update = False
+        self._layout_pending = False
+        self.TableStyle2 = ""
+        self.ShowTableStyleRowStripes = False
+        self._live = True
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @property
+    def PivotCache(self) -> SimPivotCache:
+        return self._cache
+
+    @property
+    def ManualUpdate(self) -> bool:
+        return self._manual_update
+
+    @ManualUpdate.setter
+    def ManualUpdate(self, value: bool) -> None:
+        self._manual_update = bool(value)
+
+    @property
+    def layout_pending(self) -> bool:
+        # Simulator only: whether field changes are waiting for RefreshTable.
+        return self._layout_pending
+
+    def RefreshTable(self) -> bool:
+        self._excel.layout_updates += 1
+        self._layout_pending = False
+        return True
+
+    def PivotFields(self, name: str) -> "SimPivotField":
+        try:
+            return self._fields[name.lower()]
+        except KeyError:
+            raise SimComError(f"Unable to get the PivotFields property: {name!r}.") from None
+
+    def _layout_changed(self) -> None:
+        if self._manual_update:
+            self._layout_pending = True
+        else:
+            self._excel.layout_updates += 1
+
+
+class SimPivotField(_SimObject):
+    """
+    Simulated COM PivotField; property writes trigger a layout recomputation.
+
+    Args:
+        excel: Owning simulator.
+        table: Owning SimPivotTable.
+        name: Source column name.
+    """
+
+    _ORIENTATIONS = (XL_HIDDEN, XL_ROW_FIELD, XL_COLUMN_FIELD, XL_DATA_FIELD)
+
+    def __init__(self, excel: ExcelSimulator, table: SimPivotTable, name: str) -> None:
+        super().__init__(excel)
+        self._table = table
+        self.Name = name
+        self.Orientation = XL_HIDDEN
+        self.Position: Optional[int] = None
+        self.Function: Optional[int] = None
+        self.Caption = name
+        self.NumberFormat = "General"
+        self._live = True
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "Orientation" and value not in self._ORIENTATIONS:
+            raise SimComError(f"Unable to set the Orientation property to {value!r}.")
+        super().__setattr__(name, value)
+        if not name.startswith("_") and self.__dict__.get("_live"):
+            self._table._layout_changed()
+
+
+def build_workbook(
+    excel: ExcelSimulator,
+    sheet_count: int = 1,
+    tables_per_sheet: int = 1,
+    columns: Sequence[str] = ("Customer", "Category", "Qty", "Total", "Name"),
+    rows: Optional[Sequence[Sequence[Any]]] = None,
+    name: str = "Book1",
+    path: Optional[str] = None,
+) -> SimBook:
+    """
+    Build a workbook of identical data sheets without counting round trips.
+
+    Sheets are named "Data1".."DataN" and tables "Table1".."TableM" in sheet
+    order, each placed side by side with one blank column between them.
+
+    Args:
+        excel: Owning simulator.
+        sheet_count: Number of data sheets.
+        tables_per_sheet: Number of ListObjects per sheet.
+        columns: Header names of every table.
+        rows: Data rows of every table (default: three generated rows).
+        name: Workbook name.
+        path: If given, the workbook is saved there (and closed), so that
+            app.books.open(path) opens it.
+
+    Returns:
+        The new SimBook.
+    """
+
+    if rows is None:
+        rows = [[f"{column}{i}" if i % 2 else i for column in columns] for i in range(1, 4)]
+    with excel.untracked():
+        book = excel.app.add_book(name)
+        table_number = 1
+        for sheet_number in range(1, sheet_count + 1):
+            sheet = book.sheets.add(f"Data{sheet_number}")
+            for slot in range(tables_per_sheet):
+                top_left = f"{get_column_letter(1 + slot * (len(columns) + 1))}1"
+                sheet.add_table(f"Table{table_number}", columns, rows, top_left=top_left)
+                table_number += 1
+        if path is not None:
+            book.save(path)
+            book.close()
+    return book
+
+
+def _file_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _bounds(address: str) -> Tuple[int, int, int, int]:
+    min_col, min_row, max_col, max_row = range_boundaries(address.replace("$", ""))
+    return (min_row, min_col, max_row or min_row, max_col or min_col)
+
+
+def _address(bounds: Tuple[int, int, int, int], absolute: bool = True) -> str:
+    min_row, min_col, max_row, max_col = bounds
+    mark = "$" if absolute else ""
+    first = f"{mark}{get_column_letter(min_col)}{mark}{min_row}"
+    if (min_row, min_col) == (max_row, max_col):
+        return first
+    return f"{first}:{mark}{get_column_letter(max_col)}{mark}{max_row}"
+
+
+def _serial(value: Any) -> Any:
+    # Excel stores dates as days since 1899-12-30 (1900 date system).
+    if isinstance(value, dt.datetime):
+        return (value - _EPOCH).total_seconds() / 86_400
+    if isinstance(value, dt.date):
+        return float((value - _EPOCH.date()).days)
+    return value
+
+
+def _as_rows(values: Any) -> List[List[Any]]:
+    if not isinstance(values, (list, tuple)):
+        return [[values]]
+    if values and all(isinstance(row, (list, tuple)) for row in values):
+        return [list(row) for row in values]
+    return [list(values)]
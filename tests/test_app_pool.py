@@ -0,0 +1,194 @@
+"""
+Unit tests for the Excel application pool using a stand-in App factory.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import threading
+from typing import List
+
+import pytest
+
+from pivot_util.app_pool import ExcelAppPool, excel_app
+
+
+class FakeBook:
+    def __init__(self, books: List["FakeBook"]) -> None:
+        self._books = books
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+        self._books.remove(self)
+
+
+class FakeBooks(list):
+    @property
+    def count(self) -> int:
+        if not self.alive:
+            raise RuntimeError("The RPC server is unavailable.")
+        return len(self)
+
+
+class FakeApp:
+    _next_pid = 1000
+
+    def __init__(self) -> None:
+        FakeApp._next_pid += 1
+        self.pid = FakeApp._next_pid
+        self.books = FakeBooks()
+        self.books.alive = True
+        self.quit_called = False
+        self.memory_mb = 200.0
+
+    def open_book(self) -> FakeBook:
+        book = FakeBook(self.books)
+        self.books.append(book)
+        return book
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+class FakeFactory:
+    def __init__(self) -> None:
+        self.apps: List[FakeApp] = []
+
+    def __call__(self) -> FakeApp:
+        app = FakeApp()
+        self.apps.append(app)
+        return app
+
+
+def _pool(factory: FakeFactory, **kwargs) -> ExcelAppPool:
+    kwargs.setdefault("memory_probe", lambda app: app.memory_mb)
+    return ExcelAppPool(factory=factory, **kwargs)
+
+
+def test_prestarted_app_is_reused_across_jobs() -> None:
+    factory = FakeFactory()
+    with _pool(factory, size=2, prestart=1) as pool:
+        assert pool.idle_count == 1
+        for _ in range(5):
+            with pool.lease() as app:
+                book = app.open_book()
+        assert len(factory.apps) == 1
+        assert book.closed is True
+        assert pool.jobs == 5
+    assert factory.apps[0].quit_called is True
+
+
+def test_apps_are_recycled_after_max_jobs() -> None:
+    factory = FakeFactory()
+    pool = _pool(factory, size=1, max_jobs_per_app=3)
+
+    for _ in range(7):
+        with pool.lease():
+            pass
+
+    assert len(factory.apps) == 3
+    assert [app.quit_called for app in factory.apps] == [True, True, False]
+    assert pool.retired == 2
+
+
+def test_apps_are_recycled_above_memory_threshold() -> None:
+    factory = FakeFactory()
+    pool = _pool(factory, size=1, max_memory_mb=500)
+
+    with pool.lease() as app:
+        app.memory_mb = 900.0
+    with pool.lease() as second:
+        pass
+
+    assert second is not app
+    assert app.quit_called is True
+
+
+def test_memory_threshold_requires_a_way_to_measure_memory(monkeypatch) -> None:
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None if name == "psutil" else find_spec(name))
+
+    with pytest.raises(ImportError, match="psutil"):
+        ExcelAppPool(factory=FakeFactory(), max_memory_mb=500)
+    ExcelAppPool(factory=FakeFactory())
+    ExcelAppPool(factory=FakeFactory(), max_memory_mb=500, memory_probe=lambda app: app.memory_mb)
+
+
+def test_unhealthy_idle_app_is_replaced_on_checkout() -> None:
+    factory = FakeFactory()
+    pool = _pool(factory, size=1)
+    pool.start()
+    factory.apps[0].books.alive = False
+
+    app = pool.checkout()
+
+    assert app is factory.apps[1]
+    assert factory.apps[0].quit_called is True
+
+
+def test_failed_job_discards_its_app() -> None:
+    factory = FakeFactory()
+    pool = _pool(factory, size=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            raise RuntimeError("COM failure")
+
+    assert factory.apps[0].quit_called is True
+    assert pool.idle_count == 0 and pool.busy_count == 0
+
+
+def test_size_cap_blocks_and_times_out() -> None:
+    factory = FakeFactory()
+    pool = _pool(factory, size=2)
+    first = pool.checkout()
+    pool.checkout()
+
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.01)
+
+    released = threading.Timer(0.05, pool.checkin, args=(first,))
+    released.start()
+    assert pool.checkout(timeout=5) is first
+    released.join()
+    assert len(factory.apps) == 2
+
+
+def test_concurrent_jobs_never_exceed_size() -> None:
+    factory = FakeFactory()
+    pool = _pool(factory, size=3)
+    peak = []
+    lock = threading.Lock()
+
+    def job() -> None:
+        with pool.lease():
+            with lock:
+                peak.append(pool.busy_count)
+
+    threads = [threading.Thread(target=job) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 3
+    assert len(factory.apps) <= 3
+    assert pool.jobs == 20
+
+
+def test_checkin_rejects_foreign_apps_and_closed_pool_refuses_checkout() -> None:
+    pool = _pool(FakeFactory(), size=1)
+    with pytest.raises(ValueError):
+        pool.checkin(FakeApp())
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.checkout()
+
+
+def test_excel_app_leases_from_pool() -> None:
+    factory = FakeFactory()
+    pool = _pool(factory, size=1)
+    with excel_app(pool) as app:
+        assert app is factory.apps[0]
+    assert pool.idle_count == 1
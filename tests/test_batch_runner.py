@@ -0,0 +1,164 @@
+"""
+Tests for the parallel multi-workbook pivot runner, using the offline .xlsx backend.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from pivot_util.batch_runner import (
+    JOB_ERROR,
+    JOB_OK,
+    JOB_TIMEOUT,
+    PivotJob,
+    XlsxBackend,
+    run_manifest,
+)
+from pivot_util.constants import DestinationHandling, SummaryFunction
+from pivot_util.fields import DataField, RowField
+from pivot_util.pivot_builder import PivotBuilder
+from pivot_util.pivot_util import PivotBatchReport
+
+
+EXAMPLE_WORKBOOK = Path(__file__).resolve().parents[1] / "Workbooks" / "pivot_table_example.xlsx"
+
+
+class SlowBackend(XlsxBackend):
+    """Hangs on workbooks whose name contains "slow", like a stuck Excel."""
+
+    def run(self, job: PivotJob) -> PivotBatchReport:
+        if "slow" in os.path.basename(job.workbook_path):
+            time.sleep(30)
+        return super().run(job)
+
+
+class SlowStartBackend(XlsxBackend):
+    """Takes longer to start than the job timeout, like a cold Excel launch."""
+
+    def open(self) -> None:
+        time.sleep(3)
+
+
+class HelperProcessBackend(XlsxBackend):
+    """Starts a helper process per worker, like Excel, and logs every job it runs."""
+
+    def __init__(self, log_dir: Path) -> None:
+        self.log_dir = log_dir
+        self.pid = None
+        self._helper = None
+
+    def open(self) -> None:
+        self._helper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        self.pid = self._helper.pid
+        (self.log_dir / f"helper-{os.getpid()}").write_text(str(self.pid))
+
+    def run(self, job: PivotJob) -> PivotBatchReport:
+        name = os.path.basename(job.workbook_path)
+        with open(self.log_dir / "runs.log", "a") as log:
+            log.write(name + "\n")
+        time.sleep({"slow.xlsx": 30, "first.xlsx": 1.0, "medium.xlsx": 1.5}.get(name, 0))
+        return super().run(job)
+
+    def close(self) -> None:
+        self._helper.kill()
+        self._helper.wait()
+
+
+def _process_running(pid: int) -> bool:
+    # Killed helpers are reparented and may linger as zombies until reaped.
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _spec(path: Path, pivot_table_name: str, table_name: str = "Table1") -> PivotBuilder:
+    return PivotBuilder(
+        workbook=str(path),
+        table_name=table_name,
+        pivot_sheet_name=f"Sheet_{pivot_table_name}",
+        pivot_table_name=pivot_table_name,
+        row_fields=[RowField(name="Customer")],
+        data_fields=[DataField(name="Total", function=SummaryFunction.SUM)],
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+    )
+
+
+def _manifest(tmp_path: Path, names) -> list:
+    jobs = []
+    for name in names:
+        path = tmp_path / f"{name}.xlsx"
+        shutil.copy(EXAMPLE_WORKBOOK, path)
+        jobs.append(PivotJob(str(path), [_spec(path, "PT_A"), _spec(path, "PT_B")]))
+    return jobs
+
+
+def test_runner_builds_every_workbook_in_parallel(tmp_path: Path) -> None:
+    jobs = _manifest(tmp_path, [f"book{i}" for i in range(4)])
+    bad_path = tmp_path / "bad.xlsx"
+    shutil.copy(EXAMPLE_WORKBOOK, bad_path)
+    jobs.append(PivotJob(str(bad_path), [_spec(bad_path, "PT_X", table_name="Missing")]))
+
+    summary = run_manifest(jobs, backend=XlsxBackend(), max_workers=2)
+
+    assert [result.status for result in summary.results] == [JOB_OK] * 4 + [JOB_ERROR]
+    assert summary.pivots == 8
+    assert "ValidationError" in summary.results[-1].error
+    assert len({result.worker_pid for result in summary.results}) <= 2
+    assert "5 workbooks, 8 pivots" in summary.format()
+    assert summary.jobs_per_second > 0
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(jobs[1].workbook_path)
+    assert [pivot.name for pivot in workbook["Sheet_PT_B"]._pivots] == ["PT_B"]
+
+
+def test_runner_times_out_hung_jobs_and_finishes_the_rest(tmp_path: Path) -> None:
+    jobs = _manifest(tmp_path, ["slow", "fast1", "fast2"])
+
+    started = time.perf_counter()
+    summary = run_manifest(jobs, backend=SlowBackend(), max_workers=2, timeout=2.0)
+
+    assert time.perf_counter() - started < 20
+    assert [result.status for result in summary.results] == [JOB_TIMEOUT, JOB_OK, JOB_OK]
+    assert summary.count(JOB_TIMEOUT) == 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads process state from /proc")
+def test_runner_kills_only_the_stuck_worker_and_its_helper(tmp_path: Path) -> None:
+    jobs = _manifest(tmp_path, ["slow", "first", "medium"])
+
+    summary = run_manifest(jobs, backend=HelperProcessBackend(tmp_path), max_workers=2, timeout=2.0)
+
+    assert [result.status for result in summary.results] == [JOB_TIMEOUT, JOB_OK, JOB_OK]
+    # "medium" was still running when "slow" timed out; it finished on its own worker and ran once.
+    assert sorted((tmp_path / "runs.log").read_text().split()) == ["first.xlsx", "medium.xlsx", "slow.xlsx"]
+    assert summary.results[1].worker_pid == summary.results[2].worker_pid
+    helper_pid = int((tmp_path / f"helper-{summary.results[0].worker_pid}").read_text())
+    deadline = time.perf_counter() + 5
+    while _process_running(helper_pid) and time.perf_counter() < deadline:
+        time.sleep(0.1)
+    assert not _process_running(helper_pid)
+
+
+def test_runner_timeout_starts_when_a_worker_picks_up_the_job(tmp_path: Path) -> None:
+    jobs = _manifest(tmp_path, ["book0", "book1", "book2"])
+
+    summary = run_manifest(jobs, backend=SlowStartBackend(), max_workers=1, timeout=2.0)
+
+    # Worker start-up and queueing behind other jobs do not count against the timeout.
+    assert [result.status for result in summary.results] == [JOB_OK] * 3
+
+
+def test_runner_rejects_zero_workers() -> None:
+    with pytest.raises(ValueError):
+        run_manifest([], backend=XlsxBackend(), max_workers=0)
@@ -0,0 +1,259 @@
+"""
+Tests for bulk ListObject transfers, driven against the Excel simulator.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+
+import polars as pl
+import pytest
+
+from pivot_util.com_frames import (
+    _frame_from_value2,
+    benchmark_read,
+    benchmark_write,
+    format_transfer_timings,
+    read_list_object,
+    read_table_frame,
+    serial_to_datetime,
+    write_frame,
+    write_list_object,
+)
+from pivot_util.errors import ValidationError
+
+from excel_sim import ExcelSimulator, build_workbook
+
+COLUMNS = ("Customer", "Shipped", "Qty", "Price", "Note")
+
+
+def _rows(count: int):
+    start = dt.datetime(2024, 1, 1, 8, 30)
+    return [
+        [f"C{i % 97}", start + dt.timedelta(days=i % 365, minutes=i % 60), i, i * 0.25, None if i % 3 else "x"]
+        for i in range(count)
+    ]
+
+
+def test_serial_to_datetime_matches_excel_calendar() -> None:
+    frame = pl.DataFrame({"serial": [1.0, 59.0, 61.0, 45292.354166666664, None]})
+
+    converted = frame.select(serial_to_datetime(pl.col("serial")).alias("serial"))["serial"].to_list()
+    converted_1904 = frame.select(serial_to_datetime(pl.col("serial"), date1904=True))
+
+    assert converted == [
+        dt.datetime(1900, 1, 1),
+        dt.datetime(1900, 2, 28),
+        dt.datetime(1900, 3, 1),
+        dt.datetime(2024, 1, 1, 8, 30),
+        None,
+    ]
+    assert converted_1904.item(0, 0) == dt.datetime(1904, 1, 2)
+
+
+def test_read_list_object_uses_one_value2_read() -> None:
+    excel = ExcelSimulator()
+    rows = _rows(1_000)
+    book = build_workbook(excel, columns=COLUMNS, rows=rows)
+    excel.reset_counters()
+
+    frame = read_table_frame(book, "table1")
+
+    assert frame.columns == list(COLUMNS)
+    assert frame["Shipped"].to_list() == [row[1] for row in rows]
+    assert frame["Qty"].to_list() == [row[2] for row in rows]
+    assert frame["Note"].to_list() == [row[4] for row in rows]
+    assert excel.calls["SimComRange.Value2"] == 1
+    # Header, body and the first row used for date detection; nothing per row or per cell.
+    assert excel.cells_transferred == len(COLUMNS) * (len(rows) + 2)
+    with pytest.raises(ValidationError):
+        read_table_frame(book, "Missing")
+
+
+def test_read_list_object_with_explicit_date_columns() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS, rows=_rows(5))
+    list_object = book.sheets[0].api.ListObjects(1)
+    excel.reset_counters()
+
+    raw = read_list_object(list_object, date_columns=[])
+    dated = read_list_object(list_object, date_columns=["Shipped"])
+
+    assert raw["Shipped"].dtype == pl.Float64
+    assert dated["Shipped"][0] == dt.datetime(2024, 1, 1, 8, 30)
+    assert "SimComRange.Rows" not in excel.calls
+    with pytest.raises(ValidationError, match="Date columns"):
+        read_list_object(list_object, date_columns=["Nope"])
+
+
+def test_read_list_object_detects_dates_below_blank_cells() -> None:
+    excel = ExcelSimulator()
+    rows = _rows(6)
+    rows[0][1] = rows[1][1] = None
+    rows[0][2] = rows[0][3] = None
+    book = build_workbook(excel, columns=COLUMNS, rows=rows)
+    list_object = book.sheets[0].api.ListObjects(1)
+    excel.reset_counters()
+
+    frame = read_list_object(list_object)
+
+    assert frame["Shipped"].to_list() == [None, None] + [row[1] for row in rows[2:]]
+    assert frame["Price"].dtype == pl.Float64
+    # Qty and Price start on row 2 and Shipped on row 3: one Value read per row holding a first number.
+    assert excel.calls["SimComRange.Rows"] == 2
+
+
+def test_frame_from_value2_nulls_errors_and_keeps_mixed_columns_typed() -> None:
+    na, div0 = -2146826246, -2146826281
+    values = (
+        (1.0, "a", na, 45292.5),
+        ("N/A", "b", 2.5, div0),
+        (3.0, 7.0, div0, 45293.0),
+    )
+
+    frame = _frame_from_value2(values, ["Qty", "Code", "Ratio", "When"], ["When"], date1904=False)
+
+    assert frame["Qty"].to_list() == [1.0, None, 3.0]
+    assert frame["Code"].to_list() == ["a", "b", "7"]
+    assert frame["Ratio"].to_list() == [None, 2.5, None]
+    assert frame["When"].to_list() == [dt.datetime(2024, 1, 1, 12), None, dt.datetime(2024, 1, 2)]
+
+
+def test_benchmark_read_times_both_paths_end_to_end() -> None:
+    excel = ExcelSimulator()
+    rows = _rows(2_000)
+    book = build_workbook(excel, columns=COLUMNS, rows=rows)
+    excel.reset_counters()
+
+    timings = benchmark_read(book, "Table1", repeat=2)
+
+    assert [timing.method for timing in timings] == ["read_list_object", "range.options().value"]
+    assert all(timing.rows == len(rows) and timing.columns == len(COLUMNS) for timing in timings)
+    assert all(timing.seconds > 0 for timing in timings)
+    # Each path fetched the whole body once per repeat.
+    assert excel.calls["SimComRange.Value2"] == 2
+    assert format_transfer_timings(timings).splitlines()[1].startswith("read_list_object")
+    with pytest.raises(ValidationError):
+        benchmark_read(book, "Missing")
+
+
+def _frame(count: int) -> pl.DataFrame:
+    return pl.DataFrame(_rows(count), schema=list(COLUMNS), orient="row").with_columns(
+        pl.col("Shipped").cast(pl.Datetime("ms"))
+    )
+
+
+def test_write_frame_writes_value2_blocks_and_round_trips() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=1)
+    sheet = book.sheets[0]
+    frame = _frame(1_000).with_columns(
+        pl.Series("Ratio", [float("nan") if i % 7 == 0 else i / 7 for i in range(1_000)]),
+        pl.col("Shipped").dt.date().alias("Day"),
+    )
+    excel.reset_counters()
+
+    report = write_frame(frame, sheet.range("B2"), block_cells=700)
+
+    # 7 columns -> 100 rows per block; the header rides along with the first block.
+    assert report.blocks == 11
+    assert excel.calls["SimComRange.Value2"] == report.blocks
+    assert report.cells == excel.cells_transferred == 1_001 * 7
+    assert report.address == "B2:H1002"
+    assert report.cells_per_second > 0
+    assert sheet.range("B2:H2").value == list(frame.columns)
+    assert sheet.range("H1002").number_format is not None
+
+    values = sheet.api.Range("B3:H1002").Value2
+    back = _frame_from_value2(values, frame.columns, ["Shipped", "Day"], date1904=False)
+    assert back.drop("Day").equals(frame.drop("Day").with_columns(pl.col("Ratio").fill_nan(None)))
+    assert back["Day"].dt.date().to_list() == frame["Day"].to_list()
+
+
+def test_write_frame_converts_dates_before_1900_03_01() -> None:
+    excel = ExcelSimulator()
+    sheet = build_workbook(excel, sheet_count=1).sheets[0]
+    days = [dt.datetime(1900, 1, 1), dt.datetime(1900, 2, 28, 12), dt.datetime(1900, 3, 1)]
+
+    write_frame(pl.DataFrame({"When": days}), sheet.range("A1"), include_header=False, number_formats=False)
+    write_frame(pl.DataFrame({"When": [dt.date(2024, 1, 1)]}), sheet.range("B1"), include_header=False, date1904=True)
+
+    assert sheet.api.Range("A1:A3").Value2 == ((1.0,), (59.5,), (61.0,))
+    assert sheet.api.Range("B1").Value2 == 45292.0 - 1462
+
+
+def test_write_list_object_resizes_once() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS, rows=_rows(50))
+    list_object = book.sheets[0].api.ListObjects(1)
+    # Columns are matched by name, whatever their order and case in the frame.
+    frame = _frame(2_500).rename({"Qty": "qty"}).select(["qty", "Customer", "Shipped", "Price", "Note"])
+    excel.reset_counters()
+
+    report = write_list_object(frame, list_object, block_cells=5_000)
+
+    assert report.blocks == 3
+    assert excel.calls["SimComRange.Value2"] == 3
+    assert excel.calls["SimListObject.Resize"] == 1
+    assert list_object.Range.Address == "$A$1:$E$2501"
+    back = read_list_object(list_object, date_columns=["Shipped"])
+    assert back.equals(_frame(2_500))
+
+    excel.reset_counters()
+    write_list_object(_frame(10), list_object)
+
+    assert excel.calls["SimListObject.Resize"] == 1
+    assert list_object.Range.Address == "$A$1:$E$11"
+    assert book.sheets[0].range("A12:E2501").value == [[None] * 5] * 2_490
+
+    write_list_object(_frame(0), list_object)
+
+    assert list_object.Range.Address == "$A$1:$E$2"
+    assert book.sheets[0].range("A2:E2").value == [None] * 5
+
+
+def test_write_list_object_keeps_the_totals_row_below_the_new_body() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS, rows=_rows(20))
+    list_object = book.sheets[0].api.ListObjects(1)
+    list_object.ShowTotals = True
+
+    write_list_object(_frame(30), list_object)
+
+    assert list_object.ShowTotals is True
+    assert list_object.DataBodyRange.Address == "$A$2:$E$31"
+    assert book.sheets[0].range("A32").value == "Total"
+    assert read_list_object(list_object, date_columns=["Shipped"]).equals(_frame(30))
+
+    write_list_object(_frame(5), list_object)
+
+    assert list_object.Range.Address == "$A$1:$E$7"
+    assert book.sheets[0].range("A7").value == "Total"
+    assert book.sheets[0].range("A8:E32").value == [[None] * 5] * 25
+
+
+def test_write_list_object_rejects_mismatched_columns() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS, rows=_rows(5))
+    list_object = book.sheets[0].api.ListObjects(1)
+
+    with pytest.raises(ValidationError, match="missing Note; not in table Extra"):
+        write_list_object(_frame(5).drop("Note").with_columns(pl.lit(1).alias("Extra")), list_object)
+    with pytest.raises(ValidationError, match="cannot be written"):
+        write_frame(pl.DataFrame({"Nested": [[1, 2]]}), book.sheets[0].range("H1"))
+
+
+def test_benchmark_write_times_blocked_and_row_writes() -> None:
+    excel = ExcelSimulator()
+    sheet = build_workbook(excel, sheet_count=1).sheets[0]
+    frame = _frame(500)
+    excel.reset_counters()
+
+    timings = benchmark_write(frame, sheet.range("B2"))
+
+    assert [timing.method for timing in timings] == ["write_frame", "row by row"]
+    assert all(timing.rows == frame.height and timing.columns == frame.width for timing in timings)
+    # One block for write_frame, then one Value write per row.
+    assert excel.calls["SimComRange.Value2"] == 1
+    assert excel.round_trips >= frame.height
+    assert sheet.range("B501:F501").value == list(frame.row(499))
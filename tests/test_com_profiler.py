@@ -0,0 +1,99 @@
+"""
+Unit tests for the COM instrumentation proxy and profiler.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from pivot_util.com_profiler import ComProfiler, ComProxy, unwrap
+from pivot_util.constants import DestinationHandling, SummaryFunction
+from pivot_util.fields import ColumnField, DataField, RowField
+from pivot_util.pivot_builder import PivotBuilder
+from pivot_util.pivot_util import generate_pivot
+
+from excel_sim import ExcelSimulator, SimComRange, build_workbook
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += 0.002
+        return self.now
+
+
+class FakeComRange:
+    def __init__(self) -> None:
+        self.Value = 1
+        self.received = None
+
+    def Copy(self, destination) -> "FakeComRange":
+        self.received = destination
+        return self
+
+
+def test_proxy_records_gets_sets_and_calls() -> None:
+    profiler = ComProfiler(clock=FakeClock())
+    target = FakeComRange()
+    proxy = profiler.wrap(target, label="rng")
+
+    assert proxy.Value == 1
+    proxy.Value = 5
+    other = FakeComRange()
+    result = proxy.Copy(profiler.wrap(other))
+
+    assert target.Value == 5
+    assert target.received is other
+    assert isinstance(result, ComProxy) and unwrap(result) is target
+    assert profiler.wrap(target) is proxy
+    labels = profiler.stats["unscoped"]
+    assert {label: stats.count for label, stats in labels.items()} == {
+        "rng.Value": 2,
+        "rng.Copy": 1,
+        "rng.Copy()": 1,
+    }
+    assert labels["rng.Value"].histogram()["<10ms"] == 2
+
+
+def test_proxy_propagates_errors_and_still_records() -> None:
+    profiler = ComProfiler()
+    proxy = profiler.wrap(FakeComRange(), label="rng")
+
+    with pytest.raises(AttributeError):
+        proxy.Missing
+
+    assert profiler.call_count() == 1
+
+
+def test_generate_pivot_reports_phases() -> None:
+    book = build_workbook(ExcelSimulator(), columns=["Customer", "Category", "Qty", "Total", "Name"])
+    book.sheets.add("Pivot")
+    profiler = ComProfiler()
+
+    spec = PivotBuilder(
+        workbook=book,
+        table_name="Table1",
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+        pivot_table_name="PT_Test",
+        row_fields=[RowField(name="Customer")],
+        column_fields=[ColumnField(name="Category")],
+        data_fields=[DataField(name="Qty", function=SummaryFunction.SUM)],
+        profiler=profiler,
+    )
+    generate_pivot(spec)
+
+    assert list(profiler.stats) == ["validation", "destination", "cache", "fields"]
+    validation = profiler.stats["validation"]
+    # The workbook index enumerates each sheet's tables once: Data1 and Pivot.
+    assert validation["SimBook.sheets[].api.ListObjects"].count == 2
+    cache = profiler.stats["cache"]
+    assert cache["SimBook.api.PivotCaches()"].count == 1
+    # The real COM objects, not proxies, reach the simulated Excel object model.
+    created_source = book.api.PivotCaches()._caches[0]._source
+    assert isinstance(created_source, SimComRange)
+    assert profiler.stats["fields"]["SimBook.api.PivotCaches().Create().CreatePivotTable().PivotFields().Orientation"].count == 3
+
+    report = profiler.report()
+    assert "[validation]" in report and "[fields]" in report
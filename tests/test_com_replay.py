@@ -0,0 +1,134 @@
+"""
+Unit tests for recording and replaying COM sessions.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from pivot_util.com_profiler import ComProfiler
+from pivot_util.com_replay import (
+    ComRecorder,
+    ComReplay,
+    RecordedComError,
+    ReplayMismatchError,
+    recorded_latency,
+)
+from pivot_util.constants import DestinationHandling, SummaryFunction
+from pivot_util.errors import ValidationError
+from pivot_util.fields import ColumnField, DataField, RowField
+from pivot_util.pivot_builder import PivotBuilder
+from pivot_util.pivot_util import generate_pivot
+
+from excel_sim import ExcelSimulator, build_workbook
+
+
+def _builder(workbook, table_name: str = "Table1") -> PivotBuilder:
+    return PivotBuilder(
+        workbook=workbook,
+        table_name=table_name,
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+        pivot_table_name="PT_Test",
+        row_fields=[RowField(name="Customer")],
+        column_fields=[ColumnField(name="Category")],
+        data_fields=[
+            DataField(name="Qty", function=SummaryFunction.SUM, caption="Qty", number_format="0"),
+            DataField(name="Name", function=SummaryFunction.COUNT),
+        ],
+    )
+
+
+def _record_pivot_session(tmp_path):
+    workbook = build_workbook(ExcelSimulator())
+    workbook.sheets.add("Pivot")
+    recorder = ComRecorder()
+    spec = _builder(workbook)
+    spec.profiler = recorder
+    generate_pivot(spec)
+    path = tmp_path / "session.json"
+    recorder.save(path)
+    return recorder, path
+
+
+def test_recorder_captures_generate_pivot_phases(tmp_path) -> None:
+    recorder, _ = _record_pivot_session(tmp_path)
+
+    phases = [event["phase"] for event in recorder.events]
+    assert phases[0] == "validation" and phases[-1] == "fields"
+    creates = [event for event in recorder.events if event["phase"] == "cache" and event["op"] == "call" and event["args"]]
+    assert len(creates) == 1 and "$ref" in creates[0]["args"][1]
+    assert recorder.call_count() == len(recorder.events)
+
+
+def test_replay_runs_generate_pivot_without_excel(tmp_path) -> None:
+    recorder, path = _record_pivot_session(tmp_path)
+    delays = []
+    replay = ComReplay.load(path, latency=0.001, sleep=delays.append)
+
+    spec = _builder(replay.book())
+    generate_pivot(spec)
+
+    assert replay.mismatches == []
+    assert replay.remaining == 0
+    assert replay.calls == len(recorder.events)
+    assert delays == [0.001] * replay.calls
+
+
+def test_replay_is_deterministic_under_profiler(tmp_path) -> None:
+    recorder, path = _record_pivot_session(tmp_path)
+    counts = []
+    for _ in range(2):
+        profiler = ComProfiler()
+        spec = _builder(ComReplay.load(path).book())
+        spec.profiler = profiler
+        generate_pivot(spec)
+        counts.append({phase: profiler.call_count(phase) for phase in profiler.stats})
+
+    assert counts[0] == counts[1]
+    assert counts[0] == {phase: recorder.call_count(phase) for phase in recorder.stats}
+
+
+def test_replay_reraises_recorded_errors(tmp_path) -> None:
+    recorder = ComRecorder()
+    spec = _builder(build_workbook(ExcelSimulator()), table_name="Missing")
+    spec.profiler = recorder
+    with pytest.raises(ValidationError):
+        generate_pivot(spec)
+    recorder.save(tmp_path / "missing.json")
+
+    replay = ComReplay.load(tmp_path / "missing.json")
+    with pytest.raises(ValidationError):
+        generate_pivot(_builder(replay.book(), table_name="Missing"))
+    assert replay.mismatches == []
+
+
+class ComError(Exception):
+    pass
+
+
+class FailingApi:
+    def Refresh(self) -> None:
+        raise ComError("Exception occurred.")
+
+
+def test_replay_wraps_non_builtin_errors() -> None:
+    recorder = ComRecorder()
+    api = recorder.wrap(FailingApi())
+    with pytest.raises(ComError):
+        api.Refresh()
+
+    replay = ComReplay(recorder.events)
+    with pytest.raises(RecordedComError) as excinfo:
+        replay.book().Refresh()
+    assert excinfo.value.error_type == "ComError"
+    assert str(excinfo.value) == "Exception occurred."
+
+
+def test_replay_reports_unrecorded_calls(tmp_path) -> None:
+    _, path = _record_pivot_session(tmp_path)
+    replay = ComReplay.load(path, latency=recorded_latency(scale=0.0))
+
+    with pytest.raises(ReplayMismatchError):
+        replay.book().Missing
+
+    assert len(replay.mismatches) == 1
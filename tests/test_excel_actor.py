@@ -0,0 +1,115 @@
+"""
+Tests for the single-thread Excel actor, driven against the Excel simulator.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from pivot_util.constants import DestinationHandling, SummaryFunction
+from pivot_util.errors import ValidationError
+from pivot_util.excel_actor import ExcelActor
+from pivot_util.fields import DataField, RowField
+from pivot_util.pivot_builder import PivotBuilder
+
+from excel_sim import ExcelSimulator, build_workbook
+
+
+def _spec(pivot_table_name: str, table_name: str = "Table1") -> PivotBuilder:
+    return PivotBuilder(
+        workbook=None,  # type: ignore[arg-type]
+        table_name=table_name,
+        pivot_sheet_name=f"Sheet_{pivot_table_name}",
+        pivot_table_name=pivot_table_name,
+        row_fields=[RowField(name="Customer")],
+        data_fields=[DataField(name="Qty", function=SummaryFunction.SUM)],
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+    )
+
+
+@pytest.fixture
+def excel(tmp_path) -> ExcelSimulator:
+    excel = ExcelSimulator()
+    build_workbook(excel, sheet_count=3, path=str(tmp_path / "book.xlsx"))
+    return excel
+
+
+def test_async_commands_run_on_one_actor_thread(excel: ExcelSimulator, tmp_path) -> None:
+    async def main():
+        async with ExcelActor(app_factory=lambda: excel.app) as actor:
+            handle = await actor.open_workbook(str(tmp_path / "book.xlsx"))
+            prepared = []
+
+            async def prepare_data():
+                for i in range(3):
+                    prepared.append(i)
+                    await asyncio.sleep(0)
+
+            report, _ = await asyncio.gather(
+                actor.generate_pivots(handle, [_spec("PT_A"), _spec("PT_B", "Table2")]),
+                prepare_data(),
+            )
+            await actor.write_range(handle, "Data1", "H1", [["x", 1], ["y", 2]])
+            values = await actor.read_range(handle, "Data1", "H1:I2")
+            await actor.save(handle)
+            return actor.thread, report, values, prepared
+
+    actor_thread, report, values, prepared = asyncio.run(main())
+
+    assert report.pivot_table_names == ["PT_A", "PT_B"]
+    assert values == [["x", 1], ["y", 2]]
+    assert prepared == [0, 1, 2]
+    assert excel.thread_ids == {actor_thread.ident}
+    assert actor_thread.ident != threading.get_ident()
+    assert excel.app._quit is True
+    book = excel.files[next(iter(excel.files))]
+    assert book._saves == 2
+
+
+def test_errors_propagate_and_the_actor_keeps_running(excel: ExcelSimulator, tmp_path) -> None:
+    with ExcelActor(app_factory=lambda: excel.app) as actor:
+        handle = actor.submit(actor._open_workbook, str(tmp_path / "book.xlsx")).result()
+
+        async def generate(spec):
+            return await actor.generate_pivot(handle, spec)
+
+        with pytest.raises(ValidationError):
+            asyncio.run(generate(_spec("PT_X", "Missing")))
+        with pytest.raises(KeyError, match="No open workbook for handle 'unknown'"):
+            asyncio.run(actor.close_workbook("unknown"))
+        asyncio.run(generate(_spec("PT_Y")))
+
+        order = [actor.submit(lambda i=i: i) for i in range(5)]
+        assert [future.result() for future in order] == [0, 1, 2, 3, 4]
+
+    with pytest.raises(RuntimeError):
+        actor.submit(lambda: None)
+
+
+def test_app_factory_failure_surfaces_on_start() -> None:
+    def broken_factory():
+        raise OSError("Excel is not installed")
+
+    with pytest.raises(OSError):
+        ExcelActor(app_factory=broken_factory).start()
+
+
+def test_submit_is_refused_once_pending_commands_are_rejected(excel: ExcelSimulator) -> None:
+    class ProbeActor(ExcelActor):
+        # Submits from the window between draining the queue and the thread exiting.
+        def _reject_pending(self) -> None:
+            super()._reject_pending()
+            try:
+                self.late = self.submit(lambda: None)
+            except RuntimeError as exc:
+                self.late = exc
+
+    actor = ProbeActor(app_factory=lambda: excel.app)
+    with actor:
+        queued = [actor.submit(lambda i=i: i) for i in range(3)]
+
+    assert [future.result() for future in queued] == [0, 1, 2]
+    assert isinstance(actor.late, RuntimeError)
@@ -0,0 +1,152 @@
+"""
+Unit tests for ExcelPerformanceSession with a fake xlwings App.
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import pytest
+
+from pivot_util.constants import DestinationHandling, SummaryFunction
+from pivot_util.excel_session import ExcelPerformanceSession
+from pivot_util.fields import DataField
+from pivot_util.pivot_builder import PivotBuilder
+from pivot_util.pivot_util import generate_pivot
+
+
+class FakeApp:
+    def __init__(self) -> None:
+        self.screen_updating = True
+        self.calculation = "semiautomatic"
+        self.enable_events = True
+        self.display_alerts = True
+        self.writes: List[Tuple[str, object]] = []
+
+    def __setattr__(self, name: str, value) -> None:
+        if name != "writes" and hasattr(self, "writes"):
+            self.writes.append((name, value))
+        object.__setattr__(self, name, value)
+
+    def state(self) -> tuple:
+        return (self.screen_updating, self.calculation, self.enable_events, self.display_alerts)
+
+
+ORIGINAL_STATE = (True, "semiautomatic", True, True)
+SUSPENDED_STATE = (False, "manual", False, False)
+
+
+def test_session_suspends_and_restores() -> None:
+    app = FakeApp()
+
+    with ExcelPerformanceSession(app) as session:
+        assert app.state() == SUSPENDED_STATE
+
+    assert app.state() == ORIGINAL_STATE
+    assert session.elapsed is not None and session.elapsed >= 0
+    assert session.durations == [session.elapsed]
+    # Settings are restored in the reverse order they were applied.
+    assert [name for name, _ in app.writes[4:]] == [
+        "display_alerts",
+        "enable_events",
+        "calculation",
+        "screen_updating",
+    ]
+
+
+def test_session_restores_on_exception() -> None:
+    app = FakeApp()
+    session = ExcelPerformanceSession(app)
+
+    with pytest.raises(RuntimeError):
+        with session:
+            raise RuntimeError("boom")
+
+    assert app.state() == ORIGINAL_STATE
+    assert len(session.durations) == 1
+
+
+class StuckCalculationApp(FakeApp):
+    def __setattr__(self, name: str, value) -> None:
+        if name == "calculation" and value == "semiautomatic" and hasattr(self, "writes"):
+            raise OSError("calculation is locked")
+        super().__setattr__(name, value)
+
+
+def test_restore_failure_is_raised_after_a_clean_block() -> None:
+    app = StuckCalculationApp()
+
+    with pytest.raises(OSError, match="locked"):
+        with ExcelPerformanceSession(app):
+            pass
+
+    # The other settings are still restored.
+    assert (app.screen_updating, app.enable_events, app.display_alerts) == (True, True, True)
+
+
+def test_restore_failure_does_not_mask_the_block_error(caplog) -> None:
+    app = StuckCalculationApp()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        with ExcelPerformanceSession(app):
+            raise RuntimeError("boom")
+
+    assert "calculation is locked" in caplog.text
+    assert app.screen_updating is True
+
+
+def test_nested_sessions_restore_each_level() -> None:
+    app = FakeApp()
+    outer = ExcelPerformanceSession(app, display_alerts=True)
+    inner = ExcelPerformanceSession(app, calculation="automatic")
+
+    with outer:
+        assert app.state() == (False, "manual", False, True)
+        with inner:
+            assert app.state() == (False, "automatic", False, False)
+            with outer:
+                assert app.state() == (False, "manual", False, True)
+            assert app.state() == (False, "automatic", False, False)
+        assert app.state() == (False, "manual", False, True)
+
+    assert app.state() == ORIGINAL_STATE
+    assert len(outer.durations) == 2
+
+
+def test_session_skips_writes_for_unchanged_settings() -> None:
+    app = FakeApp()
+    app.screen_updating = False
+    app.writes.clear()
+
+    with ExcelPerformanceSession(app):
+        pass
+
+    assert "screen_updating" not in [name for name, _ in app.writes]
+
+
+def test_builder_option_wraps_generation(monkeypatch) -> None:
+    app = FakeApp()
+    seen = {}
+
+    class Workbook:
+        def __init__(self) -> None:
+            self.app = app
+
+    def _fake_validate(spec, index=None):
+        seen["state"] = app.state()
+        raise RuntimeError("stop")
+
+    monkeypatch.setattr("pivot_util.pivot_util._validate_and_get_table", _fake_validate)
+    spec = PivotBuilder(
+        workbook=Workbook(),  # type: ignore[arg-type]
+        table_name="Table1",
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+        data_fields=[DataField(name="Qty", function=SummaryFunction.SUM)],
+        suspend_excel_updates=True,
+    )
+
+    with pytest.raises(RuntimeError):
+        generate_pivot(spec)
+
+    assert seen["state"] == SUSPENDED_STATE
+    assert app.state() == ORIGINAL_STATE
@@ -0,0 +1,186 @@
+"""
+Tests for the Excel object model simulator and round-trip scaling of pivot generation.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from pivot_util.constants import DestinationHandling, SummaryFunction, XL_DATA_FIELD, XL_ROW_FIELD, XL_SUM
+from pivot_util.errors import ValidationError
+from pivot_util.excel_session import ExcelPerformanceSession
+from pivot_util.fields import ColumnField, DataField, RowField
+from pivot_util.pivot_builder import PivotBuilder
+from pivot_util.pivot_util import (
+    EMPTY_SCAN_CHUNK_CELLS,
+    _is_sheet_empty,
+    generate_pivot,
+    generate_pivots,
+)
+
+from excel_sim import ExcelSimulator, SimComError, build_workbook
+
+
+def _spec(book, table_name: str, pivot_table_name: str = "PT_Sim", pivot_sheet_name: str = "Pivot") -> PivotBuilder:
+    return PivotBuilder(
+        workbook=book,
+        table_name=table_name,
+        pivot_sheet_name=pivot_sheet_name,
+        pivot_table_name=pivot_table_name,
+        row_fields=[RowField(name="Customer")],
+        column_fields=[ColumnField(name="Category")],
+        data_fields=[DataField(name="Qty", function=SummaryFunction.SUM, number_format="0")],
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+        defer_layout=True,
+    )
+
+
+def _validation_round_trips(sheet_count: int) -> int:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=sheet_count)
+    generate_pivot(_spec(book, f"Table{sheet_count}"))
+    return excel.round_trips
+
+
+def test_generate_pivot_on_large_simulated_workbook() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=120, tables_per_sheet=2)
+
+    generate_pivot(_spec(book, "Table240"))
+
+    with excel.untracked():
+        pivot_table = book.sheets["Pivot"].api.PivotTables("PT_Sim")
+        assert pivot_table.PivotFields("customer").Orientation == XL_ROW_FIELD
+        qty = pivot_table.PivotFields("Qty")
+        assert (qty.Orientation, qty.Function, qty.NumberFormat) == (XL_DATA_FIELD, XL_SUM, "0")
+        assert len(book.sheets) == 121
+    assert excel.layout_updates == 1
+
+
+def test_round_trips_scale_linearly_with_sheet_count() -> None:
+    small = _validation_round_trips(10)
+    large = _validation_round_trips(110)
+
+    # Regression budget: the single metadata traversal costs at most 9 round trips per sheet.
+    assert large - small <= 100 * 9
+
+
+def test_batch_traverses_workbook_once() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=80)
+    specs = [_spec(book, f"Table{i}", f"PT_{i}", f"Pivot{i}") for i in range(1, 11)]
+
+    generate_pivots(specs)
+
+    assert excel.calls["SimSheets.__iter__"] == 80
+    assert excel.calls["SimSheetApi.PivotTables"] == 80
+    assert excel.calls["SimListObject.HeaderRowRange"] == 10
+    assert excel.calls["SimListObject.ListColumns"] == 0
+
+
+def test_latency_is_charged_per_round_trip() -> None:
+    waits = []
+    excel = ExcelSimulator(latency=0.002, sleep=waits.append)
+    book = build_workbook(excel, sheet_count=3)
+
+    generate_pivot(_spec(book, "Table2"))
+
+    assert len(waits) == excel.round_trips == sum(excel.calls.values())
+    assert excel.simulated_seconds == pytest.approx(0.002 * excel.round_trips)
+    excel.reset_counters()
+    assert (excel.round_trips, excel.simulated_seconds, excel.layout_updates) == (0, 0.0, 0)
+
+
+def test_generate_pivots_shares_one_cache_in_simulator() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=5)
+    specs = [_spec(book, "Table3", f"PT_{i}", f"Pivot{i}") for i in range(3)]
+
+    report = generate_pivots(specs)
+
+    assert report.caches_created == 1
+    with excel.untracked():
+        assert book.api.PivotCaches().Count == 1
+
+
+def test_simulated_com_errors() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=1)
+    sheet = book.sheets[0]
+
+    with pytest.raises(SimComError):
+        sheet.api.ListObjects("Missing")
+    with pytest.raises(ValidationError):
+        generate_pivot(_spec(book, "Missing"))
+
+    generate_pivot(_spec(book, "Table1"))
+    with pytest.raises(ValidationError):
+        generate_pivot(_spec(book, "Table1", pivot_sheet_name="Other"))
+
+    cache = book.api.PivotCaches().Create(1, sheet.api.ListObjects("Table1").Range)
+    with pytest.raises(SimComError):
+        cache.CreatePivotTable(book.sheets["Pivot"].range("J3").api, "pt_sim")
+    table = cache.CreatePivotTable(book.sheets["Pivot"].range("J3").api, "PT_Other")
+    with pytest.raises(SimComError):
+        table.PivotFields("Unknown")
+
+
+def test_ranges_and_app_settings() -> None:
+    excel = ExcelSimulator()
+    book = excel.app.add_book()
+    sheet = book.sheets.add("Data")
+
+    assert sheet.used_range.value is None
+    sheet.range("B2").value = [["a", 1], ["b", 2]]
+    assert sheet.used_range.address == "$B$2:$C$3"
+    assert sheet.range("B2:C3").api.Value2 == (("a", 1), ("b", 2))
+    assert sheet.range("B2:C2").value == ["a", 1]
+    table = sheet.add_table("T", ["Key", "Value"], [["x", 1]], top_left="E1")
+    assert table.HeaderRowRange.Value == (("Key", "Value"),)
+    assert table.DataBodyRange.Address == "$E$2:$F$2"
+
+    with ExcelPerformanceSession(excel.app):
+        assert excel.app.screen_updating is False
+    assert excel.app.calculation == "automatic"
+
+
+def _bloated_sheet(excel: ExcelSimulator, rows: int = 1_000_000, columns: int = 20):
+    book = excel.app.add_book()
+    sheet = book.sheets.add("Pivot")
+    # Formatting a whole block inflates the used range without storing any values.
+    sheet.range((1, 1), (rows, columns)).number_format = "0.00"
+    return sheet
+
+
+def test_emptiness_check_on_bloated_used_range_transfers_no_cells() -> None:
+    excel = ExcelSimulator()
+    with excel.untracked():
+        sheet = _bloated_sheet(excel)
+        assert sheet.used_range.shape == (1_000_000, 20)
+
+    assert _is_sheet_empty(sheet) is True
+    assert excel.cells_transferred == 0
+    assert excel.calls["SimWorksheetFunction.CountA"] == 1
+
+
+def test_emptiness_scan_stops_at_first_non_empty_chunk() -> None:
+    excel = ExcelSimulator()
+    with excel.untracked():
+        sheet = _bloated_sheet(excel)
+        sheet.range("A1").value = "   "
+        sheet.range("B3").value = "data"
+
+    assert _is_sheet_empty(sheet) is False
+    # One 65,536-cell chunk (3,276 rows x 20 columns) instead of the 20M-cell grid.
+    assert excel.cells_transferred == (EMPTY_SCAN_CHUNK_CELLS // 20) * 20
+
+
+def test_emptiness_scan_treats_whitespace_as_empty() -> None:
+    excel = ExcelSimulator()
+    with excel.untracked():
+        sheet = _bloated_sheet(excel, rows=200_000, columns=5)
+        sheet.range("A1").value = "   "
+
+    assert _is_sheet_empty(sheet) is True
+    assert excel.cells_transferred == 200_000 * 5
+    assert excel.calls["SimSheet.range"] == -(-200_000 // (EMPTY_SCAN_CHUNK_CELLS // 5))
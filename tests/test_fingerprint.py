@@ -0,0 +1,68 @@
+"""
+Tests for central-directory xlsx fingerprints.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.worksheet.table import Table
+
+from pivot_util.errors import ValidationError
+from pivot_util.fingerprint import fingerprint_many, xlsx_fingerprint
+
+
+def _save(path: Path, qty: int, note: str) -> None:
+    workbook = Workbook()
+    data = workbook.active
+    data.title = "Data"
+    data.append(["Customer", "Qty"])
+    data.append(["Ann", qty])
+    data.add_table(Table(displayName="Sales", ref="A1:B2"))
+    workbook.create_sheet("Notes").append([note])
+    workbook.save(path)
+
+
+def test_fingerprint_reads_no_member_data(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "book.xlsx"
+    _save(path, 1, "a")
+    first = xlsx_fingerprint(path)
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("member data was read")
+
+    monkeypatch.setattr(zipfile.ZipFile, "open", refuse)
+
+    assert xlsx_fingerprint(path) == first
+
+
+def test_fingerprint_tracks_content_changes(tmp_path) -> None:
+    first, second = tmp_path / "first.xlsx", tmp_path / "second.xlsx"
+    _save(first, 1, "a")
+    _save(second, 1, "b")
+
+    assert xlsx_fingerprint(first) != xlsx_fingerprint(second)
+    # The Notes edit (and the save timestamps) do not touch the Data sheet or its table.
+    assert xlsx_fingerprint(first, sheet_name="data") == xlsx_fingerprint(second, sheet_name="Data")
+    assert xlsx_fingerprint(first, table_name="Sales") == xlsx_fingerprint(second, table_name="Sales")
+    assert xlsx_fingerprint(first, sheet_name="Notes") != xlsx_fingerprint(second, sheet_name="Notes")
+
+    _save(second, 2, "a")
+    assert xlsx_fingerprint(first, table_name="Sales") != xlsx_fingerprint(second, table_name="Sales")
+    with pytest.raises(ValidationError):
+        xlsx_fingerprint(first, sheet_name="Missing")
+
+
+def test_fingerprint_many(tmp_path) -> None:
+    good = tmp_path / "good.xlsx"
+    _save(good, 1, "a")
+    not_zip = tmp_path / "notes.txt"
+    not_zip.write_text("plain text")
+
+    result = fingerprint_many([good, not_zip, tmp_path / "missing.xlsx"], sheet_name="Data", max_workers=2)
+
+    assert list(result.values()) == [xlsx_fingerprint(good, sheet_name="Data"), None, None]
+    assert list(result) == [str(good), str(not_zip), str(tmp_path / "missing.xlsx")]
@@ -0,0 +1,53 @@
+"""
+Import-time budget for the pivot_util package, measured in a fresh interpreter.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Cumulative microseconds for `import pivot_util` (about 5 ms today; xlwings alone adds ~55 ms).
+IMPORT_BUDGET_US = 40_000
+
+HEAVY_MODULES = ("xlwings", "polars", "openpyxl")
+
+
+def _import_pivot_util() -> tuple[int, list[str]]:
+    code = (
+        "import sys, pivot_util; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = None
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "pivot_util":
+            cumulative = int(parts[1])
+    assert cumulative is not None, result.stderr
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative, loaded
+
+
+def test_import_does_not_load_com_or_dataframe_libraries() -> None:
+    _, loaded = _import_pivot_util()
+
+    assert loaded == []
+
+
+def test_import_stays_within_budget() -> None:
+    # Best of three runs keeps a busy machine from failing the check.
+    cumulative = min(_import_pivot_util()[0] for _ in range(3))
+
+    assert cumulative < IMPORT_BUDGET_US
@@ -0,0 +1,116 @@
+"""
+Unit tests for the offline polars pivot engine.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from pivot_util.constants import DestinationHandling, SummaryFunction
+from pivot_util.errors import ValidationError
+from pivot_util.fields import ColumnField, DataField, RowField
+from pivot_util.offline import compute_pivot, data_field_caption
+from pivot_util.pivot_builder import PivotBuilder
+
+
+EXAMPLE_WORKBOOK = Path(__file__).resolve().parents[1] / "Workbooks" / "pivot_table_example.xlsx"
+
+
+def _orders_frame() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "Customer": ["Jill", "Jim", "Jill", "Jo", "Jim"],
+            "Category": ["Toy", "Game", "Food", "Food", "Game"],
+            "Qty": [2, 10, 3, 1, 4],
+            "Total": [20.0, 50.0, 30.0, 2.0, 20.0],
+        }
+    )
+
+
+def _builder(**overrides) -> PivotBuilder:
+    values = dict(
+        workbook=None,
+        table_name="Table1",
+        destination_handling=DestinationHandling.NEW,
+        row_fields=[RowField(name="Customer")],
+        data_fields=[DataField(name="Qty", function=SummaryFunction.SUM)],
+    )
+    values.update(overrides)
+    return PivotBuilder(**values)  # type: ignore[arg-type]
+
+
+def test_compute_pivot_row_fields_only() -> None:
+    spec = _builder(
+        row_fields=[RowField(name="customer", caption="Who")],
+        data_fields=[
+            DataField(name="Qty", function=SummaryFunction.SUM),
+            DataField(name="Total", function=SummaryFunction.AVG, caption="Avg Total"),
+            DataField(name="Category", function=SummaryFunction.COUNT),
+        ],
+    )
+
+    result = compute_pivot(spec, _orders_frame())
+
+    assert result.columns == ["Who", "Sum of Qty", "Avg Total", "Count of Category"]
+    assert result["Who"].to_list() == ["Jill", "Jim", "Jo"]
+    assert result["Sum of Qty"].to_list() == [5, 14, 1]
+    assert result["Avg Total"].to_list() == [25.0, 35.0, 2.0]
+    assert result["Count of Category"].to_list() == [2, 2, 1]
+
+
+def test_compute_pivot_spreads_column_fields() -> None:
+    spec = _builder(column_fields=[ColumnField(name="Category")])
+
+    result = compute_pivot(spec, _orders_frame())
+
+    assert result.columns == [
+        "Customer",
+        "Sum of Qty | Food",
+        "Sum of Qty | Game",
+        "Sum of Qty | Toy",
+    ]
+    assert result.row(0) == ("Jill", 3, None, 2)
+    assert result.row(1) == ("Jim", None, 14, None)
+
+
+def test_compute_pivot_without_row_fields() -> None:
+    spec = _builder(row_fields=[], column_fields=[ColumnField(name="Category")])
+    assert compute_pivot(spec, _orders_frame()).row(0) == (4, 14, 2)
+
+    spec = _builder(row_fields=[])
+    assert compute_pivot(spec, _orders_frame()).to_dicts() == [{"Sum of Qty": 20}]
+
+
+def test_compute_pivot_from_xlsx_table() -> None:
+    spec = _builder(
+        data_fields=[
+            DataField(name="Name", function=SummaryFunction.COUNT, caption="Orders"),
+            DataField(name="Total", function=SummaryFunction.SUM, caption="Total Spent"),
+        ],
+    )
+
+    result = compute_pivot(spec, EXAMPLE_WORKBOOK)
+
+    assert result.to_dicts() == [
+        {"Customer": "Jill", "Orders": 2, "Total Spent": 50},
+        {"Customer": "Jim", "Orders": 3, "Total Spent": 3150},
+        {"Customer": "Jo", "Orders": 3, "Total Spent": 28},
+    ]
+
+
+def test_compute_pivot_validation_errors() -> None:
+    with pytest.raises(ValidationError):
+        compute_pivot(_builder(row_fields=[RowField(name="Missing")]), _orders_frame())
+    with pytest.raises(ValidationError):
+        compute_pivot(_builder(data_fields=[]), _orders_frame())
+    with pytest.raises(ValidationError):
+        compute_pivot(_builder(table_name="Missing"), EXAMPLE_WORKBOOK)
+
+
+def test_data_field_caption_defaults() -> None:
+    assert data_field_caption(DataField(name="Qty", function=SummaryFunction.SUM)) == "Sum of Qty"
+    assert data_field_caption(DataField(name="Qty", function=SummaryFunction.AVG)) == "Average of Qty"
+    assert data_field_caption(DataField(name="Qty", function=SummaryFunction.COUNT, caption="N")) == "N"
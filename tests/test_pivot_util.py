@@ -1,19 +1,17 @@
 """
-Unit tests for pivot_util with mocked workbook and COM objects.
+Unit tests for pivot_util, driven against the Excel simulator.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional
-
 import pytest
 
-from pivot_util.constants import DestinationHandling, SummaryFunction, XL_AVG, XL_COUNT, XL_SUM
+from pivot_util.constants import DestinationHandling, SummaryFunction, XL_AVG, XL_COUNT, XL_DATABASE, XL_SUM
 from pivot_util.errors import DestinationError, ValidationError
 from pivot_util.fields import ColumnField, DataField, RowField
 from pivot_util.pivot_builder import PivotBuilder
 from pivot_util.pivot_util import (
+    _create_and_configure_pivot_table,
     _find_list_object,
     _is_empty_value,
     _list_object_column_names,
@@ -25,168 +23,16 @@ from pivot_util.pivot_util import (
     _validate_spec_inputs,
     _validate_unique_column_names,
     generate_pivot,
+    generate_pivots,
 )
 
+from excel_sim import ExcelSimulator, build_workbook
 
-class FakeRange:
-    def __init__(self, api_value: str = "dest") -> None:
-        self.api = api_value
-
-
-class FakeListColumn:
-    def __init__(self, name: str) -> None:
-        self.Name = name
-
-
-class FakeListColumns:
-    def __init__(self, names: List[str]) -> None:
-        self._names = names
-        self.Count = len(names)
-
-    def Item(self, i: int) -> FakeListColumn:
-        return FakeListColumn(self._names[i - 1])
-
-
-class FakeListObject:
-    def __init__(self, column_names: List[str]) -> None:
-        self.Range = FakeRange("source")
-        self.ListColumns = FakeListColumns(column_names)
-
-
-class FakeListObjectBroken:
-    @property
-    def ListColumns(self):
-        raise RuntimeError("broken")
-
-
-class FakePivotField:
-    def __init__(self) -> None:
-        self.Orientation: Optional[int] = None
-        self.Position: Optional[int] = None
-        self.Function: Optional[int] = None
-        self.Caption: Optional[str] = None
-        self.NumberFormat: Optional[str] = None
-
-
-class FakePivotTable:
-    def __init__(self) -> None:
-        self._fields: Dict[str, FakePivotField] = {}
-        self.TableStyle2: Optional[str] = None
-        self.ShowTableStyleRowStripes: Optional[bool] = None
-
-    def PivotFields(self, name: str) -> FakePivotField:
-        if name not in self._fields:
-            self._fields[name] = FakePivotField()
-        return self._fields[name]
-
-
-class FakePivotCache:
-    def __init__(self) -> None:
-        self.created_with: Optional[tuple] = None
-        self.table: Optional[FakePivotTable] = None
-
-    def CreatePivotTable(self, dest, name: str) -> FakePivotTable:
-        self.created_with = (dest, name)
-        self.table = FakePivotTable()
-        return self.table
-
-
-class FakePivotCaches:
-    def __init__(self) -> None:
-        self.last_create_args: Optional[tuple] = None
-        self.cache = FakePivotCache()
-
-    def Create(self, source_type: int, source_range) -> FakePivotCache:
-        self.last_create_args = (source_type, source_range)
-        return self.cache
-
-
-class FakePivotTables:
-    def __init__(self, names: List[str]) -> None:
-        self._names = names
-        self.Count = len(names)
-
-    def Item(self, i: int):
-        return type("Pivot", (), {"Name": self._names[i - 1]})
-
-
-class FakeSheetApi:
-    def __init__(self, list_objects: Dict[str, FakeListObject], pivot_table_names: List[str]):
-        self._list_objects = list_objects
-        self._pivot_table_names = pivot_table_names
-
-    def ListObjects(self, name: str):
-        if name not in self._list_objects:
-            raise Exception("not found")
-        return self._list_objects[name]
-
-    def PivotTables(self):
-        return FakePivotTables(self._pivot_table_names)
-
-
-class FakeUsedRange:
-    def __init__(self, value) -> None:
-        self.value = value
-
-
-class FakeSheet:
-    def __init__(
-        self,
-        name: str,
-        list_objects: Optional[Dict[str, FakeListObject]] = None,
-        pivot_table_names: Optional[List[str]] = None,
-        used_range_value=None,
-    ) -> None:
-        self.name = name
-        self._cleared = False
-        self.used_range = FakeUsedRange(used_range_value)
-        self.api = FakeSheetApi(list_objects or {}, pivot_table_names or [])
-
-    def clear(self) -> None:
-        self._cleared = True
-        self.used_range.value = None
-
-    def range(self, _cell: str) -> FakeRange:
-        return FakeRange("dest")
-
-
-class FakeSheets:
-    def __init__(self, sheets: List[FakeSheet]) -> None:
-        self._sheets = sheets
-
-    def __iter__(self):
-        return iter(self._sheets)
-
-    def __getitem__(self, key):
-        if isinstance(key, int):
-            return self._sheets[key]
-        for sheet in self._sheets:
-            if sheet.name == key:
-                return sheet
-        raise KeyError(key)
-
-    def add(self, name: str, after: FakeSheet):
-        new_sheet = FakeSheet(name, used_range_value=None)
-        self._sheets.append(new_sheet)
-        return new_sheet
-
-
-class FakeWorkbookApi:
-    def __init__(self) -> None:
-        self._pivot_caches = FakePivotCaches()
-
-    def PivotCaches(self) -> FakePivotCaches:
-        return self._pivot_caches
-
-
-class FakeWorkbook:
-    def __init__(self, sheets: List[FakeSheet]) -> None:
-        self.sheets = FakeSheets(sheets)
-        self.api = FakeWorkbookApi()
+COLUMNS = ["Customer", "Category", "Qty", "Total", "Name"]
 
 
 def _builder_with_table(
-    workbook: FakeWorkbook,
+    workbook,
     table_name: str = "Table1",
     destination_handling: DestinationHandling = DestinationHandling.FIND_OR_CREATE,
 ) -> PivotBuilder:
@@ -208,20 +54,17 @@ def _builder_with_table(
 
 
 def test_generate_pivot_happy_path() -> None:
-    list_object = FakeListObject(["Customer", "Category", "Qty", "Total", "Name"])
-    sheet = FakeSheet("Data", list_objects={"Table1": list_object}, used_range_value=None)
-    pivot_sheet = FakeSheet("Pivot", used_range_value=None)
-    workbook = FakeWorkbook([sheet, pivot_sheet])
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS)
+    book.sheets.add("Pivot")
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.row_fields[0] = RowField(name="Customer", caption="Customer Name")
     spec.column_fields[0] = ColumnField(name="Category", caption="Item Category")
     spec.table_style = "PivotStyleMedium9"
     generate_pivot(spec)
 
-    cache = workbook.api.PivotCaches().cache
-    pivot_table = cache.table
-    assert pivot_table is not None
+    pivot_table = book.sheets["Pivot"].api.PivotTables("PT_Test")
 
     pf_customer = pivot_table.PivotFields("Customer")
     pf_category = pivot_table.PivotFields("Category")
@@ -241,108 +84,193 @@ def test_generate_pivot_happy_path() -> None:
 
 
 def test_generate_pivot_force_clear() -> None:
-    list_object = FakeListObject(["Customer", "Category", "Qty", "Total", "Name"])
-    sheet = FakeSheet("Data", list_objects={"Table1": list_object}, used_range_value=None)
-    pivot_sheet = FakeSheet("Pivot", used_range_value="data")
-    workbook = FakeWorkbook([sheet, pivot_sheet])
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS)
+    pivot_sheet = book.sheets.add("Pivot")
+    pivot_sheet.range("B2").value = "data"
+
+    spec = _builder_with_table(book, destination_handling=DestinationHandling.EXISTING_FORCE_CLEAR)
+    generate_pivot(spec)
+    assert pivot_sheet.range("B2").value is None
+
+
+def test_generate_pivots_shares_cache_per_table() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, tables_per_sheet=2, columns=COLUMNS)
+
+    specs = []
+    for idx, table_name in enumerate(["Table1", "Table1", "Table2"]):
+        spec = _builder_with_table(book, table_name=table_name)
+        spec.pivot_sheet_name = f"Pivot{idx}"
+        spec.pivot_table_name = f"PT_{idx}"
+        specs.append(spec)
+
+    report = generate_pivots(specs)
+
+    assert report.caches_created == 2
+    assert report.caches_reused == 1
+    assert report.pivot_table_names == ["PT_0", "PT_1", "PT_2"]
+    assert book.api.PivotCaches().Count == 2
+
+
+def test_generate_pivots_rejects_duplicate_names_before_building() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS)
+    specs = [_builder_with_table(book), _builder_with_table(book)]
+
+    with pytest.raises(ValidationError):
+        generate_pivots(specs)
+    assert book.api.PivotCaches().Count == 0
+
+
+def _layout_benchmark_builder(workbook, defer_layout: bool) -> PivotBuilder:
+    return PivotBuilder(
+        workbook=workbook,
+        table_name="Table1",
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+        row_fields=[RowField(name=f"R{i}", caption=f"Row {i}") for i in range(3)],
+        column_fields=[ColumnField(name=f"C{i}", caption=f"Col {i}") for i in range(3)],
+        data_fields=[
+            DataField(name=f"D{i}", function=SummaryFunction.SUM, caption=f"Data {i}", number_format="0")
+            for i in range(20)
+        ],
+        defer_layout=defer_layout,
+    )
+
+
+@pytest.mark.parametrize("defer_layout, expected_recomputes", [(False, 98), (True, 1)])
+def test_layout_recompute_benchmark(defer_layout: bool, expected_recomputes: int) -> None:
+    excel = ExcelSimulator()
+    columns = [f"R{i}" for i in range(3)] + [f"C{i}" for i in range(3)] + [f"D{i}" for i in range(20)]
+    book = build_workbook(excel, columns=columns)
+    pivot_sheet = book.sheets.add("Pivot")
+    cache = book.api.PivotCaches().Create(XL_DATABASE, book.sheets[0].api.ListObjects("Table1").Range)
+    excel.reset_counters()
+
+    pivot_table = _create_and_configure_pivot_table(
+        _layout_benchmark_builder(book, defer_layout), cache, pivot_sheet
+    )
+
+    # 6 axis fields x 3 writes + 20 data fields x 4 writes = 98 field writes, each of
+    # which relays out the pivot; deferring collapses them into a single update.
+    assert excel.layout_updates == expected_recomputes
+    # Deferred or not, the pivot ends live and laid out with every field in place.
+    assert pivot_table.ManualUpdate is False
+    assert pivot_table.layout_pending is False
+
+
+def test_generate_pivot_keeps_immediate_layout_by_default() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS)
+    spec = _builder_with_table(book)
+    assert spec.defer_layout is False
+    excel.reset_counters()
 
-    spec = _builder_with_table(workbook, destination_handling=DestinationHandling.EXISTING_FORCE_CLEAR)
     generate_pivot(spec)
-    assert pivot_sheet._cleared is True
+
+    assert "SimPivotTable.ManualUpdate" not in excel.calls
+    assert "SimPivotTable.RefreshTable" not in excel.calls
 
 
 def test_validate_spec_inputs_errors() -> None:
-    list_object = FakeListObject(["Customer", "Category", "Qty"])
-    sheet = FakeSheet("Data", list_objects={"Table1": list_object}, used_range_value=None)
-    workbook = FakeWorkbook([sheet])
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=["Customer", "Category", "Qty"])
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.row_fields = spec.row_fields * 4
     with pytest.raises(ValidationError):
         _validate_spec_inputs(spec)
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.column_fields = spec.column_fields * 4
     with pytest.raises(ValidationError):
         _validate_spec_inputs(spec)
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.data_fields = []
     with pytest.raises(ValidationError):
         _validate_spec_inputs(spec)
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.data_fields = spec.data_fields * 7
     with pytest.raises(ValidationError):
         _validate_spec_inputs(spec)
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.destination_handling = None  # type: ignore[assignment]
     with pytest.raises(ValidationError):
         _validate_spec_inputs(spec)
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.destination_handling = "bad"  # type: ignore[assignment]
     with pytest.raises(ValidationError):
         _validate_spec_inputs(spec)
 
-    spec = _builder_with_table(workbook)
+    spec = _builder_with_table(book)
     spec.data_fields[0] = DataField(name="Qty", function="bad")  # type: ignore[arg-type]
     with pytest.raises(ValidationError):
         _validate_spec_inputs(spec)
 
 
 def test_resolve_destination_sheet_paths() -> None:
-    list_object = FakeListObject(["Customer", "Category", "Qty"])
-    data_sheet = FakeSheet("Data", list_objects={"Table1": list_object}, used_range_value=None)
-    existing_empty = FakeSheet("Pivot", used_range_value=None)
-    existing_full = FakeSheet("PivotFull", used_range_value="x")
-    workbook = FakeWorkbook([data_sheet, existing_empty, existing_full])
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=["Customer", "Category", "Qty"])
+    book.sheets.add("Pivot")
+    book.sheets.add("PivotFull").range("A1").value = "x"
 
-    spec = _builder_with_table(workbook, destination_handling=DestinationHandling.EXISTING_CLEAR)
+    spec = _builder_with_table(book, destination_handling=DestinationHandling.EXISTING_CLEAR)
     spec.pivot_sheet_name = "Pivot"
     assert _resolve_destination_sheet(spec).name == "Pivot"
 
-    spec = _builder_with_table(workbook, destination_handling=DestinationHandling.EXISTING_NO_CLEAR)
+    spec = _builder_with_table(book, destination_handling=DestinationHandling.EXISTING_NO_CLEAR)
     spec.pivot_sheet_name = "Pivot"
     assert _resolve_destination_sheet(spec).name == "Pivot"
 
-    spec = _builder_with_table(workbook, destination_handling=DestinationHandling.FIND_OR_CREATE)
+    spec = _builder_with_table(book, destination_handling=DestinationHandling.FIND_OR_CREATE)
     spec.pivot_sheet_name = "PivotFull"
     with pytest.raises(DestinationError):
         _resolve_destination_sheet(spec)
 
-    spec = _builder_with_table(workbook, destination_handling=DestinationHandling.NEW)
+    spec = _builder_with_table(book, destination_handling=DestinationHandling.NEW)
     spec.pivot_sheet_name = "Pivot"
     with pytest.raises(DestinationError):
         _resolve_destination_sheet(spec)
 
-    spec = _builder_with_table(workbook, destination_handling=DestinationHandling.EXISTING_NO_CLEAR)
+    spec = _builder_with_table(book, destination_handling=DestinationHandling.EXISTING_NO_CLEAR)
     spec.pivot_sheet_name = "Missing"
     with pytest.raises(DestinationError):
         _resolve_destination_sheet(spec)
 
-    spec = _builder_with_table(workbook, destination_handling=DestinationHandling.FIND_OR_CREATE)
+    spec = _builder_with_table(book, destination_handling=DestinationHandling.FIND_OR_CREATE)
     spec.pivot_sheet_name = "NewPivot"
     created = _resolve_destination_sheet(spec)
     assert created.name == "NewPivot"
 
 
 def test_find_list_object_and_column_names() -> None:
-    list_object = FakeListObject(["A", "B"])
-    sheet = FakeSheet("Data", list_objects={"Table1": list_object}, used_range_value=None)
-    workbook = FakeWorkbook([sheet])
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=["A", "B"])
+    list_object = book.sheets[0].api.ListObjects("Table1")
+
+    class BrokenListObject:
+        @property
+        def HeaderRowRange(self):
+            raise RuntimeError("broken")
 
-    assert _find_list_object(workbook, "Table1") is list_object
-    assert _find_list_object(workbook, "Missing") is None
+        @property
+        def ListColumns(self):
+            raise RuntimeError("broken")
+
+    assert _find_list_object(book, "Table1") is list_object
+    assert _find_list_object(book, "Missing") is None
     assert _list_object_column_names(list_object) == ["A", "B"]
-    assert _list_object_column_names(FakeListObjectBroken()) == []
+    assert _list_object_column_names(BrokenListObject()) == []
 
 
 def test_validate_and_get_table_errors() -> None:
-    sheet = FakeSheet("Data", list_objects={}, used_range_value=None)
-    workbook = FakeWorkbook([sheet])
-    spec = _builder_with_table(workbook, table_name="Missing")
+    excel = ExcelSimulator()
+    book = build_workbook(excel, tables_per_sheet=0)
+    spec = _builder_with_table(book, table_name="Missing")
 
     with pytest.raises(ValidationError):
         _validate_and_get_table(spec)
@@ -363,20 +291,21 @@ def test_validate_unique_names_and_field_existence() -> None:
 
 
 def test_validate_pivot_table_name_unique() -> None:
-    sheet = FakeSheet("Data", pivot_table_names=["PT_Test"], used_range_value=None)
-    workbook = FakeWorkbook([sheet])
+    excel = ExcelSimulator()
+    book = build_workbook(excel, columns=COLUMNS)
+    sheet = book.sheets[0]
+    cache = book.api.PivotCaches().Create(XL_DATABASE, sheet.api.ListObjects("Table1").Range)
+    cache.CreatePivotTable(sheet.range("H1").api, "PT_Test")
 
     with pytest.raises(ValidationError):
-        _validate_pivot_table_name_unique(workbook, "PT_Test")
+        _validate_pivot_table_name_unique(book, "PT_Test")
 
-    class BrokenApi:
-        def PivotTables(self):
-            raise RuntimeError("broken")
+    def broken():
+        raise RuntimeError("broken")
 
-    broken_sheet = FakeSheet("Broken", used_range_value=None)
-    broken_sheet.api = BrokenApi()
-    workbook = FakeWorkbook([broken_sheet])
-    _validate_pivot_table_name_unique(workbook, "PT_Ok")
+    broken_book = build_workbook(excel, name="Broken")
+    broken_book.sheets[0].api.PivotTables = broken
+    _validate_pivot_table_name_unique(broken_book, "PT_Ok")
 
 
 def test_summary_function_to_excel() -> None:
@@ -0,0 +1,221 @@
+"""
+Tests for the path-only polars loader.
+"""
+
+from __future__ import annotations
+
+import glob
+import shutil
+from pathlib import Path
+from typing import List
+
+import polars as pl
+import pytest
+
+from pivot_util import (
+    ColumnField,
+    DataField,
+    DestinationHandling,
+    PivotBuilder,
+    RowField,
+    SummaryFunction,
+    ValidationError,
+)
+from pivot_util import polars_loader
+from pivot_util.polars_loader import (
+    available_engines,
+    benchmark_engines,
+    format_timings,
+    read_many,
+    read_projected,
+    read_sheet,
+    resolve_workbook_path,
+    spec_columns,
+)
+
+WORKBOOKS = Path(__file__).resolve().parents[1] / "Workbooks"
+
+
+def test_resolve_workbook_path(tmp_path) -> None:
+    assert resolve_workbook_path("xlwings_polars.xlsx", base_dir=str(WORKBOOKS)) == str(
+        WORKBOOKS / "xlwings_polars.xlsx"
+    )
+    with pytest.raises(FileNotFoundError):
+        resolve_workbook_path(tmp_path / "missing.xlsx")
+
+
+def test_read_sheet_falls_back_to_an_installed_engine(monkeypatch) -> None:
+    monkeypatch.setitem(polars_loader._ENGINE_MODULES, "calamine", "no_such_module_for_calamine")
+
+    frame = read_sheet(WORKBOOKS / "xlwings_polars.xlsx", sheet_name="Sheet1")
+
+    assert frame.columns == ["Name", "Salary", "Taxes", "Address", "State", "Phone"]
+    assert frame.height == 5
+
+
+def _failing_calamine(monkeypatch) -> None:
+    # Stand in for an engine that is installed but rejects the file.
+    read_excel = pl.read_excel
+
+    def fake_read_excel(source, *args, engine: str = "calamine", **kwargs):
+        if engine == "calamine":
+            raise ValueError("calamine could not parse the file")
+        return read_excel(source, *args, engine=engine, **kwargs)
+
+    monkeypatch.setitem(polars_loader._ENGINE_MODULES, "calamine", "polars")
+    monkeypatch.setattr(polars_loader.pl, "read_excel", fake_read_excel)
+
+
+def test_read_sheet_falls_back_when_an_engine_fails(monkeypatch) -> None:
+    _failing_calamine(monkeypatch)
+
+    frame = read_sheet(WORKBOOKS / "xlwings_polars.xlsx", sheet_name="Sheet1", engine=["calamine", "openpyxl"])
+
+    assert frame.height == 5
+
+
+def test_read_sheet_raises_the_first_error_when_every_engine_fails(monkeypatch) -> None:
+    _failing_calamine(monkeypatch)
+
+    with pytest.raises(ValueError, match="calamine could not parse") as raised:
+        read_sheet(WORKBOOKS / "xlwings_polars.xlsx", sheet_name="Missing", engine=["calamine", "openpyxl"])
+
+    assert raised.value.__notes__[0] == "Raised by the calamine engine."
+    assert raised.value.__notes__[1].startswith("The openpyxl engine also failed:")
+
+
+def test_read_sheet_reports_missing_engines_and_unknown_names(monkeypatch) -> None:
+    with pytest.raises(ValueError, match="Unknown Excel engine"):
+        read_sheet(WORKBOOKS / "xlwings_polars.xlsx", engine="xlrd")
+
+    monkeypatch.setitem(polars_loader._ENGINE_MODULES, "openpyxl", "no_such_module_for_openpyxl")
+    with pytest.raises(ImportError, match="No Excel engine available"):
+        read_sheet(WORKBOOKS / "xlwings_polars.xlsx", engine=["openpyxl"])
+    assert "openpyxl" not in available_engines()
+
+
+def test_benchmark_engines_on_repo_workbooks() -> None:
+    paths = sorted(glob.glob(str(WORKBOOKS / "*.xlsx")))
+
+    timings = benchmark_engines(paths, repeat=1)
+
+    assert len(timings) == len(paths) * 3
+    for timing in timings:
+        if timing.engine in available_engines() and timing.error is None:
+            assert timing.seconds is not None and timing.seconds >= 0
+        else:
+            assert timing.seconds is None and timing.error
+    assert any(timing.seconds is not None for timing in timings)
+    assert "xlwings_polars.xlsx" in format_timings(timings)
+
+
+def _wide_export(path: Path, rows: int = 300, columns: int = 100) -> None:
+    # A wide export like the 100-column reports the projected reader targets.
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Export"
+    sheet.append(["Region", "Customer", "Qty"] + [f"Extra{i}" for i in range(columns - 3)])
+    for r in range(rows):
+        sheet.append([f"R{r % 4}", f"C{r % 7}", r] + [r * i for i in range(columns - 3)])
+    workbook.save(path)
+
+
+def test_read_projected_matches_full_read(tmp_path) -> None:
+    path = tmp_path / "wide.xlsx"
+    _wide_export(path)
+
+    projected = read_projected(path, columns=["customer", "Qty"], filters=[pl.col("Qty") >= 100], chunk_rows=64)
+    full = read_sheet(path, engine="openpyxl").select("Customer", "Qty").filter(pl.col("Qty") >= 100)
+
+    assert projected.columns == ["Customer", "Qty"]
+    assert projected.equals(full)
+
+
+def test_read_projected_uses_spec_columns(tmp_path) -> None:
+    path = tmp_path / "wide.xlsx"
+    _wide_export(path, rows=20, columns=10)
+    spec = PivotBuilder(
+        workbook=str(path),
+        table_name="Table1",
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+        pivot_sheet_name="Pivot",
+        pivot_table_name="PT",
+        row_fields=[RowField(name="Region")],
+        column_fields=[ColumnField(name="region")],
+        data_fields=[DataField(name="Qty", function=SummaryFunction.SUM)],
+    )
+
+    frame = read_projected(spec=spec, sheet_name="Export")
+
+    assert spec_columns(spec) == ["Region", "Qty"]
+    assert frame.shape == (20, 2)
+    with pytest.raises(ValidationError, match="Missing"):
+        read_projected(path, columns=["Missing"])
+
+
+def test_read_projected_keeps_rows_empty_in_the_projection(tmp_path) -> None:
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    path = tmp_path / "gaps.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Region", "Note", "Qty"])
+    sheet.append(["R1", None, 1])
+    sheet.append([None, "only a note", None])
+    sheet.append([])
+    sheet.append(["R2", None, 2])
+    # Formatted but empty rows after the data are not part of it.
+    sheet["A8"].font = Font(bold=True)
+    workbook.save(path)
+
+    frame = read_projected(path, columns=["Region", "Qty"])
+
+    assert frame["Region"].to_list() == ["R1", None, None, "R2"]
+    assert frame["Qty"].to_list() == [1, None, None, 2]
+
+
+def _regional_books(directory: Path, count: int) -> List[Path]:
+    from openpyxl import Workbook
+
+    paths = []
+    for i in range(count):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Sales"
+        sheet.append(["Region", "Qty"])
+        for r in range(i + 1):
+            sheet.append([f"Region{i}", r])
+        paths.append(directory / f"region_{i:02d}.xlsx")
+        workbook.save(paths[-1])
+    return paths
+
+
+def test_read_many_tags_rows_with_their_workbook(tmp_path) -> None:
+    paths = _regional_books(tmp_path, 4)
+
+    frame = read_many(str(tmp_path / "region_*.xlsx"), sheet_name="Sales", max_workers=2).collect()
+
+    assert frame.columns == ["Region", "Qty", "source_file"]
+    assert frame.height == 1 + 2 + 3 + 4
+    counts = frame.group_by("source_file").len().sort("source_file")
+    assert counts.rows() == [(str(path), i + 1) for i, path in enumerate(paths)]
+
+
+def test_read_many_reads_tables_in_process(tmp_path) -> None:
+    copies = []
+    for name in ("north.xlsx", "south.xlsx"):
+        copies.append(tmp_path / name)
+        shutil.copy(WORKBOOKS / "pivot_table_example.xlsx", copies[-1])
+
+    frame = read_many(copies, table_name="table1", columns=["Customer", "Qty"], max_workers=1, source_column="book")
+
+    assert isinstance(frame, pl.LazyFrame)
+    collected = frame.collect()
+    assert collected.columns == ["Customer", "Qty", "book"]
+    assert collected.height == 16
+    assert collected["book"].unique(maintain_order=True).to_list() == [str(path) for path in copies]
+    with pytest.raises(FileNotFoundError):
+        read_many(str(tmp_path / "nothing_*.xlsx"))
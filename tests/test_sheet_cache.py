@@ -0,0 +1,101 @@
+"""
+Tests for the Arrow IPC sheet cache.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+import polars as pl
+from openpyxl import Workbook
+
+from pivot_util.polars_loader import read_sheet
+from pivot_util.sheet_cache import SheetCache, workbook_fingerprint
+
+WORKBOOKS = Path(__file__).resolve().parents[1] / "Workbooks"
+
+
+def _copy_example(tmp_path: Path) -> Path:
+    path = tmp_path / "pivot_table_example.xlsx"
+    shutil.copy(WORKBOOKS / "pivot_table_example.xlsx", path)
+    return path
+
+
+def test_repeat_reads_hit_the_cache(tmp_path) -> None:
+    path = _copy_example(tmp_path)
+    cache = SheetCache(tmp_path / "cache")
+
+    first = read_sheet(path, "Sheet2", cache=cache)
+    second = cache.read_sheet(path, "Sheet2")
+    table = cache.read_table(path, "Table1")
+    table_again = cache.read_table(path, "table1")
+
+    assert first.equals(second)
+    assert table.equals(table_again)
+    assert (cache.hits, cache.misses) == (2, 2)
+    # Different read options are cached separately.
+    cache.read_sheet(path, "Sheet2", has_header=False)
+    assert cache.misses == 3
+
+
+class _Options:
+    # Default repr includes the object's address, which differs between runs.
+    def __init__(self, skip_rows: int) -> None:
+        self.skip_rows = skip_rows
+
+
+def test_cache_key_ignores_unstable_option_reprs(tmp_path) -> None:
+    path = _copy_example(tmp_path)
+    cache = SheetCache(tmp_path / "cache")
+    frame = pl.DataFrame({"a": [1]})
+
+    for options in (_Options(1), _Options(1), {"dtypes": {"Qty": pl.Int64}, "columns": {"b", "a"}}):
+        cache.get_or_load(path, ("sheet", "Sheet2", options), lambda: frame)
+    cache.get_or_load(path, ("sheet", "Sheet2", {"columns": {"a", "b"}, "dtypes": {"Qty": pl.Int64}}), lambda: frame)
+    cache.get_or_load(path, ("sheet", "Sheet2", _Options(2)), lambda: frame)
+
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_changed_workbook_is_parsed_again_and_replaces_its_entry(tmp_path) -> None:
+    path = tmp_path / "book.xlsx"
+    cache = SheetCache(tmp_path / "cache")
+
+    def save(value: int) -> None:
+        workbook = Workbook()
+        workbook.active.append(["Qty"])
+        workbook.active.append([value])
+        workbook.save(path)
+
+    save(1)
+    before = workbook_fingerprint(path)
+    assert cache.read_sheet(path)["Qty"].to_list() == [1]
+    save(2)
+    assert workbook_fingerprint(path) != before
+    assert cache.read_sheet(path)["Qty"].to_list() == [2]
+
+    assert cache.misses == 2
+    assert len(os.listdir(cache.directory)) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path) -> None:
+    path = _copy_example(tmp_path)
+    cache = SheetCache(tmp_path / "cache", max_entries=2)
+
+    cache.read_sheet(path, "Sheet2")
+    cache.read_sheet(path, "Pivot")
+    # Age both entries; the Sheet2 hit below marks it as recently used again.
+    for name in os.listdir(cache.directory):
+        os.utime(os.path.join(cache.directory, name), (0, 0))
+    cache.read_sheet(path, "Sheet2")
+    cache.read_table(path, "Table1")
+
+    assert cache.evictions == 1
+    assert len(os.listdir(cache.directory)) == 2
+    cache.read_sheet(path, "Sheet2")
+    assert cache.hits == 2
+
+    cache.clear()
+    assert cache.size_bytes == 0
@@ -0,0 +1,109 @@
+"""
+Unit tests for the one-pass workbook metadata index.
+"""
+
+from __future__ import annotations
+
+from pivot_util.workbook_index import WorkbookIndex, _list_object_column_names
+
+from excel_sim import ExcelSimulator, SimComError, SimSheetApi, build_workbook
+
+
+def test_index_snapshots_sheets_tables_and_pivots_in_one_pass() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=4, tables_per_sheet=2)
+    with excel.untracked():
+        source = book.sheets[0].api.ListObjects("Table1").Range
+        cache = book.api.PivotCaches().Create(1, source)
+        cache.CreatePivotTable(book.sheets["Data3"].range("P1").api, "PT_Existing")
+
+    index = WorkbookIndex(book)
+    entry = index.table("table6")
+
+    assert (entry.name, entry.sheet_name) == ("Table6", "Data3")
+    assert index.sheet("DATA2").name == "Data2"
+    assert index.sheet("Missing") is None
+    assert index.last_sheet.name == "Data4"
+    # Pivot table names match exactly, as the baseline uniqueness check did.
+    assert index.pivot_table_sheet("PT_Existing") == "Data3"
+    assert index.pivot_table_sheet("pt_existing") is None
+    assert index.builds == 1
+    assert excel.calls["SimSheets.__iter__"] == 4
+
+    trips = excel.round_trips
+    assert index.column_names(entry) == ["Customer", "Category", "Qty", "Total", "Name"]
+    after_first_read = excel.round_trips
+    index.column_names(entry)
+    index.table("Table1")
+    assert after_first_read > trips
+    assert excel.round_trips == after_first_read
+
+
+def test_index_records_changes_and_rebuilds_after_invalidate() -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=2)
+    index = WorkbookIndex(book)
+
+    new_sheet = book.sheets.add("Pivot", after=index.last_sheet)
+    index.add_sheet(new_sheet)
+    index.add_pivot_table("Pivot", "PT_New")
+    assert index.last_sheet is new_sheet
+    assert index.pivot_table_sheet("PT_New") == "Pivot"
+
+    index.clear_sheet("Data1")
+    assert index.table("Table1") is None
+    assert index.builds == 1
+
+    index.invalidate()
+    assert index.table("Table1") is not None
+    assert index.pivot_table_sheet("PT_New") is None
+    assert index.builds == 2
+
+
+def test_index_skips_sheets_whose_tables_cannot_be_listed(monkeypatch) -> None:
+    excel = ExcelSimulator()
+    book = build_workbook(excel, sheet_count=2)
+    listed = SimSheetApi.ListObjects
+
+    def list_objects(api):
+        if api._sheet._name == "Data1":
+            raise SimComError("protected sheet")
+        return listed.fget(api)
+
+    monkeypatch.setattr(SimSheetApi, "ListObjects", property(list_objects))
+    index = WorkbookIndex(book)
+
+    assert index.table("Table1") is None
+    assert index.table("TABLE2").name == "Table2"
+    assert index.builds == 1
+
+
+def _header_read_round_trips(column_count: int) -> int:
+    excel = ExcelSimulator()
+    columns = [f"Col{i}" for i in range(column_count)]
+    book = build_workbook(excel, sheet_count=1, columns=columns, rows=[list(range(column_count))])
+    with excel.untracked():
+        list_object = book.sheets[0].api.ListObjects("Table1")
+    assert _list_object_column_names(list_object) == columns
+    return excel.round_trips
+
+
+def test_header_names_are_read_in_constant_round_trips() -> None:
+    assert _header_read_round_trips(5) == _header_read_round_trips(150) == 2
+
+
+class FakeHeaderListObject:
+    def __init__(self, header_value, column_names) -> None:
+        self.HeaderRowRange = type("HeaderRow", (), {"Value": header_value})()
+        self.ListColumns = type(
+            "Columns",
+            (),
+            {"Count": len(column_names), "Item": lambda _self, i: type("Col", (), {"Name": column_names[i - 1]})()},
+        )()
+
+
+def test_header_names_fall_back_to_list_columns() -> None:
+    assert _list_object_column_names(FakeHeaderListObject("Only", ["Ignored"])) == ["Only"]
+    assert _list_object_column_names(FakeHeaderListObject((("A", "B"),), ["x", "y"])) == ["A", "B"]
+    # Numeric headers come back as floats from Value; ListColumns has Excel's text.
+    assert _list_object_column_names(FakeHeaderListObject((("A", 2024.0),), ["A", "2024"])) == ["A", "2024"]
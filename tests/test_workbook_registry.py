@@ -0,0 +1,93 @@
+"""
+Tests for the open-workbook registry, driven against the Excel simulator.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from pivot_util.workbook_registry import WorkbookRegistry, normalize_workbook_path
+
+from excel_sim import ExcelSimulator, build_workbook
+
+
+def _host(tmp_path, apps: int = 3, books_per_app: int = 10):
+    # Several Excel instances, each with many books open, as on a shared batch host.
+    excels = []
+    for a in range(apps):
+        excel = ExcelSimulator()
+        for b in range(books_per_app):
+            path = str(tmp_path / f"app{a}_book{b}.xlsx")
+            build_workbook(excel, sheet_count=1, name=f"app{a}_book{b}.xlsx", path=path)
+            excel.app.books.open(path)
+        excel.reset_counters()
+        excels.append(excel)
+    return excels
+
+
+def _round_trips(excels) -> int:
+    return sum(excel.round_trips for excel in excels)
+
+
+def test_repeated_checks_scan_once(tmp_path) -> None:
+    excels = _host(tmp_path)
+    registry = WorkbookRegistry(apps=lambda: [excel.app for excel in excels])
+
+    for i in range(20):
+        registry.ensure_closed(str(tmp_path / f"job{i}.xlsx"))
+    scan_cost = _round_trips(excels)
+
+    with pytest.raises(RuntimeError, match="already open"):
+        registry.ensure_closed(str(tmp_path / "APP1_BOOK3.xlsx"))
+
+    assert registry.rescans == 1
+    # Reading and enumerating books per app plus one fullname per book, paid once for 20 checks.
+    assert scan_cost == 2 * 3 + 30
+
+
+def test_open_and_close_keep_the_map_current(tmp_path) -> None:
+    excels = _host(tmp_path, apps=1, books_per_app=2)
+    app = excels[0].app
+    registry = WorkbookRegistry(apps=lambda: [app])
+    path = str(tmp_path / "job.xlsx")
+    build_workbook(excels[0], sheet_count=1, name="job.xlsx", path=path)
+
+    registry.ensure_closed(path)
+    book = registry.open(app, path)
+    assert registry.find(path).book is book
+    with pytest.raises(RuntimeError):
+        registry.ensure_closed(path)
+
+    registry.close(path)
+    registry.ensure_closed(path)
+    assert book not in list(app.books)
+    assert registry.rescans == 1
+
+
+def test_stale_entries_trigger_a_rescan(tmp_path) -> None:
+    excels = _host(tmp_path, apps=1, books_per_app=2)
+    app = excels[0].app
+    now = [0.0]
+    registry = WorkbookRegistry(apps=lambda: [app], max_age=30.0, clock=lambda: now[0])
+    path = str(tmp_path / "app0_book0.xlsx")
+
+    assert registry.find(path) is not None
+    # Closed by someone else: the hit no longer answers, so the registry rescans.
+    app.books.open(path).close()
+    assert registry.find(path) is None
+    assert registry.rescans == 2
+
+    # Opened by someone else: only seen once the map is older than max_age.
+    app.books.open(path)
+    assert registry.find(path) is None
+    now[0] = 31.0
+    assert registry.find(path) is not None
+    assert registry.rescans == 3
+
+    registry.invalidate()
+    registry.find(path)
+    assert registry.rescans == 4
+
+
+def test_normalize_workbook_path_ignores_case(tmp_path) -> None:
+    assert normalize_workbook_path(str(tmp_path / "A.xlsx")) == normalize_workbook_path(str(tmp_path / "a.XLSX"))
@@ -0,0 +1,242 @@
+"""
+Unit tests for the file-level (.xlsx) pivot backend.
+"""
+
+from __future__ import annotations
+
+import shutil
+import zipfile
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+from openpyxl.styles import Font
+
+from pivot_util.constants import DestinationHandling, SummaryFunction
+from pivot_util.errors import DestinationError, ValidationError
+from pivot_util.fields import ColumnField, DataField, RowField
+from pivot_util.pivot_builder import PivotBuilder
+from pivot_util.pivot_util import generate_pivot, generate_pivots
+from pivot_util.xlsx_backend import check_openpyxl_internals
+
+from excel_sim import ExcelSimulator, build_workbook
+
+
+EXAMPLE_WORKBOOK = Path(__file__).resolve().parents[1] / "Workbooks" / "pivot_table_example.xlsx"
+
+
+@pytest.fixture
+def workbook_path(tmp_path: Path) -> Path:
+    path = tmp_path / "pivot_table_example.xlsx"
+    shutil.copy(EXAMPLE_WORKBOOK, path)
+    return path
+
+
+def _builder(path: Path, **overrides) -> PivotBuilder:
+    values = dict(
+        workbook=str(path),
+        table_name="Table1",
+        pivot_sheet_name="Summary",
+        pivot_table_name="PT_Summary",
+        destination_handling=DestinationHandling.FIND_OR_CREATE,
+        row_fields=[RowField(name="Customer", caption="Customer Name"), RowField(name="Category")],
+        data_fields=[
+            DataField(name="Name", function=SummaryFunction.COUNT, caption="Orders", number_format="0"),
+            DataField(name="Total", function=SummaryFunction.SUM, number_format="$#,##0.00"),
+        ],
+        table_style="PivotStyleMedium9",
+    )
+    values.update(overrides)
+    return PivotBuilder(**values)  # type: ignore[arg-type]
+
+
+def _pivot(path: Path, sheet_name: str):
+    workbook = load_workbook(path)
+    pivots = workbook[sheet_name]._pivots
+    assert len(pivots) == 1
+    return workbook, pivots[0]
+
+
+def test_generate_pivot_writes_native_parts(workbook_path: Path) -> None:
+    generate_pivot(_builder(workbook_path))
+
+    with zipfile.ZipFile(workbook_path) as archive:
+        names = archive.namelist()
+    assert sum(name.startswith("xl/pivotTables/pivotTable") for name in names) == 2
+    assert sum(name.startswith("xl/pivotCache/pivotCacheRecords") for name in names) == 2
+
+    workbook, pivot = _pivot(workbook_path, "Summary")
+    assert workbook.sheetnames[-1] == "Summary"
+    assert pivot.name == "PT_Summary"
+    assert pivot.cache.refreshOnLoad is True
+    assert pivot.cache.cacheSource.worksheetSource.name == "Table1"
+    assert pivot.cache.recordCount == 8
+    assert [field.x for field in pivot.rowFields] == [1, 2]
+    assert [field.x for field in pivot.colFields] == [-2]
+    assert pivot.pivotFields[1].name == "Customer Name"
+    assert pivot.pivotFields[1].axis == "axisRow"
+    # 3 customers + 6 customer/category pairs + grand total, as Excel lays it out.
+    assert len(pivot.rowItems) == 10
+    assert pivot.location.ref == "A3:C13"
+
+    orders, total = pivot.dataFields
+    assert (orders.name, orders.subtotal, orders.numFmtId) == ("Orders", "count", 1)
+    assert (total.name, total.subtotal) == ("Sum of Total", "sum")
+    with zipfile.ZipFile(workbook_path) as archive:
+        styles = archive.read("xl/styles.xml").decode()
+    assert f'<numFmt numFmtId="{total.numFmtId}" formatCode="$#,##0.00"' in styles
+    assert pivot.pivotTableStyleInfo.name == "PivotStyleMedium9"
+    # The existing Excel-authored pivot is preserved.
+    assert [p.name for p in workbook["Pivot"]._pivots] == ["PT_By_Customer"]
+
+
+def test_generate_pivot_column_fields(workbook_path: Path) -> None:
+    spec = _builder(
+        workbook_path,
+        row_fields=[RowField(name="Customer")],
+        column_fields=[ColumnField(name="Category")],
+        data_fields=[DataField(name="Qty", function=SummaryFunction.SUM)],
+        pivot_top_left_cell="B2",
+    )
+    generate_pivot(spec)
+
+    _, pivot = _pivot(workbook_path, "Summary")
+    assert [field.x for field in pivot.colFields] == [2]
+    assert pivot.pivotFields[2].axis == "axisCol"
+    # 5 categories + grand total across, header rows + 3 customers + grand total down.
+    assert len(pivot.colItems) == 6
+    assert pivot.location.ref == "B2:H7"
+
+
+def test_generate_pivots_share_one_cache(workbook_path: Path) -> None:
+    specs = [
+        _builder(workbook_path, pivot_sheet_name=f"Summary{idx}", pivot_table_name=f"PT_{idx}")
+        for idx in range(3)
+    ]
+
+    report = generate_pivots(specs)
+
+    assert (report.caches_created, report.caches_reused) == (1, 2)
+    with zipfile.ZipFile(workbook_path) as archive:
+        names = archive.namelist()
+    # One cache for the Excel-authored pivot plus one shared by the new pivots.
+    assert sum(name.startswith("xl/pivotCache/pivotCacheDefinition") for name in names) == 2
+    assert sum(name.startswith("xl/pivotTables/pivotTable") for name in names) == 4
+
+    workbook = load_workbook(workbook_path)
+    cache_ids = {workbook[f"Summary{idx}"]._pivots[0].cacheId for idx in range(3)}
+    assert len(cache_ids) == 1
+
+
+def test_generate_pivots_saves_nothing_when_a_later_builder_fails(workbook_path: Path, tmp_path: Path) -> None:
+    second_path = tmp_path / "second.xlsx"
+    shutil.copy(workbook_path, second_path)
+    before = (workbook_path.read_bytes(), second_path.read_bytes())
+    specs = [_builder(workbook_path), _builder(second_path, row_fields=[RowField(name="Missing")])]
+
+    with pytest.raises(ValidationError):
+        generate_pivots(specs)
+
+    assert (workbook_path.read_bytes(), second_path.read_bytes()) == before
+
+
+def test_generate_pivots_validates_excel_builders_before_writing_files(workbook_path: Path) -> None:
+    before = workbook_path.read_bytes()
+    book = build_workbook(ExcelSimulator())
+    specs = [_builder(workbook_path), _builder(workbook_path, workbook=book, table_name="Missing")]
+
+    with pytest.raises(ValidationError):
+        generate_pivots(specs)
+
+    assert workbook_path.read_bytes() == before
+
+
+def test_generate_pivots_saves_files_only_after_excel_builders_succeed(workbook_path: Path) -> None:
+    before = workbook_path.read_bytes()
+    book = build_workbook(ExcelSimulator())
+    failing = _builder(
+        workbook_path,
+        workbook=book,
+        pivot_sheet_name="Missing",
+        destination_handling=DestinationHandling.EXISTING_NO_CLEAR,
+    )
+
+    with pytest.raises(DestinationError):
+        generate_pivots([_builder(workbook_path), failing])
+
+    assert workbook_path.read_bytes() == before
+
+
+def test_generate_pivot_destination_handling(workbook_path: Path) -> None:
+    with pytest.raises(DestinationError):
+        generate_pivot(_builder(workbook_path, pivot_sheet_name="Sheet2"))
+    with pytest.raises(DestinationError):
+        generate_pivot(
+            _builder(workbook_path, pivot_sheet_name="Pivot", destination_handling=DestinationHandling.NEW)
+        )
+    with pytest.raises(DestinationError):
+        generate_pivot(
+            _builder(
+                workbook_path,
+                pivot_sheet_name="Missing",
+                destination_handling=DestinationHandling.EXISTING_NO_CLEAR,
+            )
+        )
+
+    workbook = load_workbook(workbook_path)
+    sheet = workbook["Pivot"]
+    sheet["H20"].font = Font(bold=True)
+    sheet["H21"].number_format = "0.00"
+    sheet.merge_cells("J20:K21")
+    workbook.save(workbook_path)
+
+    generate_pivot(
+        _builder(
+            workbook_path,
+            pivot_sheet_name="Pivot",
+            destination_handling=DestinationHandling.EXISTING_FORCE_CLEAR,
+        )
+    )
+    workbook, pivot = _pivot(workbook_path, "Pivot")
+    assert pivot.name == "PT_Summary"
+    # Force clear removes formats and merges as well as values, like Sheet.clear over COM.
+    sheet = workbook["Pivot"]
+    assert not sheet.merged_cells.ranges
+    assert not sheet["H20"].font.b
+    assert sheet["H21"].number_format == "General"
+
+
+def test_generate_pivot_validation_errors(workbook_path: Path) -> None:
+    with pytest.raises(ValidationError):
+        generate_pivot(_builder(workbook_path, pivot_table_name="PT_By_Customer"))
+    with pytest.raises(ValidationError):
+        generate_pivot(_builder(workbook_path, table_name="Missing"))
+    with pytest.raises(ValidationError):
+        generate_pivot(_builder(workbook_path, row_fields=[RowField(name="Missing")]))
+
+
+def test_openpyxl_internals_are_supported() -> None:
+    # Fails loudly when an openpyxl release moves the private members the writer uses.
+    check_openpyxl_internals()
+
+
+def test_generate_pivot_keeps_macros_in_xlsm(workbook_path: Path, tmp_path: Path) -> None:
+    macro_path = tmp_path / "with_macros.xlsm"
+    with zipfile.ZipFile(workbook_path) as source, zipfile.ZipFile(macro_path, "w") as target:
+        for item in source.infolist():
+            target.writestr(item, source.read(item.filename))
+        target.writestr("xl/vbaProject.bin", b"macro bytes")
+
+    generate_pivot(_builder(macro_path))
+
+    with zipfile.ZipFile(macro_path) as archive:
+        assert archive.read("xl/vbaProject.bin") == b"macro bytes"
+    _pivot(macro_path, "Summary")
+
+
+def test_generate_pivot_rejects_other_formats(workbook_path: Path, tmp_path: Path) -> None:
+    other = tmp_path / "pivot_table_example.xls"
+    shutil.copy(workbook_path, other)
+
+    with pytest.raises(ValidationError, match=".xlsx and .xlsm"):
+        generate_pivot(_builder(other))
@@ -0,0 +1,210 @@
+"""
+Tests for the package-XML table reader.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import zipfile
+from pathlib import Path
+
+import polars as pl
+import pytest
+from openpyxl import Workbook
+from openpyxl.worksheet.table import Table
+
+from pivot_util.errors import ValidationError
+from pivot_util.polars_loader import read_sheet
+from pivot_util.xlsx_reader import (
+    find_table,
+    iter_sheet_batches,
+    iter_table_batches,
+    list_tables,
+    read_table,
+)
+
+WORKBOOKS = Path(__file__).resolve().parents[1] / "Workbooks"
+
+
+def _workbook_with_tables(path: Path) -> None:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Data"
+    sheet.append(["Label", "Noise"])
+    # Sales table at C3:F7 with a totals row on row 7.
+    rows = [
+        ["Customer", "Qty", "Price", "Shipped"],
+        ["Ann", 3, 2.5, dt.datetime(2024, 1, 2)],
+        ["Bob", None, 4.0, dt.datetime(2024, 2, 29, 12, 30)],
+        ["Cy", 5, 1.25, None],
+        ["Total", 8, None, None],
+    ]
+    for r, row in enumerate(rows, start=3):
+        for c, value in enumerate(row, start=3):
+            sheet.cell(row=r, column=c, value=value)
+    sales = Table(displayName="Sales", ref="C3:F7")
+    sales.totalsRowCount = 1
+    sheet.add_table(sales)
+    sheet["H3"] = "Outside"
+
+    other = workbook.create_sheet("Other")
+    other.append(["Flag", "Name"])
+    other.append([True, "x"])
+    other.append([False, "y"])
+    other.add_table(Table(displayName="Flags", ref="A1:B3"))
+    workbook.save(path)
+
+
+def test_list_and_find_tables(tmp_path) -> None:
+    path = tmp_path / "tables.xlsx"
+    _workbook_with_tables(path)
+
+    tables = list_tables(path)
+
+    assert [(t.name, t.sheet_name, t.ref) for t in tables] == [("Sales", "Data", "C3:F7"), ("Flags", "Other", "A1:B3")]
+    assert find_table(path, "sales").column_names == ["Customer", "Qty", "Price", "Shipped"]
+    assert find_table(path, "Sales").data_bounds == (3, 4, 6, 6)
+    with pytest.raises(ValidationError, match="not found"):
+        find_table(path, "Missing")
+
+
+def test_read_table_reads_exactly_the_table_body(tmp_path) -> None:
+    path = tmp_path / "tables.xlsx"
+    _workbook_with_tables(path)
+
+    sales = read_table(path, "Sales")
+    flags = read_table(path, "flags", columns=["NAME", "flag"])
+
+    assert sales.columns == ["Customer", "Qty", "Price", "Shipped"]
+    assert sales.rows() == [
+        ("Ann", 3, 2.5, dt.datetime(2024, 1, 2)),
+        ("Bob", None, 4.0, dt.datetime(2024, 2, 29, 12, 30)),
+        ("Cy", 5, 1.25, None),
+    ]
+    assert flags.rows() == [("x", True), ("y", False)]
+    with pytest.raises(ValidationError, match="Columns not found"):
+        read_table(path, "Sales", columns=["Nope"])
+
+
+def test_read_table_stops_parsing_after_the_table(tmp_path) -> None:
+    path = tmp_path / "tables.xlsx"
+    damaged = tmp_path / "damaged.xlsx"
+    _workbook_with_tables(path)
+    # Rows after the table are unreadable; a reader that parsed the whole sheet would fail.
+    with zipfile.ZipFile(path) as source, zipfile.ZipFile(damaged, "w") as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename == find_table(path, "Sales").sheet_part:
+                data = data.replace(b"</sheetData>", b'<row r="99"><c r="A99"><v>1</v></c></row><broken')
+            target.writestr(item, data)
+
+    assert read_table(damaged, "Sales").height == 3
+
+
+def test_read_table_matches_openpyxl_on_repo_workbooks() -> None:
+    from openpyxl import load_workbook
+
+    for name in ("book_with_tables.xlsx", "pivot_table_example.xlsx"):
+        path = WORKBOOKS / name
+        workbook = load_workbook(path, data_only=True)
+        for table in list_tables(path):
+            min_col, min_row, max_col, max_row = table.data_bounds
+            expected = list(
+                workbook[table.sheet_name].iter_rows(
+                    min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True
+                )
+            )
+            assert read_table(path, table.name).rows() == expected
+
+
+def _export(path: Path, rows: int) -> None:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Export"
+    sheet.append(["Region", "Qty", "Price"])
+    for r in range(rows):
+        sheet.append([f"R{r % 5}", r, r / 4])
+    workbook.save(path)
+
+
+def test_sheet_batches_stream_the_whole_sheet(tmp_path) -> None:
+    path = tmp_path / "export.xlsx"
+    _export(path, rows=1_000)
+
+    batches = list(iter_sheet_batches(path, "export", batch_rows=300))
+
+    assert [batch.height for batch in batches] == [300, 300, 300, 100]
+    assert pl.concat(batches).equals(read_sheet(path, engine="openpyxl"))
+
+
+def test_sheet_batches_feed_an_incremental_aggregation(tmp_path) -> None:
+    path = tmp_path / "export.xlsx"
+    _export(path, rows=1_000)
+
+    partials = [
+        batch.group_by("Region").agg(pl.col("Qty").sum())
+        for batch in iter_sheet_batches(path, batch_rows=128, columns=["region", "qty"], schema={"Qty": pl.Int64})
+    ]
+    streamed = pl.concat(partials).group_by("Region").agg(pl.col("Qty").sum()).sort("Region")
+    full = read_sheet(path, engine="openpyxl").group_by("Region").agg(pl.col("Qty").sum()).sort("Region")
+
+    assert streamed.equals(full)
+    with pytest.raises(ValidationError, match="Sheet 'Nope'"):
+        next(iter_sheet_batches(path, "Nope"))
+
+
+def test_sheet_batches_keep_rows_with_data_outside_the_projection(tmp_path) -> None:
+    path = tmp_path / "sparse.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Region", "Note"])
+    sheet.append(["R1", None])
+    sheet.append([None, "only a note"])
+    sheet.append([])
+    sheet.append(["R2", None])
+    workbook.save(path)
+
+    kept = pl.concat(iter_sheet_batches(path, columns=["Region"]))
+    with_gaps = pl.concat(iter_sheet_batches(path, columns=["Region"], drop_empty_rows=False))
+
+    assert kept["Region"].to_list() == ["R1", None, "R2"]
+    assert with_gaps["Region"].to_list() == ["R1", None, None, "R2"]
+
+
+def test_sheet_batches_read_iso_date_cells(tmp_path) -> None:
+    path = tmp_path / "iso.xlsx"
+    workbook = Workbook(iso_dates=True)
+    sheet = workbook.active
+    sheet.append(["When", "Day", "Qty"])
+    sheet.append([dt.datetime(2024, 1, 2, 3, 4, 5), dt.date(2024, 5, 6), 1])
+    workbook.save(path)
+    with zipfile.ZipFile(path) as package:
+        assert b't="d"' in package.read("xl/worksheets/sheet1.xml")
+
+    frame = pl.concat(iter_sheet_batches(path))
+
+    assert frame.row(0) == (dt.datetime(2024, 1, 2, 3, 4, 5), dt.datetime(2024, 5, 6), 1)
+
+
+def test_sheet_batches_read_formulas_without_cached_values_as_null(tmp_path) -> None:
+    path = tmp_path / "formulas.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Qty", "Double"])
+    sheet.append([2, "=A2*2"])
+    workbook.save(path)
+    with zipfile.ZipFile(path) as package:
+        assert b"<v />" in package.read("xl/worksheets/sheet1.xml")
+
+    frame = pl.concat(iter_sheet_batches(path))
+
+    assert frame.row(0) == (2, None)
+
+
+def test_table_batches_split_the_table_body(tmp_path) -> None:
+    path = tmp_path / "tables.xlsx"
+    _workbook_with_tables(path)
+
+    batches = list(iter_table_batches(path, "Sales", batch_rows=2, columns=["Customer"]))
+
+    assert [batch["Customer"].to_list() for batch in batches] == [["Ann", "Bob"], ["Cy"]]